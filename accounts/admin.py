@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
-from .models import UserProfile, Notification
+from .models import UserProfile, Notification, NotificationArchive, AvailabilityRule, AvailabilityException
+from .notifications import set_read_state
 
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
@@ -10,8 +11,16 @@ class UserProfileInline(admin.StackedInline):
     fields = ('university_email', 'department', 'year', 'bio', 'profile_picture', 
               'availability', 'is_verified', 'prefer_in_person', 'prefer_online')
 
+class AvailabilityRuleInline(admin.TabularInline):
+    model = AvailabilityRule
+    extra = 0
+
+class AvailabilityExceptionInline(admin.TabularInline):
+    model = AvailabilityException
+    extra = 0
+
 class UserAdmin(BaseUserAdmin):
-    inlines = (UserProfileInline,)
+    inlines = (UserProfileInline, AvailabilityRuleInline, AvailabilityExceptionInline)
     list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'get_university_email', 'get_department')
     list_filter = BaseUserAdmin.list_filter + ('profile__is_verified', 'profile__department')
     
@@ -68,9 +77,16 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
     
     def mark_as_read(self, request, queryset):
-        queryset.update(is_read=True)
+        set_read_state(queryset, is_read=True)
     mark_as_read.short_description = "Mark selected notifications as read"
     
     def mark_as_unread(self, request, queryset):
-        queryset.update(is_read=False)
+        set_read_state(queryset, is_read=False)
     mark_as_unread.short_description = "Mark selected notifications as unread"
+
+@admin.register(NotificationArchive)
+class NotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('title', 'recipient', 'notification_type', 'collapsed_count', 'period', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'period')
+    search_fields = ('title', 'message', 'recipient__username')
+    readonly_fields = ('original_id', 'collapsed_count', 'period', 'created_at', 'archived_at')
@@ -0,0 +1,175 @@
+"""
+Weekly availability as bitmaps.
+
+A week is 672 fifteen-minute slots in local time, bit ``i`` standing for slot
+``i`` counted from Monday 00:00. ``UserProfile.weekly_availability`` stores
+the bits set by the user's ``AvailabilityRule`` rows (empty when the user has
+no rules). ``week_masks`` turns those into the free time of a concrete week
+by applying that week's ``AvailabilityException`` rows and clearing the slots
+of booked sessions, so comparing a learner with thousands of tutors is one
+``&`` per tutor on Python integers.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from skill_sessions.models import SessionParticipant
+from skill_sessions.participants import ACTIVE_STATUSES
+
+from .models import AvailabilityException, AvailabilityRule, UserProfile
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_WEEK = 7 * SLOTS_PER_DAY
+FULL_WEEK = (1 << SLOTS_PER_WEEK) - 1
+MASK_BYTES = SLOTS_PER_WEEK // 8
+
+_deferred = threading.local()
+
+
+def span_mask(first, last):
+    """Bits for slots ``[first, last)``"""
+    first, last = max(first, 0), min(last, SLOTS_PER_WEEK)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def time_slot(moment, round_up=False):
+    minutes = moment.hour * 60 + moment.minute
+    slot, partial = divmod(minutes, SLOT_MINUTES)
+    return slot + 1 if round_up and (partial or moment.second) else slot
+
+
+def day_mask(weekday, start_time=None, end_time=None):
+    """
+    Bits for ``start_time``-``end_time`` on ``weekday`` (0 is Monday), or the
+    whole day without times. Only whole slots inside the span count; an end
+    of 00:00 means midnight.
+    """
+    day = weekday * SLOTS_PER_DAY
+    first = day + (time_slot(start_time, round_up=True) if start_time else 0)
+    last = day + (time_slot(end_time) if end_time and end_time != time(0) else SLOTS_PER_DAY)
+    return span_mask(first, last)
+
+
+def encode(mask):
+    return mask.to_bytes(MASK_BYTES, 'little')
+
+
+def decode(data):
+    """The stored weekly mask, or None when the user has no rules"""
+    return int.from_bytes(bytes(data), 'little') if data else None
+
+
+def rebuild_weekly_availability(user_id):
+    """Recompute the stored weekly mask from the user's rules"""
+    mask, has_rules = 0, False
+    for weekday, start_time, end_time in AvailabilityRule.objects.filter(user_id=user_id).values_list(
+        'weekday', 'start_time', 'end_time'
+    ):
+        mask |= day_mask(weekday, start_time, end_time)
+        has_rules = True
+    UserProfile.objects.filter(user_id=user_id).update(weekly_availability=encode(mask) if has_rules else b'')
+    return mask if has_rules else None
+
+
+def rebuilds_deferred():
+    return getattr(_deferred, 'depth', 0) > 0
+
+
+@contextmanager
+def rebuild_once(user_id):
+    """
+    Replace a user's rules inside the block: the rule signals skip their
+    per-row rebuilds and the mask is rebuilt once when the block succeeds.
+    """
+    _deferred.depth = getattr(_deferred, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _deferred.depth -= 1
+    rebuild_weekly_availability(user_id)
+
+
+def week_start(day=None):
+    """Monday of the week containing ``day`` (today by default)"""
+    day = day or timezone.localdate()
+    return day - timedelta(days=day.weekday())
+
+
+def week_bounds(monday):
+    start = timezone.make_aware(datetime.combine(monday, time(0)))
+    return start, timezone.make_aware(datetime.combine(monday + timedelta(days=7), time(0)))
+
+
+def slot_datetime(monday, slot):
+    day, offset = divmod(slot, SLOTS_PER_DAY)
+    return timezone.make_aware(
+        datetime.combine(monday + timedelta(days=day), time(0)) + timedelta(minutes=offset * SLOT_MINUTES)
+    )
+
+
+def datetime_slot(monday, moment, round_up=False):
+    """Slot of an aware datetime within the week starting ``monday``, unclamped"""
+    local = timezone.localtime(moment)
+    days = (local.date() - monday).days
+    return days * SLOTS_PER_DAY + time_slot(local.time(), round_up=round_up)
+
+
+def window_mask(weekdays=None, start_time=None, end_time=None):
+    """Bits for a daily time window on ``weekdays`` (every day by default)"""
+    mask = 0
+    for weekday in (range(7) if weekdays is None else weekdays):
+        mask |= day_mask(weekday, start_time, end_time)
+    return mask
+
+
+def week_masks(user_ids, monday, default=0):
+    """
+    Free slots of each user in the week starting ``monday``: weekly rules,
+    then that week's exceptions, minus booked sessions. Users without rules
+    start from ``default``. Three queries regardless of the number of users.
+    """
+    user_ids = list(user_ids)
+    masks = dict.fromkeys(user_ids, default)
+    for user_id, data in UserProfile.objects.filter(user_id__in=user_ids).values_list(
+        'user_id', 'weekly_availability'
+    ):
+        weekly = decode(data)
+        if weekly is not None:
+            masks[user_id] = weekly
+
+    exceptions = AvailabilityException.objects.filter(
+        user_id__in=user_ids, date__gte=monday, date__lt=monday + timedelta(days=7)
+    ).values_list('user_id', 'date', 'start_time', 'end_time', 'is_available')
+    for user_id, day, start_time, end_time, is_available in exceptions:
+        span = day_mask((day - monday).days, start_time, end_time)
+        masks[user_id] = masks[user_id] | span if is_available else masks[user_id] & ~span
+
+    start, end = week_bounds(monday)
+    booked = SessionParticipant.objects.filter(
+        user_id__in=user_ids, status__in=ACTIVE_STATUSES, scheduled_date__lt=end, end_time__gt=start
+    ).values_list('user_id', 'scheduled_date', 'end_time')
+    for user_id, scheduled_date, end_time in booked:
+        masks[user_id] &= ~span_mask(
+            datetime_slot(monday, scheduled_date), datetime_slot(monday, end_time, round_up=True)
+        )
+    return masks
+
+
+def free_runs(mask, min_slots=1):
+    """``(first_slot, length)`` of every run of at least ``min_slots`` set bits"""
+    starts = mask
+    for shift in range(1, min_slots):
+        starts &= mask >> shift
+    runs = []
+    while starts:
+        first = (starts & -starts).bit_length() - 1
+        rest = mask >> first
+        length = (~rest & (rest + 1)).bit_length() - 1
+        runs.append((first, length))
+        starts &= ~span_mask(first, first + length)
+    return runs
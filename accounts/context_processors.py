@@ -1,15 +1,11 @@
-from .models import Notification
+from .notifications import unread_count
 
 def notifications_context(request):
     """Context processor to add unread notifications count to all templates"""
     if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(
-            recipient=request.user, 
-            is_read=False
-        ).count()
         return {
-            'unread_notifications_count': unread_count
+            'unread_notifications_count': unread_count(request.user)
         }
     return {
         'unread_notifications_count': 0
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,148 @@
+"""
+Batched notification fan-out.
+
+``NotificationDispatcher`` collects notifications and writes them in one
+pass: a ``bulk_create`` for the rows, one UPDATE per distinct count for the
+unread counters, stream pushes after commit, and email tasks for recipients
+who opted in (``UserProfile.notification_email``), queued once per
+transaction when it commits. Titles and messages are passed in already
+rendered, so callers build them from objects they loaded up front instead
+of following foreign keys per row.
+"""
+import threading
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from core.events import notification_payload
+from core.pubsub import publish, wants
+from .models import Notification, UserProfile
+
+BATCH_SIZE = 500
+
+
+def _pk(value):
+    return getattr(value, 'pk', value)
+
+
+class NotificationDispatcher:
+    """Accumulate notifications with ``add`` and write them all with ``send``"""
+
+    def __init__(self, email=True):
+        self.email = email
+        self.pending = []
+
+    def add(self, recipient, notification_type, title, message, related_user=None, related_object_id=None):
+        """Queue one notification; users may be given as instances or ids"""
+        self.pending.append(Notification(
+            recipient_id=_pk(recipient),
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            related_user_id=_pk(related_user),
+            related_object_id=related_object_id,
+        ))
+
+    def __len__(self):
+        return len(self.pending)
+
+    def send(self):
+        """Write every queued notification and schedule delivery; returns the rows"""
+        notifications, self.pending = self.pending, []
+        if not notifications:
+            return []
+
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+            increment_unread(Counter(n.recipient_id for n in created))
+        transaction.on_commit(lambda: push_to_streams(created))
+        if self.email:
+            queue_emails([n.id for n in created])
+        return created
+
+
+class EmailBatch:
+    """
+    Notification ids to email, queued as tasks when the transaction commits.
+    Every ``add`` registers its own ``on_commit`` callback, so a rolled back
+    block drops exactly its ids; the first callback to run queues its part and
+    every later one, and the rest find nothing left to send.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def add(self, ids):
+        part = list(ids)
+        self.parts.append(part)
+        transaction.on_commit(lambda: self.flush(part))
+
+    def flush(self, part):
+        from .tasks import deliver_notification_emails
+        if _local.__dict__.get('email_batch') is self:
+            del _local.email_batch
+        # Parts added before this one whose callbacks never ran were rolled back
+        start = next((i for i, queued in enumerate(self.parts) if queued is part), None)
+        if start is None:
+            return
+        ids = [pk for queued in self.parts[start:] for pk in queued]
+        self.parts = []
+        for start in range(0, len(ids), BATCH_SIZE):
+            deliver_notification_emails.delay(ids[start:start + BATCH_SIZE])
+
+
+_local = threading.local()
+
+
+def queue_emails(ids):
+    """
+    Email the notifications ``ids``. Every call inside one transaction joins a
+    single batch whose tasks are queued on commit; outside a transaction the
+    batch is queued at once.
+    """
+    batch = getattr(_local, 'email_batch', None)
+    if batch is None:
+        batch = _local.email_batch = EmailBatch()
+    batch.add(ids)
+
+
+def increment_unread(per_user):
+    """Add {user_id: count} to the unread counters, one UPDATE per distinct count"""
+    by_count = {}
+    for user_id, count in per_user.items():
+        by_count.setdefault(count, []).append(user_id)
+    for count, user_ids in by_count.items():
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            UserProfile.objects.filter(user_id__in=user_ids[start:start + BATCH_SIZE]).update(
+                unread_notifications=F('unread_notifications') + count
+            )
+
+
+def push_to_streams(notifications):
+    """Publish new rows to any open streams, with one counter lookup for all recipients"""
+    listening = {n.recipient_id for n in notifications if wants(n.recipient_id)}
+    if not listening:
+        return
+    for notification in notifications:
+        if notification.recipient_id in listening:
+            publish(notification.recipient_id, 'notification', notification_payload(notification), notification.id)
+    unread = UserProfile.objects.filter(user_id__in=listening).values_list('user_id', 'unread_notifications')
+    for user_id, count in unread:
+        publish(user_id, 'counts', {'unread_count': count})
+
+
+def notify(recipient, notification_type, title, message, related_user=None, related_object_id=None):
+    """Send a single notification through the dispatcher"""
+    dispatcher = NotificationDispatcher()
+    dispatcher.add(recipient, notification_type, title, message, related_user, related_object_id)
+    return dispatcher.send()[0]
+
+
+def broadcast(users, notification_type, title, message):
+    """Notify every user in ``users`` (a queryset or iterable of users/ids)"""
+    dispatcher = NotificationDispatcher()
+    user_ids = users.values_list('id', flat=True) if hasattr(users, 'values_list') else users
+    for user_id in user_ids:
+        dispatcher.add(user_id, notification_type, title, message)
+    return len(dispatcher.send())
@@ -0,0 +1,30 @@
+from django.utils import timezone
+
+from core.pagination import keyset_queryset
+from core.queryplans import hot_query
+from .models import Notification
+
+
+@hot_query('notifications.inbox')
+def inbox():
+    return Notification.objects.filter(recipient_id=1).order_by('-created_at', '-id')[:21]
+
+
+@hot_query('notifications.inbox_older_page')
+def inbox_older_page():
+    return keyset_queryset(Notification.objects.filter(recipient_id=1), 'next', (timezone.now(), 1))[:21]
+
+
+@hot_query('notifications.inbox_newer_page')
+def inbox_newer_page():
+    return keyset_queryset(Notification.objects.filter(recipient_id=1), 'prev', (timezone.now(), 1))[:21]
+
+
+@hot_query('notifications.unread')
+def unread_inbox():
+    return Notification.objects.filter(recipient_id=1, is_read=False).order_by('-created_at', '-id')[:21]
+
+
+@hot_query('notifications.by_type')
+def inbox_by_type():
+    return Notification.objects.filter(recipient_id=1, notification_type='system').order_by('-created_at', '-id')[:21]
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import Notification
+from accounts.retention import archive_notifications
+
+class Command(BaseCommand):
+    help = 'Move old read notifications into the archive in small batches (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90),
+            help='Archive read notifications older than this many days (default: NOTIFICATION_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Notifications moved per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--collapse-threshold',
+            type=int,
+            default=3,
+            help='Collapse this many same-type notifications per user and month into one entry; 0 disables (default: 3)'
+        )
+        parser.add_argument(
+            '--to-files',
+            nargs='?',
+            const=str(getattr(settings, 'NOTIFICATION_ARCHIVE_DIR', 'archive')),
+            help='Write gzipped JSON-lines files per month to this directory instead of the archive table'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches to let other writers in (default: 0)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            help='Stop after this many batches'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many notifications would be archived'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        
+        if options['dry_run']:
+            cutoff = timezone.now() - timedelta(days=options['days'])
+            count = Notification.objects.filter(is_read=True, created_at__lt=cutoff).count()
+            self.stdout.write(f'{count} notifications would be archived')
+            return
+        
+        report = archive_notifications(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            collapse_threshold=options['collapse_threshold'],
+            directory=options['to_files'],
+            pause=options['pause'],
+            max_batches=options['max_batches'],
+        )
+        destination = options['to_files'] or 'the archive table'
+        self.stdout.write(
+            f"Moved {report['moved']} notifications as {report['written']} entries to {destination} "
+            f"in {report['batches']} batches (slowest batch {report['max_batch_seconds'] * 1000:.1f} ms)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archive finished in {report['seconds']:.2f}s"))
@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from accounts.dispatch import broadcast
+from accounts.models import Notification
+
+class Command(BaseCommand):
+    help = 'Send a notification to every active user, or to one department'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--title', required=True, help='Notification title')
+        parser.add_argument('--message', required=True, help='Notification message')
+        parser.add_argument(
+            '--type',
+            default='system',
+            choices=[choice for choice, _ in Notification.NOTIFICATION_TYPES],
+            help='Notification type (default: system)'
+        )
+        parser.add_argument('--department', help='Only notify students of this department code (e.g. CSE)')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['department']:
+            users = users.filter(profile__department__code__iexact=options['department'])
+            if not users.exists():
+                raise CommandError(f"No active users in department {options['department']}")
+        
+        sent = broadcast(users, options['type'], options['title'], options['message'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} notifications'))
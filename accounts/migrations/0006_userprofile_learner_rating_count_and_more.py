@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_userprofile_branch_alter_userprofile_department'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='learner_rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='learner_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='teacher_rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='teacher_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
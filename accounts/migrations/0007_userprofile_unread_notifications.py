@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_userprofile_learner_rating_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
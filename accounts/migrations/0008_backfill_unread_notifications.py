@@ -0,0 +1,27 @@
+# Generated manually to backfill the unread notification counters
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_unread_notifications(apps, schema_editor):
+    """Populate the counter that accounts.notifications maintains from now on"""
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    Notification = apps.get_model('accounts', 'Notification')
+    
+    counts = Notification.objects.filter(is_read=False).values('recipient_id').annotate(
+        unread=Count('id')
+    ).order_by()
+    for row in counts:
+        UserProfile.objects.filter(user_id=row['recipient_id']).update(unread_notifications=row['unread'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_userprofile_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_backfill_unread_notifications'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('skill_request', 'Skill Swap Request'), ('request_accepted', 'Request Accepted'), ('request_declined', 'Request Declined'), ('session_scheduled', 'Session Scheduled'), ('session_reminder', 'Session Reminder'), ('session_completed', 'Session Completed'), ('new_review', 'New Review'), ('system', 'System Notification')], max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('related_object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('original_id', models.PositiveIntegerField(help_text='Id of the (first) archived notification')),
+                ('collapsed_count', models.PositiveIntegerField(default=1, help_text='Number of notifications this row stands for')),
+                ('period', models.DateField(help_text='Month partition: first day of the month the notification was created')),
+                ('created_at', models.DateTimeField(help_text='Creation time of the (first) archived notification')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+                ('related_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'notification_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['recipient', '-created_at'], name='notif_archive_recipient_idx'), models.Index(fields=['period'], name='notif_archive_period_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='weekly_availability',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.CreateModel(
+            name='AvailabilityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField(help_text='00:00 means the end of the day')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_rules', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'availability_rule',
+                'ordering': ['weekday', 'start_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AvailabilityException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField(blank=True, help_text='Leave both times empty for the whole day', null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('is_available', models.BooleanField(default=False, help_text='Adds availability instead of removing it')),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='availability_exceptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'availability_exception',
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['user', 'date'], name='availability_exception_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_availability'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='calendar_feed_key',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -22,6 +22,10 @@ class UserProfile(models.Model):
     bio = models.TextField(max_length=500, blank=True, help_text="Tell others about yourself")
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
     availability = models.TextField(blank=True, help_text="Describe your general availability for skill-swap sessions")
+    # Weekly 15-minute slots from AvailabilityRule packed into bits, maintained by accounts.availability
+    weekly_availability = models.BinaryField(default=b'', blank=True, editable=False)
+    # Random secret signed into the calendar feed URL, issued and reset by skill_sessions.calendar
+    calendar_feed_key = models.CharField(max_length=32, blank=True, editable=False)
     is_verified = models.BooleanField(default=False, help_text="University email verification status")
     date_joined = models.DateTimeField(auto_now_add=True)
     last_active = models.DateTimeField(auto_now=True)
@@ -33,6 +37,13 @@ class UserProfile(models.Model):
     total_sessions_learned = models.PositiveIntegerField(default=0)
     average_rating_as_teacher = models.FloatField(default=0.0)
     average_rating_as_learner = models.FloatField(default=0.0)
+    # Running totals behind the averages, maintained by skill_sessions.ratings
+    teacher_rating_sum = models.PositiveIntegerField(default=0)
+    teacher_rating_count = models.PositiveIntegerField(default=0)
+    learner_rating_sum = models.PositiveIntegerField(default=0)
+    learner_rating_count = models.PositiveIntegerField(default=0)
+    # Unread notifications, maintained by accounts.notifications
+    unread_notifications = models.PositiveIntegerField(default=0)
     
     # Preferences
     prefer_in_person = models.BooleanField(default=True)
@@ -82,7 +93,7 @@ class Notification(models.Model):
         ('system', 'System Notification'),
     ]
     
-    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications', db_index=False)
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     title = models.CharField(max_length=200)
     message = models.TextField()
@@ -94,6 +105,80 @@ class Notification(models.Model):
     class Meta:
         ordering = ['-created_at']
         db_table = 'notification'
+        indexes = [
+            # Back the (created_at, id) keyset pages of a user's inbox, filtered or not by read state
+            models.Index(fields=['recipient', 'is_read', '-created_at', '-id'], name='notification_inbox_idx'),
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notification_recipient_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.recipient.username}"
+
+class NotificationArchive(models.Model):
+    """Old read notifications moved out of the live table by the archive_notifications command"""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    related_user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    related_object_id = models.PositiveIntegerField(null=True, blank=True)
+    original_id = models.PositiveIntegerField(help_text="Id of the (first) archived notification")
+    collapsed_count = models.PositiveIntegerField(default=1, help_text="Number of notifications this row stands for")
+    period = models.DateField(help_text="Month partition: first day of the month the notification was created")
+    created_at = models.DateTimeField(help_text="Creation time of the (first) archived notification")
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        db_table = 'notification_archive'
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_archive_recipient_idx'),
+            models.Index(fields=['period'], name='notif_archive_period_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} - {self.recipient.username} (archived)"
+
+class AvailabilityRule(models.Model):
+    """A recurring weekly span in which the user is available for sessions"""
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='availability_rules')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField(help_text="00:00 means the end of the day")
+    
+    class Meta:
+        ordering = ['weekday', 'start_time']
+        db_table = 'availability_rule'
+    
+    def __str__(self):
+        return f"{self.user.username}: {self.get_weekday_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+class AvailabilityException(models.Model):
+    """A one-off change to the weekly rules on a given date"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='availability_exceptions', db_index=False)
+    date = models.DateField()
+    start_time = models.TimeField(null=True, blank=True, help_text="Leave both times empty for the whole day")
+    end_time = models.TimeField(null=True, blank=True)
+    is_available = models.BooleanField(default=False, help_text="Adds availability instead of removing it")
+    reason = models.CharField(max_length=200, blank=True)
+    
+    class Meta:
+        ordering = ['date', 'start_time']
+        db_table = 'availability_exception'
+        indexes = [
+            models.Index(fields=['user', 'date'], name='availability_exception_idx'),
+        ]
+    
+    def __str__(self):
+        kind = 'available' if self.is_available else 'unavailable'
+        return f"{self.user.username}: {kind} on {self.date}"
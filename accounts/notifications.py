@@ -0,0 +1,49 @@
+"""
+Denormalized unread-notification counter.
+
+``UserProfile.unread_notifications`` replaces ``COUNT(*)`` queries over the
+notification table. Single-row saves and deletes adjust it through the
+``Notification`` signals; bulk read-state changes, which bypass signals, must
+go through ``set_read_state`` so the counter stays exact.
+"""
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from core.events import publish_counts
+from .models import Notification, UserProfile
+
+
+def adjust_unread(user_id, delta, publish=True):
+    """Add ``delta`` to a user's unread counter, never going below zero"""
+    if delta:
+        UserProfile.objects.filter(user_id=user_id).update(
+            unread_notifications=Greatest(F('unread_notifications') + delta, Value(0))
+        )
+        if publish:
+            publish_counts(user_id)
+
+
+def unread_count(user):
+    """The user's unread notification count, read from their profile"""
+    try:
+        return user.profile.unread_notifications
+    except UserProfile.DoesNotExist:
+        return 0
+
+
+def set_read_state(queryset, is_read=True):
+    """Bulk mark ``queryset`` read or unread and adjust each recipient's counter"""
+    changing = queryset.filter(is_read=not is_read)
+    per_user = list(changing.values('recipient_id').annotate(changed=Count('id')).order_by())
+    updated = changing.update(is_read=is_read)
+    for row in per_user:
+        adjust_unread(row['recipient_id'], row['changed'] if not is_read else -row['changed'])
+    return updated
+
+
+def mark_all_read(user):
+    """Mark every unread notification of ``user`` as read"""
+    updated = Notification.objects.filter(recipient=user, is_read=False).update(is_read=True)
+    adjust_unread(user.pk, -updated)
+    return updated
+
@@ -0,0 +1,134 @@
+"""
+Notification retention.
+
+Read notifications older than the retention window are moved out of the live
+``notification`` table in short batches, into ``NotificationArchive`` or into
+gzip-compressed JSON-lines files with one file per month partition. Within a
+batch, runs of the same notification type for one recipient in the same
+month are collapsed into a single archive entry ("5 Skill Swap Request
+notifications"). Every batch is its own transaction, so SQLite's write lock
+is only held for one batch at a time.
+"""
+import gzip
+import json
+import os
+import time
+from datetime import timedelta
+from itertools import groupby
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+
+COLLAPSED_PREVIEW = 5
+
+
+def month_partition(moment):
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def archive_entry(notification):
+    return {
+        'recipient_id': notification.recipient_id,
+        'notification_type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'related_user_id': notification.related_user_id,
+        'related_object_id': notification.related_object_id,
+        'original_id': notification.id,
+        'collapsed_count': 1,
+        'period': month_partition(notification.created_at),
+        'created_at': notification.created_at,
+    }
+
+
+def collapsed_entry(group):
+    """One entry standing for a run of same-type notifications"""
+    first, last = group[0], group[-1]
+    label = dict(Notification.NOTIFICATION_TYPES).get(first.notification_type, first.notification_type)
+    lines = [f'- {notification.message}' for notification in group[:COLLAPSED_PREVIEW]]
+    if len(group) > COLLAPSED_PREVIEW:
+        lines.append(f'- and {len(group) - COLLAPSED_PREVIEW} more')
+    start = timezone.localtime(first.created_at).strftime('%b %d')
+    end = timezone.localtime(last.created_at).strftime('%b %d, %Y')
+    return {
+        **archive_entry(first),
+        'title': f'{len(group)} {label} notifications',
+        'message': f'Between {start} and {end}:\n' + '\n'.join(lines),
+        'related_user_id': None,
+        'related_object_id': None,
+        'collapsed_count': len(group),
+    }
+
+
+def collapse(notifications, threshold):
+    """
+    Turn a batch of notifications into archive entries, collapsing groups of
+    at least ``threshold`` with the same recipient, type and month (0 disables).
+    """
+    def key(notification):
+        return notification.recipient_id, notification.notification_type, month_partition(notification.created_at)
+
+    entries = []
+    for _, group in groupby(sorted(notifications, key=lambda n: (key(n), n.id)), key=key):
+        group = list(group)
+        if threshold and len(group) >= threshold:
+            entries.append(collapsed_entry(group))
+        else:
+            entries.extend(archive_entry(notification) for notification in group)
+    return entries
+
+
+def write_to_table(entries):
+    NotificationArchive.objects.bulk_create([NotificationArchive(**entry) for entry in entries])
+
+
+def write_to_files(entries, directory):
+    """Append entries to notifications-YYYY-MM.jsonl.gz files, one per partition"""
+    os.makedirs(directory, exist_ok=True)
+    for period, group in groupby(sorted(entries, key=lambda e: e['period']), key=lambda e: e['period']):
+        path = os.path.join(directory, f'notifications-{period:%Y-%m}.jsonl.gz')
+        # Appending adds a gzip member; readers decompress members transparently
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for entry in group:
+                archive.write(json.dumps(entry, default=str) + '\n')
+
+
+def archive_notifications(days, batch_size=1000, collapse_threshold=3, directory=None, pause=0.0, max_batches=None):
+    """
+    Move read notifications older than ``days`` out of the live table.
+
+    Returns a report with rows moved, archive entries written, batches run and
+    timings. Batches walk the primary key so each one is an index range scan.
+    """
+    started = time.monotonic()
+    cutoff = timezone.now() - timedelta(days=days)
+    eligible = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by('id')
+    report = {'moved': 0, 'written': 0, 'batches': 0, 'max_batch_seconds': 0.0}
+
+    last_id = 0
+    while max_batches is None or report['batches'] < max_batches:
+        batch_started = time.monotonic()
+        with transaction.atomic():
+            batch = list(eligible.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            entries = collapse(batch, collapse_threshold)
+            if directory:
+                write_to_files(entries, directory)
+            else:
+                write_to_table(entries)
+            Notification.objects.filter(id__in=[notification.id for notification in batch]).delete()
+
+        report['moved'] += len(batch)
+        report['written'] += len(entries)
+        report['batches'] += 1
+        report['max_batch_seconds'] = max(report['max_batch_seconds'], time.monotonic() - batch_started)
+        if pause:
+            # Let web requests take the write lock between batches
+            time.sleep(pause)
+
+    report['seconds'] = time.monotonic() - started
+    return report
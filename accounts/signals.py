@@ -0,0 +1,40 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from core.events import publish_notification
+from .models import AvailabilityRule, Notification
+from .notifications import adjust_unread
+from .availability import rebuild_weekly_availability, rebuilds_deferred
+
+
+@receiver(pre_save, sender=Notification)
+def remember_previous_read_state(sender, instance, **kwargs):
+    instance._previous_is_read = None
+    if instance.pk:
+        instance._previous_is_read = sender.objects.filter(pk=instance.pk).values_list('is_read', flat=True).first()
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_count(sender, instance, created, **kwargs):
+    """Keep the unread counter current and push changes to open notification streams"""
+    if created:
+        if not instance.is_read:
+            adjust_unread(instance.recipient_id, 1, publish=False)
+        publish_notification(instance)
+        return
+    previous = getattr(instance, '_previous_is_read', None)
+    if previous is not None and previous != instance.is_read:
+        adjust_unread(instance.recipient_id, -1 if instance.is_read else 1)
+
+
+@receiver(post_delete, sender=Notification)
+def remove_unread_count(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.recipient_id, -1)
+
+
+@receiver(post_save, sender=AvailabilityRule)
+@receiver(post_delete, sender=AvailabilityRule)
+def update_weekly_availability(sender, instance, **kwargs):
+    """Repack the user's weekly availability bitmap"""
+    if not rebuilds_deferred():
+        rebuild_weekly_availability(instance.user_id)
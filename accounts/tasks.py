@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+
+from core.taskqueue import task
+from .models import Notification
+
+
+@task(max_attempts=5, retry_delay=60)
+def send_email(subject, message, recipient_list):
+    """Deliver an email outside the request"""
+    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list, fail_silently=False)
+
+
+@task(max_attempts=5, retry_delay=60)
+def deliver_notification_emails(notification_ids):
+    """Email a batch of notifications to recipients who opted in, over one connection"""
+    notifications = (Notification.objects
+                     .filter(id__in=notification_ids,
+                             recipient__profile__notification_email=True)
+                     .exclude(recipient__email='')
+                     .select_related('recipient'))
+    messages = [
+        EmailMessage(n.title, n.message, settings.DEFAULT_FROM_EMAIL, [n.recipient.email])
+        for n in notifications
+    ]
+    if messages:
+        with get_connection() as connection:
+            connection.send_messages(messages)
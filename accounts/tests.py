@@ -1,3 +1,245 @@
-from django.test import TestCase
+import json
+from datetime import date, datetime, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from skill_sessions.models import SkillSwapRequest, SkillSwapSession
+from skills.models import OfferedSkill, Skill, SkillCategory
+
+from .availability import (
+    FULL_WEEK, SLOTS_PER_DAY, SLOTS_PER_WEEK, datetime_slot, day_mask, decode, encode, free_runs, span_mask,
+    week_masks,
+)
+from .dispatch import notify
+from .models import AvailabilityException, AvailabilityRule, Notification, UserProfile
+from .notifications import mark_all_read, set_read_state
+
+MONDAY = date(2030, 1, 7)
+
+
+def slot(weekday, hour, minute=0):
+    return weekday * SLOTS_PER_DAY + (hour * 60 + minute) // 15
+
+
+def make_user(username):
+    user = User.objects.create_user(username, f'{username}@example.edu', 'password')
+    UserProfile.objects.create(user=user, university_email=f'{username}@example.edu')
+    return user
+
+
+def book_session(teacher, learner, start, minutes=60, status='scheduled'):
+    category, _ = SkillCategory.objects.get_or_create(name='Programming')
+    skill, _ = Skill.objects.get_or_create(name='Python', category=category)
+    offered, _ = OfferedSkill.objects.get_or_create(user=teacher, skill=skill, defaults={'proficiency_level': 'expert'})
+    request = SkillSwapRequest.objects.create(
+        requester=learner, recipient=teacher, offered_skill=offered, status='accepted',
+    )
+    return SkillSwapSession.objects.create(
+        request=request, teacher=teacher, learner=learner, skill=skill,
+        scheduled_date=start, duration_minutes=minutes, status=status,
+    )
+
+
+def local(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class SlotMaskTests(SimpleTestCase):
+    def test_day_mask_covers_whole_slots_inside_the_span(self):
+        self.assertEqual(day_mask(0, time(9), time(10)), span_mask(slot(0, 9), slot(0, 10)))
+        # 09:05-09:50 only fully contains 09:15-09:45
+        self.assertEqual(day_mask(0, time(9, 5), time(9, 50)), span_mask(slot(0, 9, 15), slot(0, 9, 45)))
+
+    def test_midnight_end_runs_to_the_end_of_the_day(self):
+        self.assertEqual(day_mask(1, time(23), time(0)), span_mask(slot(1, 23), slot(2, 0)))
+        self.assertEqual(day_mask(6, time(0), time(0)), span_mask(slot(6, 0), SLOTS_PER_WEEK))
+        self.assertEqual(day_mask(6), day_mask(6, time(0), time(0)))
+
+    def test_inverted_span_is_empty(self):
+        self.assertEqual(day_mask(2, time(10), time(9)), 0)
+        self.assertEqual(span_mask(5, 5), 0)
+
+    def test_span_mask_is_clamped_to_the_week(self):
+        self.assertEqual(span_mask(-4, 2), 0b11)
+        self.assertEqual(span_mask(SLOTS_PER_WEEK - 1, SLOTS_PER_WEEK + 10), 1 << (SLOTS_PER_WEEK - 1))
+
+    def test_encode_round_trips(self):
+        for mask in (0, 1, FULL_WEEK, day_mask(3, time(8), time(17))):
+            self.assertEqual(decode(encode(mask)), mask)
+        self.assertIsNone(decode(b''))
+
+    def test_free_runs(self):
+        mask = span_mask(2, 4) | span_mask(10, 16) | span_mask(SLOTS_PER_WEEK - 3, SLOTS_PER_WEEK)
+        self.assertEqual(free_runs(mask), [(2, 2), (10, 6), (SLOTS_PER_WEEK - 3, 3)])
+        self.assertEqual(free_runs(mask, min_slots=3), [(10, 6), (SLOTS_PER_WEEK - 3, 3)])
+        self.assertEqual(free_runs(mask, min_slots=7), [])
+        self.assertEqual(free_runs(0), [])
+
+    def test_datetime_slot_rounds_partial_slots(self):
+        self.assertEqual(datetime_slot(MONDAY, local(MONDAY, 9, 10)), slot(0, 9))
+        self.assertEqual(datetime_slot(MONDAY, local(MONDAY, 9, 10), round_up=True), slot(0, 9, 15))
+        self.assertEqual(datetime_slot(MONDAY, local(MONDAY + timedelta(days=7), 0)), SLOTS_PER_WEEK)
+
+
+class WeekMasksTests(TestCase):
+    def setUp(self):
+        self.tutor = make_user('tutor')
+        self.learner = make_user('learner')
+        AvailabilityRule.objects.create(user=self.tutor, weekday=0, start_time=time(9), end_time=time(12))
+
+    def test_rules_are_packed_into_the_profile(self):
+        stored = UserProfile.objects.get(user=self.tutor).weekly_availability
+        self.assertEqual(decode(stored), span_mask(slot(0, 9), slot(0, 12)))
+        self.assertEqual(bytes(UserProfile.objects.get(user=self.learner).weekly_availability), b'')
+
+    def test_users_without_rules_get_the_default(self):
+        masks = week_masks([self.learner.id], MONDAY, default=FULL_WEEK)
+        self.assertEqual(masks[self.learner.id], FULL_WEEK)
+
+    def test_exceptions_add_and_remove_time(self):
+        AvailabilityException.objects.create(
+            user=self.tutor, date=MONDAY, start_time=time(10), end_time=time(11),
+        )
+        AvailabilityException.objects.create(
+            user=self.tutor, date=MONDAY + timedelta(days=2), is_available=True,
+        )
+        # Another week's exception doesn't apply
+        AvailabilityException.objects.create(user=self.tutor, date=MONDAY + timedelta(days=7))
+        expected = span_mask(slot(0, 9), slot(0, 10)) | span_mask(slot(0, 11), slot(0, 12)) | day_mask(2)
+        self.assertEqual(week_masks([self.tutor.id], MONDAY)[self.tutor.id], expected)
+
+    def test_booked_sessions_are_not_free(self):
+        book_session(self.tutor, self.learner, local(MONDAY, 10, 10), minutes=30)
+        book_session(self.tutor, self.learner, local(MONDAY, 9), status='cancelled')
+        masks = week_masks([self.tutor.id, self.learner.id], MONDAY, default=FULL_WEEK)
+        # 10:10-10:40 blocks every slot it touches, 10:00-10:45
+        booked = span_mask(slot(0, 10), slot(0, 10, 45))
+        self.assertEqual(masks[self.tutor.id], span_mask(slot(0, 9), slot(0, 12)) & ~booked)
+        self.assertEqual(masks[self.learner.id], FULL_WEEK & ~booked)
+
+    def test_three_queries_for_any_number_of_users(self):
+        users = [make_user(f'user{i}') for i in range(5)]
+        with self.assertNumQueries(3):
+            week_masks([user.id for user in users], MONDAY)
+
+
+class AvailabilityAPITests(TestCase):
+    def setUp(self):
+        self.user = make_user('tutor')
+        self.client.force_login(self.user)
+        self.url = reverse('api:availability')
+
+    def put(self, rules):
+        return self.client.put(self.url, json.dumps({'rules': rules}), content_type='application/json')
+
+    def test_replaces_rules_and_rebuilds_once(self):
+        for weekday in range(3):
+            AvailabilityRule.objects.create(user=self.user, weekday=weekday, start_time=time(9), end_time=time(10))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.put([{'weekday': 4, 'start': '22:00', 'end': '00:00'}])
+        self.assertEqual(response.status_code, 200)
+        rebuilds = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "userprofile"')]
+        self.assertEqual(len(rebuilds), 1)
+        stored = UserProfile.objects.get(user=self.user).weekly_availability
+        self.assertEqual(decode(stored), span_mask(slot(4, 22), slot(5, 0)))
+
+    def test_rejects_spans_ending_before_they_start(self):
+        for start, end in (('10:00', '09:00'), ('10:00', '10:00')):
+            with self.subTest(start=start, end=end):
+                self.assertEqual(self.put([{'weekday': 0, 'start': start, 'end': end}]).status_code, 400)
+        self.assertFalse(AvailabilityRule.objects.exists())
+
+    def test_rejects_bad_weekdays(self):
+        self.assertEqual(self.put([{'weekday': 7, 'start': '09:00', 'end': '10:00'}]).status_code, 400)
+
+
+class UnreadCounterTests(TestCase):
+    """The stored unread counter always equals a fresh COUNT of unread rows"""
+
+    def setUp(self):
+        self.user = make_user('student')
+        self.other = make_user('other')
+        self.notifications = [self.notify(self.user) for _ in range(4)] + [self.notify(self.other)]
+
+    def notify(self, user, **fields):
+        return Notification.objects.create(
+            recipient=user, notification_type='system', title='Hello', message='Hi', **fields
+        )
+
+    def assertCounterExact(self):
+        for user in (self.user, self.other):
+            stored = UserProfile.objects.get(user=user).unread_notifications
+            self.assertEqual(stored, Notification.objects.filter(recipient=user, is_read=False).count(), user.username)
+
+    def test_single_row_changes(self):
+        self.notify(self.user, is_read=True)
+        self.assertEqual(UserProfile.objects.get(user=self.user).unread_notifications, 4)
+        first, second = self.notifications[:2]
+        first.is_read = True
+        first.save()
+        first.save()  # Saving again without a change leaves the counter alone
+        self.assertCounterExact()
+        first.is_read = False
+        first.save()
+        second.delete()
+        Notification.objects.filter(recipient=self.user, is_read=True).get().delete()
+        self.assertCounterExact()
+
+    def test_mark_all_read(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.post(reverse('accounts:mark_all_notifications_read')).status_code, 200)
+        self.assertEqual(UserProfile.objects.get(user=self.user).unread_notifications, 0)
+        self.assertCounterExact()
+        self.assertEqual(mark_all_read(self.user), 0)
+        self.assertCounterExact()
+
+    def test_bulk_read_state_changes(self):
+        set_read_state(Notification.objects.filter(pk__in=[n.pk for n in self.notifications[1:]]))
+        self.assertCounterExact()
+        set_read_state(Notification.objects.all(), is_read=False)
+        self.assertCounterExact()
+        self.client.force_login(self.user)
+        self.client.post(reverse('accounts:mark_all_notifications_read'))
+        self.client.delete(reverse('accounts:delete_read_notifications'))
+        self.assertCounterExact()
+
+
+@mock.patch('accounts.tasks.deliver_notification_emails.delay')
+class EmailBatchTests(TestCase):
+    """Email tasks are queued once per committed transaction, for committed rows only"""
+
+    def setUp(self):
+        self.user = make_user('student')
+
+    def notify(self):
+        return notify(self.user, 'system', 'Hello', 'Hi').id
+
+    def test_one_task_per_transaction(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            ids = [self.notify(), self.notify()]
+            with transaction.atomic():
+                ids.append(self.notify())
+            delay.assert_not_called()
+        delay.assert_called_once_with(ids)
+
+    def test_rolled_back_ids_are_dropped(self, delay):
+        class Abort(Exception):
+            pass
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.notify()
+                    raise Abort
+            except Abort:
+                pass
+        delay.assert_not_called()
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = self.notify()
+        delay.assert_called_once_with([kept])
@@ -6,7 +6,6 @@ from django.contrib import messages
 from django.views.generic import CreateView, UpdateView, DetailView, TemplateView
 from django.urls import reverse_lazy
 from django.http import HttpResponseRedirect, JsonResponse
-from django.core.mail import send_mail
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.sites.shortcuts import get_current_site
@@ -15,8 +14,12 @@ from django.conf import settings
 from django.views import View
 from django.views.decorators.http import require_http_methods
 from core.models import Department, Branch
+from core.pagination import paginate
 
 from .models import UserProfile, Notification
+from .tasks import send_email
+from .dispatch import notify
+from .notifications import mark_all_read, unread_count
 from .forms import UserProfileForm, ForgotPasswordForm, OTPVerificationForm, PasswordResetForm
 
 # Create your views here.
@@ -146,13 +149,11 @@ class ForgotPasswordView(View):
             otp = get_random_string(6, allowed_chars='0123456789')
             request.session['reset_email'] = email
             request.session['reset_otp'] = otp
-            # Send OTP via email (console backend for now)
-            send_mail(
+            # Send OTP via email from the task worker
+            send_email.delay(
                 'Your OTP for Password Reset',
                 f'Your OTP is: {otp}',
-                settings.DEFAULT_FROM_EMAIL,
                 [email],
-                fail_silently=False,
             )
             messages.success(request, 'An OTP has been sent to your email.')
             return redirect('accounts:verify_otp')
@@ -276,7 +277,7 @@ def user_profile_details(request, user_id):
 @login_required
 def notifications_view(request):
     """View and manage user notifications"""
-    notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')
+    notifications = Notification.objects.filter(recipient=request.user)
     
     # Apply filters if any
     filter_type = request.GET.get('filter')
@@ -286,21 +287,15 @@ def notifications_view(request):
         else:
             notifications = notifications.filter(notification_type=filter_type)
     
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(notifications, 10)  # Show 10 notifications per page
-    page_number = request.GET.get('page')
-    notifications_page = paginator.get_page(page_number)
-    
-    unread_count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-    total_count = Notification.objects.filter(recipient=request.user).count()
+    # Keyset pagination: no COUNT(*) or OFFSET, so deep pages cost the same as the first
+    notifications_page = paginate(notifications, request.GET.get('cursor'), page_size=10)
     
     context = {
         'notifications': notifications_page,
-        'unread_count': unread_count,
-        'total_count': total_count,
-        'has_more': notifications_page.has_next(),
-        'next_page': notifications_page.next_page_number() if notifications_page.has_next() else None,
+        'unread_count': unread_count(request.user),
+        'has_more': notifications_page.has_next,
+        'next_cursor': notifications_page.next_cursor,
+        'previous_cursor': notifications_page.previous_cursor,
     }
     
     return render(request, 'accounts/notifications.html', context)
@@ -335,7 +330,7 @@ def delete_notification(request, notification_id):
 @require_http_methods(["POST"])
 def mark_all_notifications_read(request):
     """Mark all notifications as read for the current user"""
-    Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    mark_all_read(request.user)
     return JsonResponse({'success': True, 'message': 'All notifications marked as read'})
 
 
@@ -348,12 +343,5 @@ def delete_read_notifications(request):
 
 
 def create_notification(recipient, notification_type, title, message, related_user=None, related_object_id=None):
-    """Utility function to create notifications"""
-    return Notification.objects.create(
-        recipient=recipient,
-        notification_type=notification_type,
-        title=title,
-        message=message,
-        related_user=related_user,
-        related_object_id=related_object_id
-    )
+    """Utility function to create a notification; email delivery happens in a batch task"""
+    return notify(recipient, notification_type, title, message, related_user, related_object_id)
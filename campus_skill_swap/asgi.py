@@ -2,6 +2,9 @@
 ASGI config for campus_skill_swap project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project through it (e.g. ``uvicorn campus_skill_swap.asgi:application``)
+so the notification stream holds an idle coroutine per client rather than a
+worker thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +17,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'campus_skill_swap.settings')
 
 application = get_asgi_application()
+
+# Load per-worker in-memory indexes before the first request needs them
+from skills.autocomplete import warm_autocomplete
+warm_autocomplete()
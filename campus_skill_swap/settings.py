@@ -70,6 +70,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.notifications_context',
             ],
         },
     },
@@ -85,6 +86,10 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Wait for a busy write lock instead of failing immediately
+            'timeout': 20,
+        },
     }
 }
 
@@ -159,6 +164,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
 }
 
 # Email settings (for university email validation)
@@ -168,3 +174,71 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
+
+# Skill matching
+SKILL_INDEX_TTL = 300  # Seconds before a worker rebuilds its in-memory skill index
+SKILL_TREND_HALF_LIFE_DAYS = 14  # Age at which an activity event counts half towards a skill's trend
+
+# Caching
+# The local tier (core.cache) is a per-process LRU; the shared tier holds the
+# version counters, so invalidations reach every web worker, runworker and
+# management command. It defaults to a table in the main database (created by
+# core's migrations); SHARED_CACHE may pick "file" or "redis" instead, or
+# "none" for a single process, where other processes' changes show up only
+# after LOCAL_ONLY_CACHE_TIMEOUT.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+SHARED_CACHE = os.environ.get('SHARED_CACHE', 'db')
+if SHARED_CACHE == 'db':
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'shared_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+elif SHARED_CACHE == 'file':
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+    }
+elif SHARED_CACHE == 'redis':
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    }
+LOCAL_ONLY_CACHE_TIMEOUT = 30  # Seconds a value is kept when there is no shared tier
+LOCAL_CACHE_MAX_ENTRIES = 1024
+
+# Background tasks (core.taskqueue, run with `manage.py runworker`)
+TASKS_EAGER = os.environ.get('TASKS_EAGER', '') == '1'  # Run tasks in-process on commit, e.g. in tests
+TASK_WORKERS = 4
+TASK_LOCK_TIMEOUT = 600  # Seconds before a task claimed by a dead worker is requeued
+TASK_RESULT_TTL = 86400  # Seconds to keep succeeded tasks
+
+# Notification stream (server-sent events, served through asgi.py)
+# "local" delivers within one process, "database" also polls for rows written by
+# task workers, "redis" fans out through Redis pub/sub.
+PUBSUB_BACKEND = os.environ.get('PUBSUB_BACKEND', 'database')
+PUBSUB_POLL_INTERVAL = 1.0  # Seconds between polls with the database backend
+PUBSUB_REDIS_URL = os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/2')
+NOTIFICATION_STREAM_HEARTBEAT = 15  # Seconds between keep-alive comments on idle streams
+
+# Notification retention (archive_notifications command)
+NOTIFICATION_RETENTION_DAYS = 90  # Read notifications older than this leave the live table
+NOTIFICATION_ARCHIVE_DIR = BASE_DIR / 'archive' / 'notifications'  # Used with --to-files
+
+# Session scheduling (skill_sessions.scheduling)
+SESSION_SLOT_MINUTES = 15  # Suggested session start times are aligned to this many minutes
+SESSION_SCHEDULING_HORIZON_DAYS = 30  # How far ahead to look for a slot free for both participants
+
+# Calendar export (skill_sessions.calendar)
+CALENDAR_PAST_DAYS = 90  # Default range of feeds and the calendar page: this far back...
+CALENDAR_FUTURE_DAYS = 365  # ...to this far ahead
+CALENDAR_MAX_RANGE_DAYS = 731  # Longest ?start=&end= range a client may ask for
+CALENDAR_SYNC_RETENTION_DAYS = 30  # Sync tokens older than this need a full refetch
+
+# Skill autocomplete (skills.autocomplete)
+SKILL_AUTOCOMPLETE_TTL = 300  # Seconds before a worker reloads its autocomplete index in the background
+SKILL_AUTOCOMPLETE_MAX_AGE = 60  # Seconds browsers may reuse an autocomplete response
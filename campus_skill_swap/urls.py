@@ -30,6 +30,7 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('skills/', include('skills.urls')),
     path('sessions/', include('skill_sessions.urls')),
+    path('api/v1/', include('core.api_v1_urls')),
     path('api/', include('core.api_urls')),
 ]
 
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'campus_skill_swap.settings')
 
 application = get_wsgi_application()
+
+# Load per-worker in-memory indexes before the first request needs them
+from skills.autocomplete import warm_autocomplete
+warm_autocomplete()
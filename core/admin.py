@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Department, Branch
+from .models import Department, Branch, Task
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
@@ -19,3 +19,11 @@ class BranchAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('department')
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'attempts', 'max_attempts', 'run_at', 'updated_at']
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'last_error']
+    readonly_fields = ['created_at', 'updated_at', 'locked_at']
+    ordering = ['-created_at']
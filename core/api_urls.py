@@ -7,6 +7,7 @@ urlpatterns = [
     # Notification APIs
     path('notifications/', api_views.NotificationListAPI.as_view(), name='notification_list'),
     path('notifications/unread-count/', api_views.UnreadNotificationCountAPI.as_view(), name='unread_count'),
+    path('notifications/stream/', api_views.notification_stream, name='notification_stream'),
     
     # Search APIs
     path('search/users/', api_views.UserSearchAPI.as_view(), name='user_search'),
@@ -14,6 +15,14 @@ urlpatterns = [
     
     # Skill matching API
     path('matching/suggestions/', api_views.SkillMatchingSuggestionsAPI.as_view(), name='matching_suggestions'),
+    path('matching/cycles/', api_views.SkillSwapCyclesAPI.as_view(), name='matching_cycles'),
+    
+    # Availability APIs
+    path('availability/', api_views.AvailabilityAPI.as_view(), name='availability'),
+    path('availability/tutors/', api_views.FreeTutorsAPI.as_view(), name='free_tutors'),
+    
+    # Calendar API
+    path('calendar/events/', api_views.CalendarEventsAPI.as_view(), name='calendar_events'),
     
     # Quick actions
     path('user/<int:user_id>/send-request/', api_views.SendSkillRequestAPI.as_view(), name='send_request'),
@@ -0,0 +1,19 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import viewsets
+
+app_name = 'api_v1'
+
+router = DefaultRouter()
+router.register('skills', viewsets.SkillViewSet, basename='skill')
+router.register('offers', viewsets.OfferedSkillViewSet, basename='offer')
+router.register('desires', viewsets.DesiredSkillViewSet, basename='desire')
+router.register('requests', viewsets.SkillSwapRequestViewSet, basename='request')
+router.register('sessions', viewsets.SkillSwapSessionViewSet, basename='session')
+router.register('reviews', viewsets.SessionReviewViewSet, basename='review')
+router.register('notifications', viewsets.NotificationViewSet, basename='notification')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
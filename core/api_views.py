@@ -1,16 +1,18 @@
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
 
 class NotificationListAPI(LoginRequiredMixin, ListView):
     """API for listing user notifications"""
     
     def get(self, request, *args, **kwargs):
         from accounts.models import Notification
-        notifications = Notification.objects.filter(recipient=request.user).order_by('-created_at')[:20]
-        unread_count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+        from accounts.notifications import unread_count
+        from core.pagination import paginate
+        notifications = paginate(
+            Notification.objects.filter(recipient=request.user), request.GET.get('cursor'), page_size=20
+        )
         
         data = []
         for n in notifications:
@@ -25,7 +27,8 @@ class NotificationListAPI(LoginRequiredMixin, ListView):
         
         return JsonResponse({
             'notifications': data,
-            'unread_count': unread_count
+            'unread_count': unread_count(request.user),
+            'next_cursor': notifications.next_cursor,
         })
 
 
@@ -33,9 +36,36 @@ class UnreadNotificationCountAPI(LoginRequiredMixin, ListView):
     """API for getting unread notification count"""
     
     def get(self, request, *args, **kwargs):
-        from accounts.models import Notification
-        count = Notification.objects.filter(recipient=request.user, is_read=False).count()
-        return JsonResponse({'count': count})
+        from accounts.notifications import unread_count
+        return JsonResponse({'count': unread_count(request.user)})
+
+
+async def notification_stream(request):
+    """
+    Server-sent events stream of new notifications and counter changes,
+    available when served through ASGI (campus_skill_swap.asgi). Clients
+    resume with the Last-Event-ID header (or ?last_event_id= when
+    reconnecting manually) and fall back to polling if the stream fails.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from .events import event_stream
+    
+    if not isinstance(request, ASGIRequest):
+        # A WSGI server would buffer the endless stream and hold a worker
+        # forever; 204 tells EventSource not to reconnect, so clients poll
+        return HttpResponse(status=204)
+    
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id', '')
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    response = StreamingHttpResponse(event_stream(user.id, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 class UserSearchAPI(LoginRequiredMixin, ListView):
@@ -46,13 +76,10 @@ class UserSearchAPI(LoginRequiredMixin, ListView):
         if not query:
             return JsonResponse({'results': []})
         
-        from accounts.models import UserProfile
-        users = UserProfile.objects.filter(
-            Q(user__username__icontains=query) |
-            Q(user__first_name__icontains=query)
-        )[:10]
+        from core.search import search
+        users = search(query, ('user',))['user']
         
-        data = [{'id': u.user.id, 'username': u.user.username} for u in users]
+        data = [{'id': u.id, 'username': u.username} for u in users]
         return JsonResponse({'results': data})
 
 
@@ -64,9 +91,12 @@ class SkillSearchAPI(LoginRequiredMixin, ListView):
         if not query:
             return JsonResponse({'results': []})
         
-        from skills.models import Skill
-        skills = Skill.objects.filter(name__icontains=query)[:10]
+        from core.search import search
+        from skills.fuzzy import did_you_mean
+        skills = search(query, ('skill',))['skill']
         data = [{'id': s.id, 'name': s.name} for s in skills]
+        if not data:
+            return JsonResponse({'results': [], 'did_you_mean': did_you_mean(query)})
         return JsonResponse({'results': data})
 
 
@@ -74,11 +104,177 @@ class SkillMatchingSuggestionsAPI(LoginRequiredMixin, ListView):
     """API for getting skill matching suggestions"""
     
     def get(self, request, *args, **kwargs):
-        return JsonResponse({'results': []})
+        from skills.models import SkillMatch
+        from skills.index import get_skill_index
+        from django.db.models import Case, When, BooleanField
+        
+        # Mutual partners come from a set intersection on the in-memory index
+        mutual_ids = get_skill_index().mutual_partners(request.user.id)
+        
+        matches = SkillMatch.objects.filter(
+            learner=request.user,
+            is_dismissed=False
+        ).annotate(
+            mutual=Case(
+                When(teacher_id__in=mutual_ids, then=True),
+                default=False,
+                output_field=BooleanField()
+            )
+        ).select_related('teacher', 'offered_skill__skill').order_by('-mutual', '-compatibility_score')[:20]
+        
+        data = [{
+            'id': m.id,
+            'teacher_id': m.teacher_id,
+            'teacher': m.teacher.get_full_name() or m.teacher.username,
+            'skill_id': m.offered_skill.skill_id,
+            'skill': m.offered_skill.skill.name,
+            'offered_skill_id': m.offered_skill_id,
+            'compatibility_score': m.compatibility_score,
+            'is_mutual': m.mutual,
+        } for m in matches]
+        return JsonResponse({'results': data, 'mutual_user_ids': sorted(mutual_ids)})
+
+
+class SkillSwapCyclesAPI(LoginRequiredMixin, ListView):
+    """API for multi-person swap chains (A teaches B, B teaches C, C teaches A)"""
+    
+    def get(self, request, *args, **kwargs):
+        from skills.cycles import get_user_cycles
+        return JsonResponse({'results': get_user_cycles(request.user.id)})
+
+
+class AvailabilityAPI(LoginRequiredMixin, ListView):
+    """API for reading and replacing the user's weekly availability rules"""
+    
+    def get(self, request, *args, **kwargs):
+        from accounts.models import AvailabilityRule
+        rules = AvailabilityRule.objects.filter(user=request.user)
+        return JsonResponse({'rules': [{
+            'weekday': rule.weekday,
+            'start': rule.start_time.strftime('%H:%M'),
+            'end': rule.end_time.strftime('%H:%M'),
+        } for rule in rules]})
+    
+    def put(self, request, *args, **kwargs):
+        import json
+        from datetime import time
+        from django.db import transaction
+        from accounts.models import AvailabilityRule
+        from accounts.availability import rebuild_once
+        
+        try:
+            rules = [AvailabilityRule(
+                user=request.user,
+                weekday=int(rule['weekday']),
+                start_time=time.fromisoformat(rule['start']),
+                end_time=time.fromisoformat(rule['end']),
+            ) for rule in json.loads(request.body)['rules']]
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': 'Expected {"rules": [{"weekday": 0-6, "start": "HH:MM", "end": "HH:MM"}]}'}, status=400)
+        if any(not 0 <= rule.weekday <= 6 for rule in rules):
+            return JsonResponse({'error': 'weekday must be between 0 (Monday) and 6 (Sunday)'}, status=400)
+        # An end of 00:00 means midnight
+        if any(rule.end_time <= rule.start_time and rule.end_time != time(0) for rule in rules):
+            return JsonResponse({'error': 'end must be after start (use 00:00 for midnight)'}, status=400)
+        
+        with transaction.atomic(), rebuild_once(request.user.id):
+            AvailabilityRule.objects.filter(user=request.user).delete()
+            AvailabilityRule.objects.bulk_create(rules)
+        return self.get(request)
+
+
+class FreeTutorsAPI(LoginRequiredMixin, ListView):
+    """API for tutors of a skill who are free at the same time as the user"""
+    
+    def get(self, request, *args, **kwargs):
+        from accounts.availability import FULL_WEEK, week_start
+        from skills.tutor_search import common_free_time, parse_availability_query
+        
+        try:
+            skill_id = int(request.GET['skill'])
+            query = parse_availability_query(request.GET) or (week_start(), FULL_WEEK, 60)
+            limit = min(int(request.GET.get('limit') or 20), 100)
+        except (KeyError, ValueError) as e:
+            return JsonResponse({'error': f'Invalid query: {e}'}, status=400)
+        monday, window, duration = query
+        
+        results = common_free_time(skill_id, request.user.id, monday, window, duration)[:limit]
+        users = User.objects.in_bulk([result['user_id'] for result in results])
+        return JsonResponse({
+            'week': monday.isoformat(),
+            'results': [{
+                'user_id': result['user_id'],
+                'name': users[result['user_id']].get_full_name() or users[result['user_id']].username,
+                'offered_skill_id': result['offered_skill_id'],
+                'average_rating': result['average_rating'],
+                'free_minutes': result['free_minutes'],
+                'slots': [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in result['slots']],
+            } for result in results],
+        })
+
+
+class CalendarEventsAPI(LoginRequiredMixin, ListView):
+    """
+    API for the user's sessions as calendar events, streamed.
+    
+    ``?start=&end=`` returns the events in a range with a ``sync_token``;
+    ``?sync_token=`` returns only the events changed since that token was
+    issued plus the ids of ``deleted`` ones, or 410 when the token is no
+    longer usable and the range has to be fetched again.
+    """
+    
+    def get(self, request, *args, **kwargs):
+        from skill_sessions.calendar import (
+            InvalidSyncToken, calendar_sessions, calendar_validators, changes_since, json_events,
+            make_sync_token, not_modified, parse_range, with_validators,
+        )
+        
+        user = request.user
+        if request.GET.get('sync_token'):
+            try:
+                sessions, deleted, next_token = changes_since(user, request.GET['sync_token'])
+            except InvalidSyncToken as e:
+                return JsonResponse({'error': str(e)}, status=410)
+            return StreamingHttpResponse(
+                json_events({'sync_token': next_token}, sessions, user, deleted=deleted),
+                content_type='application/json',
+            )
+        
+        try:
+            start, end = parse_range(request.GET)
+        except ValueError as e:
+            return JsonResponse({'error': f'Invalid range: {e}'}, status=400)
+        etag, last_modified = calendar_validators(user, 'json', start.isoformat(), end.isoformat())
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = StreamingHttpResponse(
+                json_events({
+                    'start': start, 'end': end, 'sync_token': make_sync_token(user),
+                }, calendar_sessions(user, start, end), user),
+                content_type='application/json',
+            )
+        return with_validators(response, etag, last_modified)
 
 
 class SendSkillRequestAPI(LoginRequiredMixin, ListView):
     """API for sending skill swap requests"""
     
     def post(self, request, user_id, *args, **kwargs):
-        return JsonResponse({'success': 'Request sent'}) 
\ No newline at end of file
+        from skill_sessions.forms import SkillSwapRequestForm
+        
+        recipient = User.objects.filter(pk=user_id, is_active=True).first()
+        if recipient is None:
+            return JsonResponse({'error': 'User not found'}, status=404)
+        if recipient == request.user:
+            return JsonResponse({'error': 'You cannot send a request to yourself'}, status=400)
+        
+        form = SkillSwapRequestForm(
+            request.POST, requester=request.user, recipient=recipient, show_skill_selection=True
+        )
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        
+        form.instance.requester = request.user
+        form.instance.recipient = recipient
+        swap_request = form.save()
+        return JsonResponse({'success': 'Request sent', 'request_id': swap_request.id}, status=201)
@@ -0,0 +1,170 @@
+"""
+Two-tier cache for hot read paths.
+
+Values live in an in-process LRU and in the shared tier (``CACHES['shared']``,
+a database table by default) visible to every process. Keys embed version
+counters, kept in the shared tier, for the namespaces a value depends on
+("skills", "sessions", "user:42", ...). Model signals bump those counters,
+so stale entries are never read again and simply age out, with no key
+scanning.
+
+Without a shared tier the counters are per process: a bump in ``runworker``
+or another web worker never reaches this one. Values are then kept for at
+most ``LOCAL_ONLY_CACHE_TIMEOUT`` seconds, which bounds how stale they get.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+SHARED_ALIAS = 'shared'
+DEFAULT_TIMEOUT = 300
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with per-entry expiry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cache = LRUCache(getattr(settings, 'LOCAL_CACHE_MAX_ENTRIES', 1024))
+_local_versions = {}
+
+
+def shared_cache():
+    """The shared tier, or None when only the local tier is configured"""
+    try:
+        return caches[SHARED_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+
+def _seed_version(shared, key):
+    # A counter evicted from the shared tier restarts at a value no earlier
+    # counter can have reached, so entries keyed by its old values stay unread
+    shared.add(key, time.time_ns(), timeout=None)
+
+
+def get_versions(namespaces):
+    """Current version counter for each namespace"""
+    shared = shared_cache()
+    if shared is None:
+        return [_local_versions.get(namespace, 1) for namespace in namespaces]
+    keys = [f'version:{namespace}' for namespace in namespaces]
+    stored = shared.get_many(keys)
+    for key in keys:
+        if key not in stored:
+            _seed_version(shared, key)
+            stored[key] = shared.get(key)
+    return [stored[key] for key in keys]
+
+
+def bump_version(*namespaces):
+    """Invalidate every cached value that depends on any of ``namespaces``"""
+    shared = shared_cache()
+    for namespace in namespaces:
+        if shared is None:
+            _local_versions[namespace] = _local_versions.get(namespace, 1) + 1
+        else:
+            key = f'version:{namespace}'
+            # Seeded first so incr() always succeeds
+            _seed_version(shared, key)
+            shared.incr(key)
+
+
+def invalidate_user(user_id):
+    bump_version(user_namespace(user_id))
+
+
+def make_key(name, namespaces=(), user_id=None, extra=()):
+    versions = '.'.join(str(version) for version in get_versions(namespaces))
+    parts = [name, versions]
+    if user_id is not None:
+        parts.append(f'u{user_id}')
+    parts.extend(str(part) for part in extra)
+    return ':'.join(parts)
+
+
+def get_or_set(name, compute, namespaces=(), user_id=None, extra=(), timeout=DEFAULT_TIMEOUT):
+    """
+    Return the cached value for ``name``, computing and storing it on a miss.
+
+    ``namespaces`` lists the data the value depends on; ``user_id`` adds the
+    user's own namespace so ``invalidate_user`` clears it.
+    """
+    if user_id is not None:
+        namespaces = tuple(namespaces) + (user_namespace(user_id),)
+    key = make_key(name, namespaces, user_id, extra)
+
+    value = local_cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    shared = shared_cache()
+    if shared is None:
+        timeout = min(timeout, settings.LOCAL_ONLY_CACHE_TIMEOUT)
+    else:
+        value = shared.get(key, _MISSING)
+        if value is not _MISSING:
+            local_cache.set(key, value, timeout)
+            return value
+
+    value = compute()
+    local_cache.set(key, value, timeout)
+    if shared is not None:
+        shared.set(key, value, timeout)
+    return value
+
+
+def cached(name, namespaces=(), per_user=False, timeout=DEFAULT_TIMEOUT):
+    """
+    Decorator form of ``get_or_set``. Positional arguments become part of the
+    key; with ``per_user`` the first argument is the user (or user id).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args):
+            user_id = None
+            if per_user:
+                user_id = getattr(args[0], 'pk', args[0])
+            return get_or_set(
+                name, lambda: func(*args), namespaces=namespaces,
+                user_id=user_id, extra=args[1:] if per_user else args, timeout=timeout,
+            )
+        return wrapper
+    return decorator
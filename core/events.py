@@ -0,0 +1,120 @@
+"""
+Server-sent events for notifications and dashboard counters.
+
+``event_stream`` is the body of the streaming response: it replays
+notifications missed since ``Last-Event-ID``, sends a counters snapshot and
+then relays whatever ``core.pubsub`` delivers, with a comment line as a
+heartbeat so proxies keep the connection open. Notification events carry the
+notification id as their SSE id; counter events are full snapshots and need
+no id.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from .pubsub import Subscriber, broker, publish, wants
+
+REPLAY_LIMIT = 50
+RETRY_MS = 5000
+
+
+def notification_payload(notification):
+    """Same shape as the items of the notification list API"""
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.strftime('%Y-%m-%d %H:%M'),
+        'notification_type': notification.notification_type,
+    }
+
+
+def notification_message(notification):
+    return {'id': notification.id, 'event': 'notification', 'data': notification_payload(notification)}
+
+
+def counts_snapshot(user_id):
+    """Unread notifications plus the dashboard counters polled by the old UI"""
+    from accounts.models import UserProfile
+    from skill_sessions.models import UserStats
+
+    stats = UserStats.objects.filter(pk=user_id).values(
+        'skills_completed', 'sessions_this_month', 'active_requests', 'pending_requests'
+    ).first() or {}
+    return {
+        'unread_count': UserProfile.objects.filter(user_id=user_id).values_list('unread_notifications', flat=True).first() or 0,
+        **stats,
+    }
+
+
+def publish_counts(user_id):
+    """Push a fresh counters snapshot once the current transaction commits"""
+    def send():
+        if wants(user_id):
+            publish(user_id, 'counts', counts_snapshot(user_id))
+    transaction.on_commit(send)
+
+
+def publish_notification(notification):
+    def send():
+        user_id = notification.recipient_id
+        if wants(user_id):
+            publish(user_id, 'notification', notification_payload(notification), notification.id)
+            publish(user_id, 'counts', counts_snapshot(user_id))
+    transaction.on_commit(send)
+
+
+def format_event(message):
+    lines = []
+    if 'id' in message:
+        lines.append(f"id: {message['id']}")
+    lines.append(f"event: {message['event']}")
+    lines.append(f"data: {json.dumps(message['data'])}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def missed_notifications(user_id, last_event_id):
+    from accounts.models import Notification
+
+    return [
+        notification_message(notification)
+        for notification in Notification.objects.filter(
+            recipient_id=user_id, id__gt=last_event_id
+        ).order_by('id')[:REPLAY_LIMIT]
+    ]
+
+
+async def event_stream(user_id, last_event_id=0):
+    """Async iterator of SSE frames for one connected client"""
+    heartbeat = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+    # Subscribe before reading the replay so nothing published in between is lost
+    subscriber = Subscriber(user_id, last_event_id)
+    broker.subscribe(subscriber)
+    # Highest notification id sent, so a replayed event that was also queued goes out once
+    sent_id = last_event_id
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        if last_event_id:
+            for message in await sync_to_async(missed_notifications)(user_id, last_event_id):
+                sent_id = message['id']
+                yield format_event(message)
+        snapshot = await sync_to_async(counts_snapshot)(user_id)
+        yield format_event({'event': 'counts', 'data': snapshot})
+
+        while True:
+            try:
+                message = await subscriber.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ': heartbeat\n\n'
+                continue
+            if 'id' in message:
+                if message['id'] <= sent_id:
+                    continue
+                sent_id = message['id']
+            yield format_event(message)
+    finally:
+        broker.unsubscribe(subscriber)
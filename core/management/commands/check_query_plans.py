@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import autodiscover_modules
+
+from core.queryplans import HOT_QUERIES, check_hot_queries
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN for every registered hot query and fail if any of them scans a full table or sorts in a temporary b-tree'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help='Only check these hot queries (default: all registered)'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('hot_queries')
+        unknown = set(options['names']) - set(HOT_QUERIES)
+        if unknown:
+            raise CommandError(f"Unknown hot queries: {', '.join(sorted(unknown))}")
+        
+        plans = check_hot_queries(options['names'])
+        for plan in plans:
+            if plan.ok:
+                note = ' (sorts in a temporary b-tree)' if plan.sorts else ''
+                self.stdout.write(f"{self.style.SUCCESS('ok')}   {plan.name}{note}")
+            elif plan.full_scans:
+                self.stdout.write(f"{self.style.ERROR('SCAN')} {plan.name}: full scan of {', '.join(plan.full_scans)}")
+            else:
+                self.stdout.write(f"{self.style.ERROR('SORT')} {plan.name}: sorts in a temporary b-tree")
+            if options['verbosity'] > 1 or not plan.ok:
+                for line in plan.plan.splitlines():
+                    self.stdout.write(f'       {line}')
+        
+        failed = [plan.name for plan in plans if not plan.ok]
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(plans)} hot queries scan a full table or sort")
+        self.stdout.write(self.style.SUCCESS(f'All {len(plans)} hot queries use an index'))
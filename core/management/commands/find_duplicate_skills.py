@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from skills.fuzzy import FuzzyIndex, duplicate_clusters
+from skills.models import Skill
+
+class Command(BaseCommand):
+    help = 'List groups of Skill rows with near-identical names, across all categories, for merging'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-edits',
+            type=int,
+            default=None,
+            help='Edits allowed between names (default: 1 for short names, up to 3 for long ones)'
+        )
+
+    def handle(self, *args, **options):
+        max_edits = options['max_edits']
+        if max_edits is not None and max_edits < 0:
+            raise CommandError('--max-edits must not be negative')
+        
+        index = FuzzyIndex()
+        index.build()
+        clusters = duplicate_clusters(index, max_edits)
+        if not clusters:
+            self.stdout.write(self.style.SUCCESS(f'No likely duplicates among {len(index.names)} skills'))
+            return
+        
+        skills = Skill.objects.select_related('category').annotate(
+            offers=Count('offered_by_users', filter=Q(offered_by_users__is_active=True), distinct=True),
+            desires=Count('desired_by_users', filter=Q(desired_by_users__is_active=True), distinct=True),
+        ).in_bulk([skill_id for cluster in clusters for skill_id in cluster])
+        for number, cluster in enumerate(clusters, 1):
+            self.stdout.write(f'Group {number}:')
+            for skill_id in cluster:
+                skill = skills[skill_id]
+                self.stdout.write(
+                    f'  #{skill.pk:<6} {skill.name:<40} {skill.category.name:<25} '
+                    f'{skill.offers} offers, {skill.desires} desires'
+                )
+        self.stdout.write(self.style.WARNING(
+            f'{len(clusters)} groups of likely duplicates among {len(index.names)} skills'
+        ))
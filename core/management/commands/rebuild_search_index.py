@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.search import rebuild, uses_fts
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of skills, categories and users from their tables'
+
+    def handle(self, *args, **options):
+        if not uses_fts():
+            raise CommandError('The search index needs SQLite FTS5; other databases search with icontains')
+        with transaction.atomic():
+            count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents'))
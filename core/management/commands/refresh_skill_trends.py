@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from skills.trends import refresh_skill_trends
+
+class Command(BaseCommand):
+    help = 'Recompute the time-decayed trending skills ranking (run periodically, e.g. hourly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of trend rows written per bulk upsert (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        
+        result = refresh_skill_trends(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"Ranked {result['skills']} skills ({result['removed']} stale removed) "
+            f"in {result['seconds']:.2f}s"
+        ))
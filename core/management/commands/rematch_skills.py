@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from skills.batch_matching import rematch_all
+
+class Command(BaseCommand):
+    help = 'Recompute all skill matches in one vectorized batch (nightly full rematch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of match rows written per bulk upsert (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be a positive integer')
+        
+        self.stdout.write('Recomputing skill matches...')
+        result = rematch_all(chunk_size=chunk_size)
+        
+        self.stdout.write(
+            f"Scored {result['matches']} pairs from {result['offers']} offers and "
+            f"{result['desires']} desires ({result['mutual']} mutual, {result['removed']} stale removed)"
+        )
+        for stage, seconds in result['timings'].items():
+            self.stdout.write(f'  {stage:<8} {seconds * 1000:10.1f} ms')
+        
+        total = sum(result['timings'].values())
+        self.stdout.write(self.style.SUCCESS(f'Rematch finished in {total:.2f}s'))
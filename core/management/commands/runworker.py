@@ -0,0 +1,107 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.taskqueue import (
+    claim_tasks, execute_task, purge_finished_tasks, release_stale_tasks, use_immediate_transactions,
+)
+
+
+def init_worker_process():
+    """Set up Django and the task registry in a freshly spawned pool process"""
+    django.setup()
+    use_immediate_transactions()
+    autodiscover_modules('tasks')
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks with a thread or process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'TASK_WORKERS', 4),
+            help='Number of tasks executed concurrently (default: TASK_WORKERS)'
+        )
+        parser.add_argument(
+            '--processes',
+            action='store_true',
+            help='Use a process pool instead of threads (for CPU-bound tasks)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty (default: 1.0)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no due tasks remain instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be a positive integer')
+        poll_interval = options['poll_interval']
+        lock_timeout = getattr(settings, 'TASK_LOCK_TIMEOUT', 600)
+        result_ttl = getattr(settings, 'TASK_RESULT_TTL', 86400)
+
+        autodiscover_modules('tasks')
+        use_immediate_transactions()
+        if options['processes']:
+            # Spawned processes open their own database connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker_process,
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='task-worker')
+
+        kind = 'processes' if options['processes'] else 'threads'
+        self.stdout.write(f'Task worker started with {workers} {kind}')
+        outcomes = {'succeeded': 0, 'retry': 0, 'failed': 0}
+        in_flight = set()
+        last_maintenance = 0
+        try:
+            while True:
+                if time.monotonic() - last_maintenance > lock_timeout:
+                    released = release_stale_tasks(lock_timeout)
+                    if released:
+                        self.stdout.write(self.style.WARNING(f'Requeued {released} stale tasks'))
+                    purge_finished_tasks(result_ttl)
+                    last_maintenance = time.monotonic()
+
+                free = workers - len(in_flight)
+                if free:
+                    for task_id in claim_tasks(free):
+                        in_flight.add(pool.submit(execute_task, task_id))
+
+                if not in_flight:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, in_flight = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[future.result()] += 1
+        except KeyboardInterrupt:
+            self.stdout.write('Shutting down, waiting for running tasks...')
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tasks: {outcomes['succeeded']} succeeded, {outcomes['retry']} scheduled for retry, "
+            f"{outcomes['failed']} failed"
+        ))
@@ -0,0 +1,47 @@
+# Generated manually to create and fill the FTS5 search index (core.search)
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, title, keywords, body, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    insert = "INSERT INTO search_index (rowid, kind, object_id, title, keywords, body) "
+    schema_editor.execute(
+        insert + "SELECT s.id * 4 + 1, 'skill', s.id, s.name, c.name, s.description "
+        "FROM skills_skill s JOIN category c ON c.id = s.category_id"
+    )
+    schema_editor.execute(
+        insert + "SELECT id * 4 + 2, 'category', id, name, '', description FROM category WHERE is_active"
+    )
+    schema_editor.execute(
+        insert + "SELECT u.id * 4 + 3, 'user', u.id, u.first_name || ' ' || u.last_name || ' ' || u.username, "
+        "COALESCE((SELECT group_concat(sk.name, ' ') FROM offeredskill o JOIN skills_skill sk ON sk.id = o.skill_id "
+        "WHERE o.user_id = u.id AND o.is_active), ''), "
+        "COALESCE(p.bio, '') || ' ' || COALESCE((SELECT group_concat(o.description, ' ') FROM offeredskill o "
+        "WHERE o.user_id = u.id AND o.is_active), '') "
+        "FROM auth_user u LEFT JOIN userprofile p ON p.user_id = u.id WHERE u.is_active"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_task'),
+        ('accounts', '0012_availability'),
+        ('skills', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -35,3 +35,34 @@ class Branch(models.Model):
     
     def __str__(self):
         return f"{self.department.code} - {self.name}"
+
+class Task(models.Model):
+    """Queued background task, executed by the runworker command (see core.taskqueue)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=200, help_text="Registered task name (module.function)")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(help_text="Earliest time the task may run")
+    locked_at = models.DateTimeField(null=True, blank=True, help_text="When a worker claimed the task")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['run_at', 'id']
+        db_table = 'core_task'
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='core_task_status_run_at_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.status})"
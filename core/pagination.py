@@ -0,0 +1,162 @@
+"""
+Keyset (cursor) pagination on ``(created_at, id)``.
+
+Instead of ``COUNT(*)`` plus ``OFFSET``, each page continues from the last
+row of the previous one with a ``(created_at, id) < (...)`` range condition
+(spelled as an OR plus an inclusive ``created_at`` bound the index can seek
+on), so page 500 costs the same index range scan as page 1. Cursors are opaque
+URL-safe tokens; a malformed one falls back to the first page.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 20
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction, row):
+    payload = json.dumps([direction, row.created_at.isoformat(), row.pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (direction, created_at, id) from a cursor token"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(token) from e
+
+
+class CursorPage:
+    """One page of rows plus the cursors leading to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+def keyset_queryset(queryset, direction='next', key=None):
+    """
+    ``queryset`` ordered to walk ``direction`` ('next' is older rows) from
+    the ``(created_at, id)`` ``key``, or from the newest row without one
+    """
+    if direction == 'prev':
+        # Walk towards newer rows; paginate flips the page back to newest-first
+        queryset = queryset.order_by('created_at', 'id')
+        lookup = 'gt'
+    else:
+        queryset = queryset.order_by('-created_at', '-id')
+        lookup = 'lt'
+    if key:
+        created_at, pk = key
+        # The redundant inclusive bound is what lets the index seek to the
+        # cursor; the OR alone only narrows the rows after a scan
+        queryset = queryset.filter(
+            Q(**{f'created_at__{lookup}': created_at}) | Q(created_at=created_at, **{f'id__{lookup}': pk}),
+            **{f'created_at__{lookup}e': created_at},
+        )
+    return queryset
+
+
+def paginate(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Return the newest-first ``CursorPage`` of ``queryset`` at ``cursor``"""
+    direction, key = 'next', None
+    if cursor:
+        try:
+            direction, *key = decode_cursor(cursor)
+        except InvalidCursor:
+            direction, key = 'next', None
+
+    backwards = direction == 'prev'
+    queryset = keyset_queryset(queryset, direction, key)
+
+    rows = list(queryset[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return CursorPage([])
+
+    has_next = True if backwards else more
+    has_previous = more if backwards else key is not None
+    return CursorPage(
+        rows,
+        next_cursor=encode_cursor('next', rows[-1]) if has_next else None,
+        previous_cursor=encode_cursor('prev', rows[0]) if has_previous else None,
+    )
+
+
+class CursorPaginationMixin:
+    """ListView mixin replacing ``paginate_by`` with keyset pagination"""
+    cursor_page_size = DEFAULT_PAGE_SIZE
+    cursor_param = 'cursor'
+
+    def get_context_data(self, **kwargs):
+        page = paginate(self.object_list, self.request.GET.get(self.cursor_param), self.cursor_page_size)
+        return super().get_context_data(object_list=page.object_list, cursor_page=page, **kwargs)
+
+
+class KeysetPagination(BasePagination):
+    """REST framework pagination over ``paginate``, with ``?page_size=`` up to ``max_page_size``"""
+    page_size = DEFAULT_PAGE_SIZE
+    max_page_size = 100
+    cursor_param = 'cursor'
+
+    def get_page_size(self, request):
+        requested = request.query_params.get('page_size', '')
+        if requested.isdigit() and int(requested) > 0:
+            return min(int(requested), self.max_page_size)
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page = paginate(queryset, request.query_params.get(self.cursor_param), self.get_page_size(request))
+        return self.page.object_list
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self._link(self.page.next_cursor),
+            'previous': self._link(self.page.previous_cursor),
+            'results': data,
+        })
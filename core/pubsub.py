@@ -0,0 +1,217 @@
+"""
+Per-user event fan-out for the notification stream.
+
+Streaming responses subscribe to a user's channel on the process-wide
+``broker``; publishers call ``publish(user_id, event, data)``. How events
+cross process boundaries depends on ``PUBSUB_BACKEND``:
+
+* ``local``    - in-process only; enough when tasks run eagerly in the web process.
+* ``database`` - events published in this process are delivered directly and a
+  single poller thread per process picks up notifications and stats written
+  by other processes (task workers), one query per tick for all subscribers.
+* ``redis``    - events go through Redis pub/sub (requires the ``redis`` package).
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+
+
+class Subscriber:
+    """One streaming connection: an asyncio queue fed from any thread"""
+
+    def __init__(self, user_id, last_event_id=0):
+        self.user_id = user_id
+        self.last_event_id = last_event_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, message):
+        # Notification events are numbered; skip ones this client already has
+        event_id = message.get('id')
+        if event_id is not None:
+            if event_id <= self.last_event_id:
+                return
+            self.last_event_id = event_id
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client this far behind will resync when it reconnects
+            pass
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class Broker:
+    """Process-wide registry of subscribers, keyed by user id"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.setdefault(subscriber.user_id, set()).add(subscriber)
+        get_backend().start()
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(subscriber.user_id)
+            if subscribers:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[subscriber.user_id]
+
+    def subscribed_users(self):
+        with self.lock:
+            return set(self.subscribers)
+
+    def dispatch(self, user_id, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(user_id, ()))
+        for subscriber in subscribers:
+            subscriber.deliver(message)
+
+
+broker = Broker()
+
+
+class LocalBackend:
+    def start(self):
+        pass
+
+    def wants(self, user_id):
+        """Whether events for ``user_id`` can reach any stream (lets publishers skip work)"""
+        return user_id in broker.subscribed_users()
+
+    def publish(self, user_id, message):
+        broker.dispatch(user_id, message)
+
+
+class DatabaseBackend(LocalBackend):
+    """Local delivery plus a poller thread for rows written by other processes"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='pubsub-poller', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        from django.utils import timezone
+        from accounts.models import Notification
+        from skill_sessions.models import UserStats
+        from .events import counts_snapshot, notification_message
+
+        close_old_connections()
+        last_id = Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        since = timezone.now()
+        while True:
+            time.sleep(self.interval)
+            try:
+                users = broker.subscribed_users()
+                tick = timezone.now()
+                changed = set()
+                for notification in Notification.objects.filter(id__gt=last_id).order_by('id'):
+                    last_id = notification.id
+                    if notification.recipient_id in users:
+                        broker.dispatch(notification.recipient_id, notification_message(notification))
+                        changed.add(notification.recipient_id)
+                changed.update(
+                    user_id for user_id in UserStats.objects.filter(updated_at__gte=since).values_list('user_id', flat=True)
+                    if user_id in users
+                )
+                since = tick
+                for user_id in changed:
+                    broker.dispatch(user_id, {'event': 'counts', 'data': counts_snapshot(user_id)})
+            except Exception:
+                logger.exception('Notification stream poller failed')
+            finally:
+                close_old_connections()
+
+
+class RedisBackend:
+    """Publish through a Redis channel; a listener thread delivers locally"""
+
+    CHANNEL = 'campus_skill_swap:events'
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('PUBSUB_BACKEND = "redis" requires the redis package')
+        self.client = redis.Redis.from_url(url)
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='pubsub-redis', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.CHANNEL)
+        for raw in pubsub.listen():
+            try:
+                payload = json.loads(raw['data'])
+                broker.dispatch(payload['user_id'], payload['message'])
+            except (KeyError, ValueError):
+                logger.warning('Ignoring malformed pub/sub message: %r', raw)
+
+    def wants(self, user_id):
+        return True
+
+    def publish(self, user_id, message):
+        self.client.publish(self.CHANNEL, json.dumps({'user_id': user_id, 'message': message}))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = getattr(settings, 'PUBSUB_BACKEND', 'local')
+            if name == 'local':
+                _backend = LocalBackend()
+            elif name == 'database':
+                _backend = DatabaseBackend(getattr(settings, 'PUBSUB_POLL_INTERVAL', 1.0))
+            elif name == 'redis':
+                _backend = RedisBackend(getattr(settings, 'PUBSUB_REDIS_URL', 'redis://127.0.0.1:6379/2'))
+            else:
+                raise ImproperlyConfigured(f'Unknown PUBSUB_BACKEND {name!r}')
+        return _backend
+
+
+def wants(user_id):
+    return get_backend().wants(user_id)
+
+
+def publish(user_id, event, data, event_id=None):
+    """Send an event to every stream the user has open"""
+    message = {'event': event, 'data': data}
+    if event_id is not None:
+        message['id'] = event_id
+    get_backend().publish(user_id, message)
@@ -0,0 +1,65 @@
+"""
+Registry of hot queries whose plans must stay on an index.
+
+Apps register functions returning a representative queryset in
+``<app>/hot_queries.py``::
+
+    @hot_query('notifications.inbox')
+    def inbox():
+        return Notification.objects.filter(recipient_id=1).order_by('-created_at', '-id')
+
+``manage.py check_query_plans`` explains every registered query and fails
+when any of them reads a whole table or sorts its rows in a temporary
+b-tree instead of reading them in index order. Queries that can't avoid the
+sort (an OR across two indexes) register with ``allow_sort=True``.
+"""
+import re
+
+HOT_QUERIES = {}
+
+# SQLite reports a full scan as "SCAN <table>" (an index walk reads
+# "SCAN <table> USING [COVERING] INDEX ..."); PostgreSQL as "Seq Scan on <table>".
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT\b)(\w+)(?!.*\bUSING\b)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|RIGHT PART OF ORDER BY)'),
+    'postgresql': re.compile(r'\bSort\b'),
+}
+
+
+def hot_query(name, allow_sort=False):
+    """Register a function returning a queryset under ``name``"""
+    def decorator(func):
+        func.allow_sort = allow_sort
+        HOT_QUERIES[name] = func
+        return func
+    return decorator
+
+
+class QueryPlan:
+    def __init__(self, name, plan, vendor, allow_sort=False):
+        self.name = name
+        self.plan = plan
+        self.allow_sort = allow_sort
+        full_scan = FULL_SCAN_PATTERNS.get(vendor)
+        sort = SORT_PATTERNS.get(vendor)
+        self.full_scans = full_scan.findall(plan) if full_scan else []
+        self.sorts = bool(sort and sort.search(plan))
+
+    @property
+    def ok(self):
+        return not self.full_scans and (self.allow_sort or not self.sorts)
+
+
+def explain(name, queryset, allow_sort=False):
+    from django.db import connections
+    vendor = connections[queryset.db].vendor
+    return QueryPlan(name, queryset.explain(), vendor, allow_sort)
+
+
+def check_hot_queries(names=None):
+    """Explain the registered hot queries (all of them by default)"""
+    selected = names or sorted(HOT_QUERIES)
+    return [explain(name, HOT_QUERIES[name](), HOT_QUERIES[name].allow_sort) for name in selected]
@@ -0,0 +1,173 @@
+"""
+Full-text search over skills, categories and users with SQLite FTS5.
+
+``search_index`` holds one document per skill, active category and active
+user. A document's rowid is ``pk * 4 + KIND_CODES[kind]``, so the signals in
+core.signals replace documents by rowid instead of scanning the unindexed
+``kind``/``object_id`` columns. Documents have three weighted columns:
+``title`` (names), ``keywords`` (a skill's category, the skills a user
+offers) and ``body`` (descriptions and bios).
+
+Every query term is a prefix match, served by the index's two and three
+character prefix tables, and results are ranked with ``bm25()`` using
+``FIELD_WEIGHTS``. Queries filter and group by ``rowid % 4`` rather than
+``kind`` so ranking never reads the stored document text. On databases
+other than SQLite searches fall back to ``icontains`` lookups and the index
+is not maintained.
+"""
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Prefetch, Q
+
+KIND_CODES = {'skill': 1, 'category': 2, 'user': 3}
+FIELD_WEIGHTS = (10.0, 4.0, 1.0)  # title, keywords, body
+MAX_TERMS = 8
+TERM_RE = re.compile(r'\w+')
+
+# SELECTs producing (rowid, kind, object_id, title, keywords, body), keyed by
+# kind, with the column to filter on when only some documents are rebuilt
+DOCUMENTS = {
+    'skill': (
+        "SELECT s.id * 4 + 1, 'skill', s.id, s.name, c.name, s.description "
+        "FROM skills_skill s JOIN category c ON c.id = s.category_id WHERE {where}",
+        's.id',
+    ),
+    'category': (
+        "SELECT id * 4 + 2, 'category', id, name, '', description FROM category WHERE is_active AND {where}",
+        'id',
+    ),
+    'user': (
+        "SELECT u.id * 4 + 3, 'user', u.id, u.first_name || ' ' || u.last_name || ' ' || u.username, "
+        "COALESCE((SELECT group_concat(sk.name, ' ') FROM offeredskill o JOIN skills_skill sk ON sk.id = o.skill_id "
+        "WHERE o.user_id = u.id AND o.is_active), ''), "
+        "COALESCE(p.bio, '') || ' ' || COALESCE((SELECT group_concat(o.description, ' ') FROM offeredskill o "
+        "WHERE o.user_id = u.id AND o.is_active), '') "
+        "FROM auth_user u LEFT JOIN userprofile p ON p.user_id = u.id WHERE u.is_active AND {where}",
+        'u.id',
+    ),
+}
+
+INSERT = "INSERT INTO search_index (rowid, kind, object_id, title, keywords, body) "
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def _chunks(ids, size=500):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def remove(kind, ids):
+    """Drop the documents of ``kind`` with primary keys ``ids``"""
+    if not uses_fts():
+        return
+    code = KIND_CODES[kind]
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            cursor.execute(
+                f"DELETE FROM search_index WHERE rowid IN ({', '.join(['%s'] * len(chunk))})",
+                [pk * 4 + code for pk in chunk],
+            )
+
+
+def reindex(kind, ids):
+    """Rebuild the documents of ``kind`` with primary keys ``ids`` from their rows"""
+    if not uses_fts():
+        return
+    select, column = DOCUMENTS[kind]
+    remove(kind, ids)
+    with connection.cursor() as cursor:
+        for chunk in _chunks(ids):
+            where = f"{column} IN ({', '.join(['%s'] * len(chunk))})"
+            cursor.execute(INSERT + select.format(where=where), chunk)
+
+
+def rebuild():
+    """Recreate every document; returns the number indexed"""
+    if not uses_fts():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM search_index")
+        for select, _ in DOCUMENTS.values():
+            cursor.execute(INSERT + select.format(where='1'))
+        cursor.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+        cursor.execute("SELECT count(*) FROM search_index")
+        return cursor.fetchone()[0]
+
+
+def match_expression(query):
+    """FTS5 query matching documents that contain every term of ``query`` as a prefix"""
+    terms = TERM_RE.findall(query.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_ids(query, kinds=tuple(KIND_CODES), limit=10):
+    """``{kind: [object_id, ...]}`` with at most ``limit`` ids per kind, best match first"""
+    results = {kind: [] for kind in kinds}
+    match = match_expression(query)
+    if not match:
+        return results
+    if not uses_fts():
+        return _fallback_ids(query, kinds, limit)
+
+    codes = [KIND_CODES[kind] for kind in kinds]
+    kind_filter = f"rowid %% 4 IN ({', '.join(['%s'] * len(codes))})"
+    rank = "bm25(search_index, 0, 0, %s, %s, %s)"
+    with connection.cursor() as cursor:
+        if len(codes) == 1:
+            # A plain ORDER BY ... LIMIT keeps only the top rows while ranking
+            cursor.execute(
+                f"SELECT rowid FROM search_index WHERE search_index MATCH %s AND {kind_filter} "
+                f"ORDER BY {rank} LIMIT %s",
+                [match, *codes, *FIELD_WEIGHTS, limit],
+            )
+        else:
+            cursor.execute(
+                "SELECT rowid FROM ("
+                " SELECT rowid, ROW_NUMBER() OVER (PARTITION BY rowid %% 4 ORDER BY rank) AS position FROM ("
+                f"  SELECT rowid, {rank} AS rank FROM search_index WHERE search_index MATCH %s AND {kind_filter}"
+                " )"
+                ") WHERE position <= %s ORDER BY position",
+                [*FIELD_WEIGHTS, match, *codes, limit],
+            )
+        kind_of = {code: kind for kind, code in KIND_CODES.items()}
+        for (rowid,) in cursor.fetchall():
+            results[kind_of[rowid % 4]].append(rowid // 4)
+    return results
+
+
+def _fallback_ids(query, kinds, limit):
+    from skills.models import Skill, SkillCategory
+    querysets = {
+        'skill': Skill.objects.filter(Q(name__icontains=query) | Q(description__icontains=query)),
+        'category': SkillCategory.objects.filter(is_active=True, name__icontains=query),
+        'user': User.objects.filter(is_active=True).filter(
+            Q(username__icontains=query) | Q(first_name__icontains=query) | Q(last_name__icontains=query)
+        ),
+    }
+    return {kind: list(querysets[kind].values_list('pk', flat=True)[:limit]) for kind in kinds}
+
+
+def search(query, kinds=tuple(KIND_CODES), limit=10):
+    """
+    ``{kind: [object, ...]}`` in rank order: skills with their category,
+    categories, and users with their profile and active offered skills.
+    """
+    from skills.models import OfferedSkill, Skill, SkillCategory
+    querysets = {
+        'skill': Skill.objects.select_related('category'),
+        'category': SkillCategory.objects.all(),
+        'user': User.objects.select_related('profile').prefetch_related(Prefetch(
+            'offered_skills', queryset=OfferedSkill.objects.filter(is_active=True).select_related('skill'),
+        )),
+    }
+    results = {}
+    for kind, ids in search_ids(query, kinds, limit).items():
+        objects = querysets[kind].in_bulk(ids) if ids else {}
+        results[kind] = [objects[pk] for pk in ids if pk in objects]
+    return results
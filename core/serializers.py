@@ -0,0 +1,153 @@
+"""
+Serializers for the v1 REST API.
+
+Every serializer declares the relations it reads in ``Meta.select_related``
+and ``Meta.prefetch_related``. Nested ``PlannedSerializer`` fields add their
+own declarations under their source, joined when the relation is single
+valued and prefetched (with the nested plan applied) when ``many=True``, so
+``plan_queryset`` reads a page of any depth in a fixed number of queries.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from accounts.models import Notification
+from skill_sessions.models import SessionReview, SkillSwapRequest, SkillSwapSession
+from skills.models import DesiredSkill, OfferedSkill, Skill, SkillCategory
+
+
+class PlannedSerializer(serializers.ModelSerializer):
+    """ModelSerializer that knows which relations its output reads"""
+
+    @classmethod
+    def query_plan(cls, prefix=''):
+        """``(select_related, prefetch_related)`` lookups, relative to ``prefix``"""
+        select = [prefix + lookup for lookup in getattr(cls.Meta, 'select_related', ())]
+        prefetch = [prefix + lookup for lookup in getattr(cls.Meta, 'prefetch_related', ())]
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            child = field.child if many else field
+            if not isinstance(child, PlannedSerializer) or field.source == '*':
+                continue
+            path = prefix + (field.source or name).replace('.', '__')
+            if many:
+                queryset = child.plan_queryset(child.Meta.model._default_manager.all())
+                prefetch.append(Prefetch(path, queryset=queryset))
+            else:
+                nested_select, nested_prefetch = child.query_plan(path + '__')
+                select += [path, *nested_select]
+                prefetch += nested_prefetch
+        return select, prefetch
+
+    @classmethod
+    def plan_queryset(cls, queryset):
+        select, prefetch = cls.query_plan()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class UserSerializer(PlannedSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name']
+
+
+class SkillCategorySerializer(PlannedSerializer):
+    class Meta:
+        model = SkillCategory
+        fields = ['id', 'name', 'icon', 'color']
+
+
+class SkillSerializer(PlannedSerializer):
+    category = SkillCategorySerializer(read_only=True)
+    aliases = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+
+    class Meta:
+        model = Skill
+        fields = ['id', 'name', 'description', 'is_popular', 'category', 'aliases', 'created_at']
+        prefetch_related = ['aliases']
+
+
+class OfferedSkillSerializer(PlannedSerializer):
+    user = UserSerializer(read_only=True)
+    skill = SkillSerializer(read_only=True)
+
+    class Meta:
+        model = OfferedSkill
+        fields = [
+            'id', 'user', 'skill', 'proficiency_level', 'description', 'years_of_experience',
+            'teaching_preference', 'average_rating', 'rating_count', 'total_sessions', 'created_at',
+        ]
+
+
+class DesiredSkillSerializer(PlannedSerializer):
+    user = UserSerializer(read_only=True)
+    skill = SkillSerializer(read_only=True)
+
+    class Meta:
+        model = DesiredSkill
+        fields = [
+            'id', 'user', 'skill', 'urgency', 'description', 'current_level', 'target_level',
+            'learning_preference', 'created_at',
+        ]
+
+
+class SkillSwapRequestSerializer(PlannedSerializer):
+    requester = UserSerializer(read_only=True)
+    recipient = UserSerializer(read_only=True)
+    offered_skill = OfferedSkillSerializer(read_only=True)
+    desired_skill = DesiredSkillSerializer(read_only=True, allow_null=True)
+
+    class Meta:
+        model = SkillSwapRequest
+        fields = [
+            'id', 'requester', 'recipient', 'offered_skill', 'desired_skill', 'status', 'message',
+            'proposed_duration', 'proposed_format', 'proposed_location', 'created_at', 'expires_at',
+            'responded_at', 'response_message',
+        ]
+
+
+class SkillSwapSessionSerializer(PlannedSerializer):
+    teacher = UserSerializer(read_only=True)
+    learner = UserSerializer(read_only=True)
+    skill = SkillSerializer(read_only=True)
+
+    class Meta:
+        model = SkillSwapSession
+        fields = [
+            'id', 'request', 'teacher', 'learner', 'skill', 'scheduled_date', 'duration_minutes',
+            'end_time', 'format', 'location', 'meeting_link', 'status', 'created_at',
+        ]
+
+
+class SessionReviewSerializer(PlannedSerializer):
+    reviewer = serializers.SerializerMethodField()
+    reviewee = UserSerializer(read_only=True)
+
+    class Meta:
+        model = SessionReview
+        fields = [
+            'id', 'session', 'reviewer', 'reviewee', 'overall_rating', 'communication_rating',
+            'knowledge_rating', 'punctuality_rating', 'review_text', 'what_learned', 'would_recommend',
+            'created_at',
+        ]
+        select_related = ['reviewer']
+
+    def get_reviewer(self, review):
+        if review.is_anonymous:
+            return None
+        return UserSerializer(review.reviewer).data
+
+
+class NotificationSerializer(PlannedSerializer):
+    related_user = UserSerializer(read_only=True, allow_null=True)
+
+    class Meta:
+        model = Notification
+        fields = [
+            'id', 'notification_type', 'title', 'message', 'is_read', 'related_user', 'related_object_id',
+            'created_at',
+        ]
@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from skills.models import SkillCategory, Skill, OfferedSkill, DesiredSkill
+from accounts.models import UserProfile
+from skill_sessions.models import SkillSwapSession
+from . import search
+from .cache import bump_version, invalidate_user
+
+
+@receiver(post_save, sender=SkillCategory)
+@receiver(post_delete, sender=SkillCategory)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_catalog(sender, **kwargs):
+    bump_version('skills')
+
+
+@receiver(post_save, sender=OfferedSkill)
+@receiver(post_delete, sender=OfferedSkill)
+@receiver(post_save, sender=DesiredSkill)
+@receiver(post_delete, sender=DesiredSkill)
+def invalidate_user_skills(sender, instance, **kwargs):
+    bump_version('skills')
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=SkillSwapSession)
+@receiver(post_delete, sender=SkillSwapSession)
+def invalidate_sessions(sender, instance, **kwargs):
+    bump_version('sessions')
+    invalidate_user(instance.teacher_id)
+    invalidate_user(instance.learner_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users(sender, instance, update_fields=None, **kwargs):
+    # Logging in saves last_login, which no cached value depends on
+    if update_fields == frozenset(['last_login']):
+        return
+    bump_version('users')
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=SkillCategory)
+def index_category(sender, instance, **kwargs):
+    """Reindex the category and, since their documents carry its name, its skills"""
+    search.reindex('category', [instance.pk])
+    search.reindex('skill', Skill.objects.filter(category_id=instance.pk).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Skill)
+def index_skill(sender, instance, **kwargs):
+    """Reindex the skill and the users offering it, whose documents carry its name"""
+    search.reindex('skill', [instance.pk])
+    search.reindex('user', OfferedSkill.objects.filter(skill_id=instance.pk).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=OfferedSkill)
+@receiver(post_delete, sender=OfferedSkill)
+@receiver(post_save, sender=UserProfile)
+def index_user_details(sender, instance, **kwargs):
+    search.reindex('user', [instance.user_id])
+
+
+@receiver(post_save, sender=User)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields == frozenset(['last_login']):
+        return
+    search.reindex('user', [instance.pk])
+
+
+@receiver(post_delete, sender=SkillCategory)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=User)
+def unindex(sender, instance, **kwargs):
+    kind = {SkillCategory: 'category', Skill: 'skill', User: 'user'}[sender]
+    search.remove(kind, [instance.pk])
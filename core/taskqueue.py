@@ -0,0 +1,169 @@
+"""
+Background task queue backed by the ``Task`` table.
+
+Functions decorated with ``@task`` still work as plain calls; ``.delay()``
+stores the call as a ``Task`` row instead, and ``manage.py runworker``
+executes it outside the request/response cycle. Arguments must be JSON
+serializable, so pass ids rather than model instances. A failing task is
+retried with exponential backoff until it has used ``max_attempts``.
+
+With ``TASKS_EAGER`` enabled ``.delay()`` runs the task in-process once the
+current transaction commits, so tests see side effects without a worker.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Task name -> TaskFunction, filled in as app ``tasks`` modules are imported
+registry = {}
+
+
+class TaskFunction:
+    """A registered task; call it directly or queue it with ``delay``"""
+
+    def __init__(self, func, name, max_attempts, retry_delay):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.schedule(args, kwargs)
+
+    def schedule(self, args=(), kwargs=None, countdown=0):
+        """Queue the task to run no earlier than ``countdown`` seconds from now"""
+        kwargs = kwargs or {}
+        if getattr(settings, 'TASKS_EAGER', False):
+            transaction.on_commit(lambda: self.func(*args, **kwargs))
+            return None
+
+        from .models import Task
+        return Task.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs,
+            max_attempts=self.max_attempts,
+            run_at=timezone.now() + timedelta(seconds=countdown),
+        )
+
+    def backoff(self, attempts):
+        """Seconds to wait before retry number ``attempts``"""
+        return self.retry_delay * 2 ** (attempts - 1)
+
+
+def task(func=None, *, name=None, max_attempts=3, retry_delay=30):
+    """Register ``func`` as a background task"""
+    def decorator(func):
+        task_function = TaskFunction(
+            func, name or f'{func.__module__}.{func.__name__}', max_attempts, retry_delay
+        )
+        registry[task_function.name] = task_function
+        return task_function
+    return decorator(func) if func is not None else decorator
+
+
+def use_immediate_transactions():
+    """
+    Make this process's SQLite transactions take the write lock when they
+    start, so concurrent worker threads wait on the busy timeout rather than
+    failing when a read transaction tries to upgrade to a write. Only the
+    worker calls this; request handling keeps deferred transactions.
+    """
+    for alias in connections:
+        if connections.settings[alias]['ENGINE'] == 'django.db.backends.sqlite3':
+            connections.settings[alias].setdefault('OPTIONS', {})['transaction_mode'] = 'IMMEDIATE'
+    # Connections read their options when they (re)connect
+    connections.close_all()
+
+
+def claim_tasks(limit):
+    """
+    Mark up to ``limit`` due tasks as running and return their ids.
+
+    Each claim is a conditional UPDATE, so concurrent workers never run the
+    same task twice.
+    """
+    from .models import Task
+
+    now = timezone.now()
+    due = (Task.objects
+           .filter(status='queued', run_at__lte=now)
+           .order_by('run_at', 'id')
+           .values_list('id', flat=True)[:limit])
+    claimed = []
+    for task_id in list(due):
+        if Task.objects.filter(pk=task_id, status='queued').update(
+            status='running', locked_at=now, attempts=F('attempts') + 1, updated_at=now
+        ):
+            claimed.append(task_id)
+    return claimed
+
+
+def release_stale_tasks(lock_timeout):
+    """Requeue tasks whose worker died more than ``lock_timeout`` seconds ago"""
+    from .models import Task
+
+    now = timezone.now()
+    return Task.objects.filter(
+        status='running', locked_at__lt=now - timedelta(seconds=lock_timeout)
+    ).update(status='queued', locked_at=None, updated_at=now)
+
+
+def purge_finished_tasks(older_than):
+    """Delete succeeded tasks finished more than ``older_than`` seconds ago"""
+    from .models import Task
+
+    deleted, _ = Task.objects.filter(
+        status='succeeded', updated_at__lt=timezone.now() - timedelta(seconds=older_than)
+    ).delete()
+    return deleted
+
+
+def execute_task(task_id):
+    """
+    Run one claimed task and record the outcome: 'succeeded', 'retry' or
+    'failed'. Safe to call from pool threads and processes.
+    """
+    from .models import Task
+
+    close_old_connections()
+    try:
+        task_row = Task.objects.get(pk=task_id)
+        task_function = registry.get(task_row.name)
+        try:
+            if task_function is None:
+                raise LookupError(f'No task registered as {task_row.name!r}')
+            task_function.func(*task_row.args, **task_row.kwargs)
+        except Exception:
+            now = timezone.now()
+            error = traceback.format_exc()
+            if task_function is not None and task_row.attempts < task_row.max_attempts:
+                Task.objects.filter(pk=task_id).update(
+                    status='queued', locked_at=None, last_error=error, updated_at=now,
+                    run_at=now + timedelta(seconds=task_function.backoff(task_row.attempts)),
+                )
+                return 'retry'
+            logger.error('Task %s (%s) failed permanently:\n%s', task_id, task_row.name, error)
+            Task.objects.filter(pk=task_id).update(
+                status='failed', locked_at=None, last_error=error, updated_at=now
+            )
+            return 'failed'
+
+        Task.objects.filter(pk=task_id).update(
+            status='succeeded', locked_at=None, last_error='', updated_at=timezone.now()
+        )
+        return 'succeeded'
+    finally:
+        close_old_connections()
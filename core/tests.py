@@ -1,3 +1,261 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Notification, UserProfile
+from core.models import Department
+from core import cache, search
+from core.queryplans import QueryPlan
+from skill_sessions.models import SessionReview, SkillSwapRequest, SkillSwapSession
+from skills.models import DesiredSkill, OfferedSkill, Skill, SkillAlias, SkillCategory
+
+ROWS = 12
+
+
+class APITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Computer Science', code='CSE')
+        cls.user = cls.make_user('learner', department)
+        cls.tutors = [cls.make_user(f'tutor{i}', department) for i in range(ROWS)]
+        categories = [SkillCategory.objects.create(name=f'Category {i}') for i in range(3)]
+        cls.skills = []
+        for i in range(ROWS):
+            skill = Skill.objects.create(name=f'Skill {i}', category=categories[i % 3])
+            SkillAlias.objects.create(skill=skill, name=f'Alias {i}')
+            cls.skills.append(skill)
+
+        start = timezone.now() + timedelta(days=1)
+        for i, (tutor, skill) in enumerate(zip(cls.tutors, cls.skills)):
+            offered = OfferedSkill.objects.create(user=tutor, skill=skill, proficiency_level='advanced')
+            desired = DesiredSkill.objects.create(user=cls.user, skill=skill)
+            request = SkillSwapRequest.objects.create(
+                requester=cls.user, recipient=tutor, offered_skill=offered, desired_skill=desired,
+            )
+            session = SkillSwapSession.objects.create(
+                request=request, teacher=tutor, learner=cls.user, skill=skill,
+                scheduled_date=start + timedelta(hours=i),
+            )
+            SessionReview.objects.create(
+                session=session, reviewer=cls.user, reviewee=tutor, overall_rating=5, communication_rating=5,
+                knowledge_rating=5, punctuality_rating=5, review_text='Great', is_anonymous=i % 2 == 0,
+            )
+            Notification.objects.create(
+                recipient=cls.user, notification_type='system', title='Hello', message='Hi', related_user=tutor,
+            )
+
+    @classmethod
+    def make_user(cls, username, department):
+        user = User.objects.create_user(username, f'{username}@example.edu', 'password', first_name=username)
+        UserProfile.objects.create(user=user, university_email=f'{username}@example.edu', department=department)
+        return user
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries), response.json()
+
+
+class APIv1QueryCountTests(APITestCase):
+    """Each endpoint's queries must not grow with the number of rows it returns"""
+
+    endpoints = ['skill', 'offer', 'desire', 'request', 'session', 'review', 'notification']
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        for endpoint in self.endpoints:
+            with self.subTest(endpoint=endpoint):
+                url = reverse(f'api_v1:{endpoint}-list')
+                small, small_page = self.count_queries(url, page_size=2)
+                large, large_page = self.count_queries(url, page_size=ROWS)
+                self.assertEqual(len(small_page['results']), 2)
+                self.assertEqual(len(large_page['results']), ROWS)
+                self.assertEqual(small, large)
+
+    def test_detail_matches_list_row(self):
+        for endpoint in self.endpoints:
+            with self.subTest(endpoint=endpoint):
+                listed = self.client.get(reverse(f'api_v1:{endpoint}-list'), {'page_size': 1}).json()['results'][0]
+                detail = self.client.get(reverse(f'api_v1:{endpoint}-detail', args=[listed['id']]))
+                self.assertEqual(detail.json(), listed)
+
+    def test_cursor_walks_every_row_once(self):
+        url, seen = reverse('api_v1:offer-list'), []
+        params = {'page_size': 5}
+        while url:
+            page = self.client.get(url, params).json()
+            seen += [offer['id'] for offer in page['results']]
+            url, params = page['next'], {}
+        self.assertEqual(sorted(seen), sorted(OfferedSkill.objects.values_list('id', flat=True)))
+
+    def test_anonymous_reviewer_is_hidden(self):
+        reviews = self.client.get(reverse('api_v1:review-list'), {'page_size': ROWS}).json()['results']
+        anonymous = set(SessionReview.objects.filter(is_anonymous=True).values_list('id', flat=True))
+        for review in reviews:
+            self.assertEqual(review['reviewer'] is None, review['id'] in anonymous)
+
+    def test_requests_are_limited_to_the_user(self):
+        self.client.force_login(self.tutors[0])
+        requests = self.client.get(reverse('api_v1:request-list')).json()['results']
+        self.assertEqual([request['recipient']['id'] for request in requests], [self.tutors[0].id])
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_v1:skill-list')).status_code, 403)
+
+
+class LegacyAPITests(APITestCase):
+    def test_user_search_query_count_is_independent_of_results(self):
+        url = reverse('api:user_search')
+        one, found = self.count_queries(url, q='tutor1')
+        many, found_many = self.count_queries(url, q='tutor')
+        self.assertLess(len(found['results']), len(found_many['results']))
+        self.assertEqual(one, many)
+
+    def test_send_request_creates_a_pending_request(self):
+        tutor = self.tutors[0]
+        SkillSwapRequest.objects.filter(requester=self.user, recipient=tutor).update(status='declined')
+        offered = tutor.offered_skills.get()
+        response = self.client.post(
+            reverse('api:send_request', args=[tutor.id]),
+            {'offered_skill': offered.id, 'message': 'Hi', 'proposed_format': 'online'},
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        request = SkillSwapRequest.objects.get(pk=response.json()['request_id'])
+        self.assertEqual((request.requester, request.recipient, request.status), (self.user, tutor, 'pending'))
+
+    def test_send_request_rejects_duplicates_and_other_tutors_skills(self):
+        tutor = self.tutors[0]
+        url = reverse('api:send_request', args=[tutor.id])
+        duplicate = self.client.post(url, {'offered_skill': tutor.offered_skills.get().id, 'proposed_format': 'online'})
+        self.assertEqual(duplicate.status_code, 400)
+
+        SkillSwapRequest.objects.filter(requester=self.user, recipient=tutor).update(status='declined')
+        other = self.tutors[1].offered_skills.get()
+        foreign = self.client.post(url, {'offered_skill': other.id, 'proposed_format': 'online'})
+        self.assertEqual(foreign.status_code, 400)
+        self.assertIn('offered_skill', foreign.json()['errors'])
+
+    def test_send_request_to_unknown_user(self):
+        response = self.client.post(reverse('api:send_request', args=[0]), {})
+        self.assertEqual(response.status_code, 404)
+
+
+class QueryPlanTests(TestCase):
+    def test_plan_flags_scans_and_sorts(self):
+        sorted_plan = 'SEARCH review USING INDEX review_reviewer_id (reviewer_id=?)\nUSE TEMP B-TREE FOR ORDER BY'
+        self.assertFalse(QueryPlan('q', 'SCAN review', 'sqlite').ok)
+        self.assertTrue(QueryPlan('q', 'SCAN review USING INDEX review_reviewee_idx', 'sqlite').ok)
+        self.assertFalse(QueryPlan('q', sorted_plan, 'sqlite').ok)
+        self.assertTrue(QueryPlan('q', sorted_plan, 'sqlite', allow_sort=True).ok)
+
+    def test_hot_queries_use_indexes_in_order(self):
+        call_command('check_query_plans', stdout=StringIO())
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        cache.local_cache.clear()
+        self.addCleanup(cache.local_cache.clear)
+
+    def test_versions_live_in_the_shared_tier(self):
+        before, = cache.get_versions(['skills'])
+        self.assertEqual(cache.get_or_set('answer', lambda: 1, ('skills',)), 1)
+        # As seen by another process: nothing local survives
+        cache.local_cache.clear()
+        cache._local_versions.clear()
+        self.assertEqual(cache.get_or_set('answer', lambda: 2, ('skills',)), 1)
+        cache.bump_version('skills')
+        cache._local_versions.clear()
+        self.assertNotEqual(cache.get_versions(['skills']), [before])
+        self.assertEqual(cache.get_or_set('answer', lambda: 3, ('skills',)), 3)
+
+    def test_evicted_counters_never_reuse_old_versions(self):
+        cache.bump_version('skills')
+        old, = cache.get_versions(['skills'])
+        cache.shared_cache().delete('version:skills')
+        self.assertGreater(cache.get_versions(['skills'])[0], old)
+
+    @override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        LOCAL_ONLY_CACHE_TIMEOUT=30,
+    )
+    def test_local_only_values_are_kept_briefly(self):
+        self.assertIsNone(cache.shared_cache())
+        with mock.patch.object(cache.local_cache, 'set', wraps=cache.local_cache.set) as local_set:
+            cache.get_or_set('answer', lambda: 1, timeout=600)
+        self.assertEqual(local_set.call_args.args[2], 30)
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.category = SkillCategory.objects.create(name='Programming', description='Writing software')
+        self.skill = Skill.objects.create(name='Python', category=self.category, description='Scripting language')
+        self.user = User.objects.create_user('alice', 'alice@example.edu', 'password', first_name='Alice')
+        UserProfile.objects.create(user=self.user, university_email='alice@example.edu', bio='Loves astronomy')
+        OfferedSkill.objects.create(user=self.user, skill=self.skill, proficiency_level='expert')
+
+    def ids(self, query, **kwargs):
+        return search.search_ids(query, **kwargs)
+
+    def test_prefix_terms_match_every_kind(self):
+        self.assertEqual(self.ids('pyth'), {'skill': [self.skill.pk], 'category': [], 'user': [self.user.pk]})
+        self.assertEqual(self.ids('progr')['category'], [self.category.pk])
+        self.assertEqual(self.ids('astro')['user'], [self.user.pk])
+        self.assertEqual(self.ids('  !! '), {'skill': [], 'category': [], 'user': []})
+
+    def test_renames_reach_dependent_documents(self):
+        self.skill.name = 'Rust'
+        self.skill.save()
+        self.assertEqual(self.ids('python'), {'skill': [], 'category': [], 'user': []})
+        # Users carry the names of the skills they offer
+        self.assertEqual(self.ids('rust')['user'], [self.user.pk])
+
+        self.category.name = 'Systems'
+        self.category.save()
+        # Skills carry their category's name
+        self.assertEqual(self.ids('systems'), {'skill': [self.skill.pk], 'category': [self.category.pk], 'user': []})
+
+        profile = self.user.profile
+        profile.bio = 'Enjoys chess'
+        profile.save()
+        self.assertEqual(self.ids('astronomy')['user'], [])
+        self.assertEqual(self.ids('chess')['user'], [self.user.pk])
+
+    def test_deletes_and_deactivation_remove_documents(self):
+        self.user.profile.delete()
+        self.user.delete()
+        self.assertEqual(self.ids('alice')['user'], [])
+        self.skill.delete()
+        self.assertEqual(self.ids('python')['skill'], [])
+        self.category.is_active = False
+        self.category.save()
+        self.assertEqual(self.ids('programming')['category'], [])
+
+    def test_each_kind_keeps_its_best_matches(self):
+        # Title matches outrank keyword matches, which outrank body matches
+        body = Skill.objects.create(name='Django', category=self.category, description='Web apps with Python')
+        keyword_category = SkillCategory.objects.create(name='Python Tools')
+        keyword = Skill.objects.create(name='Pip', category=keyword_category)
+        for i in range(3):
+            Skill.objects.create(name=f'Python {i}', category=self.category)
+        ranked = self.ids('python', limit=10)['skill']
+        self.assertEqual(ranked[-2:], [keyword.pk, body.pk])
+
+        top = self.ids('python', limit=2)
+        self.assertEqual(len(top['skill']), 2)
+        self.assertEqual(top['category'], [keyword_category.pk])
+        self.assertEqual(top['user'], [self.user.pk])
+        self.assertEqual(self.ids('python', kinds=('skill',), limit=2), {'skill': top['skill']})
+        self.assertNotIn(body.pk, top['skill'])
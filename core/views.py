@@ -1,23 +1,24 @@
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
-from django.db import models
 from skill_sessions.models import SkillSwapRequest, SkillSwapSession
+from skill_sessions.participants import sessions_for
+from .pagination import paginate
 
 def home(request):
     from django.contrib.auth.models import User
     from skills.models import Skill, OfferedSkill
     from skill_sessions.models import SkillSwapSession
-    from accounts.models import UserProfile
+    from core.cache import get_or_set
     
-    # Calculate dynamic stats
-    stats = {
+    # Calculate dynamic stats, cached until users, skills or sessions change
+    stats = get_or_set('home_stats', lambda: {
         'total_users': User.objects.filter(is_active=True).count(),
         'total_skills': Skill.objects.count(),
         'total_offered_skills': OfferedSkill.objects.count(),
         'total_sessions': SkillSwapSession.objects.filter(status='completed').count(),
         'active_sessions': SkillSwapSession.objects.filter(status__in=['scheduled', 'in_progress']).count(),
-    }
+    }, namespaces=('users', 'skills', 'sessions'))
     
     context = {
         'stats': stats
@@ -36,33 +37,14 @@ class DashboardView:
         @login_required
         def dashboard_view(request):
             from skills.models import DesiredSkill, OfferedSkill
-            from skill_sessions.models import SkillSwapSession
-            from django.db.models import Q, Count
-            from datetime import datetime, timedelta
+            from skill_sessions.models import SkillSwapSession, SkillSwapRequest
+            from skill_sessions.stats import get_user_stats
             
             # Calculate user-specific stats
             user = request.user
             
-            # Skills completed - count sessions where user was learner and status is completed
-            skills_completed = SkillSwapSession.objects.filter(
-                learner=user,
-                status='completed'
-            ).values('skill').distinct().count()
-            
-            # Sessions this month
-            first_day_of_month = datetime.now().replace(day=1)
-            sessions_this_month = SkillSwapSession.objects.filter(
-                Q(teacher=user) | Q(learner=user),
-                created_at__gte=first_day_of_month,
-                status='completed'
-            ).count()
-            
-            # Active requests - pending requests where user is involved
-            from skill_sessions.models import SkillSwapRequest
-            active_requests = SkillSwapRequest.objects.filter(
-                Q(requester=user) | Q(recipient=user),
-                status='pending'
-            ).count()
+            # Dashboard counters are maintained by skill_sessions.signals
+            user_stats = get_user_stats(user)
             
             # Recent requests for the user (both sent and received)
             recent_requests_received = SkillSwapRequest.objects.filter(
@@ -98,15 +80,13 @@ class DashboardView:
             recent_requests = recent_requests[:10]
             
             # Progress data
-            completed_courses = SkillSwapSession.objects.filter(
-                learner=user,
-                status='completed'
-            ).count()
+            profile = getattr(user, 'profile', None)
+            completed_courses = profile.total_sessions_learned if profile else 0
             
             stats = {
-                'skills_completed': skills_completed,
-                'sessions_this_month': sessions_this_month,
-                'active_requests': active_requests,
+                'skills_completed': user_stats.skills_completed,
+                'sessions_this_month': user_stats.sessions_this_month,
+                'active_requests': user_stats.active_requests,
             }
             
             progress = {
@@ -143,9 +123,8 @@ class RequestsView:
             ).order_by('-created_at')
             
             # Get active sessions for the current user
-            active_sessions = SkillSwapSession.objects.filter(
-                models.Q(teacher=request.user) | models.Q(learner=request.user),
-                status__in=['scheduled', 'in_progress']
+            active_sessions = sessions_for(
+                request.user, statuses=['scheduled', 'in_progress']
             ).select_related(
                 'teacher', 'learner', 'skill'
             ).order_by('scheduled_date')
@@ -158,9 +137,15 @@ class RequestsView:
                 'active_sessions': active_sessions.count(),
             }
             
+            # Each list pages independently with its own cursor
+            received_cursor = request.GET.get('received')
+            sent_cursor = request.GET.get('sent')
+            
             context = {
-                'received_requests': received_requests,
-                'sent_requests': sent_requests,
+                'received_requests': paginate(received_requests, received_cursor),
+                'sent_requests': paginate(sent_requests, sent_cursor),
+                'received_cursor': received_cursor,
+                'sent_cursor': sent_cursor,
                 'active_sessions': active_sessions,
                 'stats': stats,
             }
@@ -177,7 +162,32 @@ class UserProfileView:
 class SearchView:
     @classmethod
     def as_view(cls):
-        return lambda r: render(r, "core/search.html")
+        def search_view(request):
+            from .search import KIND_CODES, search
+            
+            query = request.GET.get('q', '').strip()
+            kind = request.GET.get('type', '')
+            # One kind gets a longer list; the unified view shows the best few of each
+            if kind in KIND_CODES:
+                results = search(query, (kind,), limit=50)
+            else:
+                kind = ''
+                results = search(query, limit=8)
+            
+            context = {
+                'query': query,
+                'type': kind,
+                'skills': results.get('skill', []),
+                'categories': results.get('category', []),
+                'people': results.get('user', []),
+            }
+            context['has_results'] = any([context['skills'], context['categories'], context['people']])
+            if query and not context['skills'] and kind in ('', 'skill'):
+                from skills.fuzzy import did_you_mean
+                context['did_you_mean'] = did_you_mean(query)
+            return render(request, "core/search.html", context)
+        
+        return search_view
 
 class NotificationListView:
     @classmethod
@@ -185,21 +195,16 @@ class NotificationListView:
         @login_required
         def notification_view(request):
             from accounts.models import Notification
-            from django.core.paginator import Paginator
             
             # Get all notifications for the current user
-            notifications = Notification.objects.filter(
-                recipient=request.user
-            ).order_by('-created_at')
+            notifications = Notification.objects.filter(recipient=request.user)
             
-            # Pagination - limit to 10 notifications per page
-            paginator = Paginator(notifications, 10)
-            page_number = request.GET.get('page')
-            notifications_page = paginator.get_page(page_number)
+            # Keyset pagination - 10 notifications per page
+            notifications_page = paginate(notifications, request.GET.get('cursor'), page_size=10)
             
             # Mark all unread notifications as read when viewing the page
-            unread_notifications = notifications.filter(is_read=False)
-            unread_notifications.update(is_read=True)
+            from accounts.notifications import mark_all_read
+            mark_all_read(request.user)
             
             context = {
                 'notifications': notifications_page,
@@ -220,7 +225,7 @@ def mark_notification_read(request, notification_id):
     return JsonResponse({"status": "success"})
 
 def mark_all_notifications_read(request):
-    from accounts.models import Notification
+    from accounts.notifications import mark_all_read
     
-    Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    mark_all_read(request.user)
     return JsonResponse({"status": "success"})
@@ -0,0 +1,99 @@
+"""
+Read-only viewsets of the v1 REST API (``/api/v1/``).
+
+Querysets pass through their serializer's ``plan_queryset`` (see
+core.serializers), so list pages and detail lookups load their relations
+in a fixed number of queries whatever the page size.
+"""
+from django.db.models import Q
+from rest_framework import viewsets
+
+from accounts.models import Notification
+from skill_sessions.models import SessionReview, SkillSwapRequest
+from skill_sessions.participants import sessions_for
+from skills.models import DesiredSkill, OfferedSkill, Skill
+
+from .serializers import (
+    DesiredSkillSerializer, NotificationSerializer, OfferedSkillSerializer, SessionReviewSerializer,
+    SkillSerializer, SkillSwapRequestSerializer, SkillSwapSessionSerializer,
+)
+
+
+class PlannedViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only viewset applying its serializer's query plan. ``filter_params``
+    maps query parameters to lookups given ids, e.g. ``?skill=3`` ->
+    ``skill_id=3``.
+    """
+    filter_params = {}
+
+    def filter_queryset(self, queryset):
+        lookups = {}
+        for param, lookup in self.filter_params.items():
+            value = self.request.query_params.get(param, '')
+            if value.isdigit():
+                lookups[lookup] = int(value)
+        queryset = super().filter_queryset(queryset).filter(**lookups)
+        return self.get_serializer_class().plan_queryset(queryset)
+
+
+class SkillViewSet(PlannedViewSet):
+    serializer_class = SkillSerializer
+    filter_params = {'category': 'category_id'}
+
+    def get_queryset(self):
+        return Skill.objects.all()
+
+
+class OfferedSkillViewSet(PlannedViewSet):
+    serializer_class = OfferedSkillSerializer
+    filter_params = {'skill': 'skill_id', 'user': 'user_id'}
+
+    def get_queryset(self):
+        return OfferedSkill.objects.filter(is_active=True)
+
+
+class DesiredSkillViewSet(PlannedViewSet):
+    serializer_class = DesiredSkillSerializer
+    filter_params = {'skill': 'skill_id', 'user': 'user_id'}
+
+    def get_queryset(self):
+        return DesiredSkill.objects.filter(is_active=True)
+
+
+class SkillSwapRequestViewSet(PlannedViewSet):
+    """Requests the user sent or received; ``?box=sent`` or ``?box=received`` for one side"""
+    serializer_class = SkillSwapRequestSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        box = self.request.query_params.get('box')
+        if box == 'sent':
+            return SkillSwapRequest.objects.filter(requester=user)
+        if box == 'received':
+            return SkillSwapRequest.objects.filter(recipient=user)
+        return SkillSwapRequest.objects.filter(Q(requester=user) | Q(recipient=user))
+
+
+class SkillSwapSessionViewSet(PlannedViewSet):
+    """Sessions the user teaches or learns in, optionally ``?status=``"""
+    serializer_class = SkillSwapSessionSerializer
+
+    def get_queryset(self):
+        status = self.request.query_params.get('status')
+        return sessions_for(self.request.user, statuses=[status] if status else None)
+
+
+class SessionReviewViewSet(PlannedViewSet):
+    serializer_class = SessionReviewSerializer
+    filter_params = {'reviewee': 'reviewee_id', 'session': 'session_id'}
+
+    def get_queryset(self):
+        return SessionReview.objects.filter(is_public=True, is_flagged=False)
+
+
+class NotificationViewSet(PlannedViewSet):
+    serializer_class = NotificationSerializer
+
+    def get_queryset(self):
+        return Notification.objects.filter(recipient=self.request.user)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import SkillSwapRequest, SkillSwapSession, SessionReview, SessionReminder
+from django.db import transaction
+from .models import SkillSwapRequest, SkillSwapSession, SessionReview, SessionReminder, UserStats
 
 @admin.register(SkillSwapRequest)
 class SkillSwapRequestAdmin(admin.ModelAdmin):
@@ -29,7 +30,11 @@ class SkillSwapRequestAdmin(admin.ModelAdmin):
     actions = ['mark_as_expired']
     
     def mark_as_expired(self, request, queryset):
-        queryset.filter(status='pending').update(status='expired')
+        # Save each row so the stats signals move it out of the pending counters
+        with transaction.atomic():
+            for swap_request in queryset.filter(status='pending'):
+                swap_request.status = 'expired'
+                swap_request.save(update_fields=['status', 'updated_at'])
     mark_as_expired.short_description = "Mark selected pending requests as expired"
 
 @admin.register(SkillSwapSession)
@@ -116,3 +121,13 @@ class SessionReminderAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('session', 'user')
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_sessions', 'upcoming_sessions', 'completed_sessions',
+                   'active_requests', 'pending_requests', 'skills_completed', 'updated_at')
+    search_fields = ('user__username',)
+    readonly_fields = ('updated_at',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
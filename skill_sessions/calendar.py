@@ -0,0 +1,292 @@
+"""
+Calendar export of a user's sessions as an iCalendar feed and JSON events.
+
+Events are generated from ``.iterator()`` querysets and streamed, so a feed
+covering years of sessions is never held in memory. ``calendar_validators``
+derives a strong ETag and ``Last-Modified`` from one aggregate over the
+user's participant rows (newest session ``updated_at`` and row count), so an
+unchanged calendar answers 304 without loading any session.
+
+Feed URLs carry a signed copy of a random per-user key stored on the
+profile, so resetting the key revokes every URL handed out before.
+
+Sync tokens are signed timestamps: ``changes_since`` returns the sessions
+updated since the token plus the ids in ``CalendarTombstone`` rows written
+when a session left the user's calendar.
+"""
+import hashlib
+import json
+import secrets
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from accounts.models import UserProfile
+
+from .models import CalendarTombstone, SessionParticipant
+from .participants import sessions_for
+
+FEED_SALT = 'skill_sessions.calendar.feed'
+SYNC_SALT = 'skill_sessions.calendar.sync'
+
+# Next sync tokens start this far back so sessions saved in transactions still
+# open while a delta was read are sent again rather than missed
+SYNC_OVERLAP = timedelta(seconds=5)
+
+ICAL_STATUS = {
+    'scheduled': 'CONFIRMED',
+    'in_progress': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'cancelled': 'CANCELLED',
+    'no_show': 'CANCELLED',
+}
+
+
+class InvalidSyncToken(ValueError):
+    """The sync token is malformed, belongs to another user or has expired"""
+
+
+def feed_token(user):
+    """
+    Token identifying ``user``'s feed to calendar clients that have no login
+    session, issuing their feed key on first use. None without a profile.
+    """
+    profiles = UserProfile.objects.filter(user_id=user.pk)
+    key = profiles.values_list('calendar_feed_key', flat=True).first()
+    if key is None:
+        return None
+    if not key:
+        # A concurrent request may have issued one first; keep whichever won
+        profiles.filter(calendar_feed_key='').update(calendar_feed_key=secrets.token_hex(16))
+        key = profiles.values_list('calendar_feed_key', flat=True).get()
+    return signing.Signer(salt=FEED_SALT).sign(f'{user.pk}:{key}')
+
+
+def reset_feed_key(user):
+    """Replace ``user``'s feed key, so every feed URL issued so far stops working"""
+    UserProfile.objects.filter(user_id=user.pk).update(calendar_feed_key=secrets.token_hex(16))
+
+
+def feed_user(token):
+    """The active user whose current feed key is signed into ``token``, or None"""
+    try:
+        user_id, key = signing.Signer(salt=FEED_SALT).unsign(token).split(':')
+        user_id = int(user_id)
+    except (signing.BadSignature, ValueError):
+        return None
+    if not key:
+        return None
+    return User.objects.filter(pk=user_id, is_active=True, profile__calendar_feed_key=key).first()
+
+
+def default_range():
+    """``CALENDAR_PAST_DAYS`` before to ``CALENDAR_FUTURE_DAYS`` after today, at local midnights"""
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time(0)))
+    return today - timedelta(days=settings.CALENDAR_PAST_DAYS), today + timedelta(days=settings.CALENDAR_FUTURE_DAYS)
+
+
+def parse_moment(value):
+    moment = datetime.fromisoformat(value)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def parse_range(params):
+    """
+    ``start`` and ``end`` (ISO dates or datetimes) from query parameters,
+    defaulting to ``default_range``. Raises ValueError on bad input or ranges
+    longer than ``CALENDAR_MAX_RANGE_DAYS``.
+    """
+    default_start, default_end = default_range()
+    start = parse_moment(params['start']) if params.get('start') else default_start
+    end = parse_moment(params['end']) if params.get('end') else default_end
+    if end <= start:
+        raise ValueError('end must be after start')
+    if end - start > timedelta(days=settings.CALENDAR_MAX_RANGE_DAYS):
+        raise ValueError(f'ranges are limited to {settings.CALENDAR_MAX_RANGE_DAYS} days')
+    return start, end
+
+
+def calendar_sessions(user, start=None, end=None):
+    return sessions_for(user, start=start, end=end).select_related(
+        'skill', 'teacher', 'learner'
+    ).order_by('scheduled_date', 'pk')
+
+
+def calendar_validators(user, *variant):
+    """
+    ``(etag, last_modified)`` of ``user``'s calendar. ``variant`` (format,
+    range...) goes into the ETag so each representation has its own.
+    """
+    state = SessionParticipant.objects.filter(user=user).aggregate(
+        updated=Max('session__updated_at'), count=Count('id')
+    )
+    last_modified = state['updated']
+    key = ':'.join(str(part) for part in (
+        user.pk, last_modified.isoformat() if last_modified else '', state['count'], *variant
+    ))
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"', last_modified
+
+
+def not_modified(request, etag, last_modified):
+    """The 304 (or 412) response for a conditional request, or None"""
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+
+
+def with_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Always revalidate; the validators make that a cheap 304
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def event_title(session, user):
+    if session.teacher_id == user.pk:
+        return f"Teaching {session.skill.name} to {session.learner.get_full_name() or session.learner.username}"
+    return f"Learning {session.skill.name} from {session.teacher.get_full_name() or session.teacher.username}"
+
+
+def event_dict(session, user):
+    return {
+        'id': session.pk,
+        'title': event_title(session, user),
+        'skill': session.skill.name,
+        'role': 'teacher' if session.teacher_id == user.pk else 'learner',
+        'start': session.scheduled_date,
+        'end': session.end_time or session.get_end_time(),
+        'status': session.status,
+        'format': session.format,
+        'location': session.location,
+        'meeting_link': session.meeting_link,
+        'updated_at': session.updated_at,
+    }
+
+
+def ical_escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def ical_fold(line):
+    """Split a content line into 75-octet lines without cutting UTF-8 sequences"""
+    data = line.encode()
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode())
+        start, limit = end, 74  # Continuation lines lose an octet to the leading space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ical_time(moment):
+    return moment.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def ical_event(session, user, host):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:session-{session.pk}@{host}',
+        f'DTSTAMP:{ical_time(session.updated_at)}',
+        f'CREATED:{ical_time(session.created_at)}',
+        f'LAST-MODIFIED:{ical_time(session.updated_at)}',
+        f'DTSTART:{ical_time(session.scheduled_date)}',
+        f'DTEND:{ical_time(session.end_time or session.get_end_time())}',
+        f'SUMMARY:{ical_escape(event_title(session, user))}',
+        f'STATUS:{ICAL_STATUS.get(session.status, "CONFIRMED")}',
+    ]
+    if session.location:
+        lines.append(f'LOCATION:{ical_escape(session.location)}')
+    if session.meeting_link:
+        lines.append(f'URL:{session.meeting_link}')
+    lines.append('END:VEVENT')
+    return ''.join(ical_fold(line) for line in lines)
+
+
+def ical_feed(sessions, user, host):
+    """Chunks of a VCALENDAR with one VEVENT per session, one chunk per event"""
+    yield ''.join(ical_fold(line) for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//{host}//Campus Skill-Swap//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Skill-Swap Sessions',
+    ))
+    for session in sessions.iterator(chunk_size=200):
+        yield ical_event(session, user, host)
+    yield ical_fold('END:VCALENDAR')
+
+
+def json_events(fields, sessions, user, **lists):
+    """
+    Chunks of a JSON object holding ``fields``, an ``events`` list built from
+    ``sessions`` one chunk per event, and the extra ``lists``.
+    """
+    head = json.dumps(fields, cls=DjangoJSONEncoder)[:-1]
+    yield head + (', ' if fields else '') + '"events": ['
+    for index, session in enumerate(sessions.iterator(chunk_size=200)):
+        yield (', ' if index else '') + json.dumps(event_dict(session, user), cls=DjangoJSONEncoder)
+    yield ']'
+    for key, items in lists.items():
+        yield f', {json.dumps(key)}: {json.dumps(list(items), cls=DjangoJSONEncoder)}'
+    yield '}'
+
+
+def make_sync_token(user):
+    """Token for the next delta, taken before the sessions it goes out with are read"""
+    moment = timezone.now() - SYNC_OVERLAP
+    return signing.Signer(salt=SYNC_SALT).sign(f'{user.pk}:{int(moment.timestamp() * 1_000_000)}')
+
+
+def read_sync_token(user, token):
+    try:
+        user_id, micros = signing.Signer(salt=SYNC_SALT).unsign(token).split(':')
+        since = datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+    except (signing.BadSignature, ValueError):
+        raise InvalidSyncToken('Invalid sync token')
+    if int(user_id) != user.pk:
+        raise InvalidSyncToken('Invalid sync token')
+    if since < timezone.now() - timedelta(days=settings.CALENDAR_SYNC_RETENTION_DAYS):
+        raise InvalidSyncToken('Sync token expired')
+    return since
+
+
+def changes_since(user, token):
+    """
+    ``(sessions, deleted_ids, next_token)`` for a client that last synced at
+    ``token``: sessions updated since then, including cancelled ones, and the
+    ids of sessions no longer on the user's calendar. Raises InvalidSyncToken
+    when the client has to fetch the full range again.
+    """
+    since = read_sync_token(user, token)
+    next_token = make_sync_token(user)
+    sessions = calendar_sessions(user).filter(updated_at__gte=since)
+    deleted = CalendarTombstone.objects.filter(user_id=user.pk, deleted_at__gte=since).exclude(
+        session_id__in=sessions_for(user).values('pk')
+    ).values_list('session_id', flat=True).distinct()
+    return sessions, deleted, next_token
+
+
+def record_removal(user_id, session_id):
+    """Write a tombstone for the user's sync clients and prune expired ones"""
+    now = timezone.now()
+    CalendarTombstone.objects.create(user_id=user_id, session_id=session_id, deleted_at=now)
+    CalendarTombstone.objects.filter(
+        deleted_at__lt=now - timedelta(days=settings.CALENDAR_SYNC_RETENTION_DAYS)
+    ).delete()
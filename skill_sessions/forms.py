@@ -126,37 +126,37 @@ class SessionScheduleForm(forms.ModelForm):
                 session_end_time = scheduled_date + timedelta(minutes=duration_minutes)
                 
                 # Import here to avoid circular imports
-                from .models import SkillSwapSession
-                from django.db.models import Q
+                from .scheduling import find_conflict, next_free_slot
                 
-                # Get user from form instance (if available) or from the view
+                # Check both participants: those set by the view, the stored teacher and
+                # learner when editing, or at least the current user
                 user = getattr(self, 'user', None)
-                if hasattr(self, 'instance') and hasattr(self.instance, 'teacher'):
-                    user = self.instance.teacher
-                elif hasattr(self, 'instance') and hasattr(self.instance, 'learner'):
-                    user = self.instance.learner
+                user_ids = getattr(self, 'participant_ids', None)
+                if not user_ids and self.instance.pk:
+                    user_ids = [self.instance.teacher_id, self.instance.learner_id]
+                elif not user_ids and user:
+                    user_ids = [user.pk]
                 
-                if user:
-                    # Check for overlapping sessions where user is either teacher or learner
-                    overlapping_sessions = SkillSwapSession.objects.filter(
-                        Q(teacher=user) | Q(learner=user),
-                        status__in=['scheduled', 'in_progress'],
-                        scheduled_date__lt=session_end_time,
-                        scheduled_date__gte=scheduled_date - timedelta(minutes=480)  # Check 8 hours before to account for long sessions
-                    )
-                    
-                    # Filter sessions that actually overlap
-                    for session in overlapping_sessions:
-                        existing_end = session.scheduled_date + timedelta(minutes=session.duration_minutes)
-                        
-                        # Check if the time ranges overlap
-                        if (scheduled_date < existing_end and session_end_time > session.scheduled_date):
-                            # Exclude the current session if we're editing
-                            if not (hasattr(self, 'instance') and self.instance.pk == session.pk):
-                                raise forms.ValidationError(
-                                    f'You already have a session scheduled from {session.scheduled_date.strftime("%b %d, %Y at %I:%M %p")} '
-                                    f'to {existing_end.strftime("%I:%M %p")}. Please choose a different time.'
-                                )
+                if user_ids:
+                    # Excluding the current session if we're editing
+                    conflict = find_conflict(user_ids, scheduled_date, session_end_time, exclude=self.instance.pk)
+                    if conflict:
+                        session = conflict.session
+                        if user and conflict.user_id == user.pk:
+                            who = 'You already have'
+                        else:
+                            who = f'{conflict.user.get_full_name() or conflict.user.username} already has'
+                        message = (
+                            f'{who} a session scheduled from '
+                            f'{timezone.localtime(session.scheduled_date).strftime("%b %d, %Y at %I:%M %p")} '
+                            f'to {timezone.localtime(session.end_time).strftime("%I:%M %p")}.'
+                        )
+                        free = next_free_slot(user_ids, duration_minutes, after=scheduled_date, exclude=self.instance.pk)
+                        if free:
+                            message += f' The next free time for both of you is {timezone.localtime(free).strftime("%b %d, %Y at %I:%M %p")}.'
+                        else:
+                            message += ' Please choose a different time.'
+                        raise forms.ValidationError(message)
         
         if format_type == 'online' and not meeting_link:
             raise forms.ValidationError('Meeting link is required for online sessions.')
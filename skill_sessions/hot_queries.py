@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.pagination import keyset_queryset
+from core.queryplans import hot_query
+from .models import SkillSwapRequest, SkillSwapSession, SessionReview
+from .participants import sessions_for
+from .scheduling import busy_participants
+
+
+@hot_query('requests.received_pending')
+def received_pending():
+    return SkillSwapRequest.objects.filter(recipient_id=1, status='pending').order_by('-created_at')
+
+
+@hot_query('requests.sent')
+def sent():
+    return SkillSwapRequest.objects.filter(requester_id=1).order_by('-created_at', '-id')[:21]
+
+
+@hot_query('requests.sent_older_page')
+def sent_older_page():
+    return keyset_queryset(SkillSwapRequest.objects.filter(requester_id=1), 'next', (timezone.now(), 1))[:21]
+
+
+@hot_query('requests.received_older_page')
+def received_older_page():
+    return keyset_queryset(SkillSwapRequest.objects.filter(recipient_id=1), 'next', (timezone.now(), 1))[:21]
+
+
+@hot_query('requests.received_newer_page')
+def received_newer_page():
+    return keyset_queryset(SkillSwapRequest.objects.filter(recipient_id=1), 'prev', (timezone.now(), 1))[:21]
+
+
+@hot_query('requests.pending_pair')
+def pending_pair():
+    return SkillSwapRequest.objects.filter(requester_id=1, recipient_id=2, status='pending')
+
+
+@hot_query('requests.expired_pending')
+def expired_pending():
+    return SkillSwapRequest.objects.filter(status='pending', expires_at__lt=timezone.now()).order_by('expires_at')
+
+
+@hot_query('sessions.upcoming_teaching')
+def upcoming_teaching():
+    return SkillSwapSession.objects.filter(
+        teacher_id=1, status='scheduled', scheduled_date__gte=timezone.now()
+    ).order_by('scheduled_date')
+
+
+@hot_query('sessions.upcoming_learning')
+def upcoming_learning():
+    return SkillSwapSession.objects.filter(
+        learner_id=1, status='scheduled', scheduled_date__gte=timezone.now()
+    ).order_by('scheduled_date')
+
+
+# Merges the rows of two statuses, so the user's active sessions are sorted
+@hot_query('sessions.active_for_user', allow_sort=True)
+def active_for_user():
+    return sessions_for(1, statuses=['scheduled', 'in_progress']).order_by('scheduled_date')
+
+
+# Sorts the few rows overlapping one slot, across users and statuses
+@hot_query('sessions.conflicts', allow_sort=True)
+def conflicts():
+    now = timezone.now()
+    return busy_participants([1, 2], now, now + timedelta(hours=1))
+
+
+@hot_query('reviews.public_received')
+def public_received():
+    return SessionReview.objects.filter(reviewee_id=1, is_public=True).order_by('-created_at')
+
+
+# An OR across the reviewer and reviewee indexes; their union is sorted
+@hot_query('reviews.for_user', allow_sort=True)
+def reviews_for_user():
+    return SessionReview.objects.filter(Q(reviewer_id=1) | Q(reviewee_id=1)).order_by('-created_at', '-id')[:21]
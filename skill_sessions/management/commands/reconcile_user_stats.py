@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from skill_sessions.models import UserStats
+from skill_sessions.stats import COUNTER_FIELDS, compute_stats, current_month_start
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized UserStats counters and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted rows without changing them'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Reconciling user stats...')
+        
+        expected = compute_stats()
+        month = current_month_start().date()
+        zeros = dict.fromkeys(COUNTER_FIELDS, 0)
+        
+        existing = {stats.user_id: stats for stats in UserStats.objects.all()}
+        to_update = []
+        to_create = []
+        
+        for user_id in existing.keys() | expected.keys():
+            values = expected.get(user_id, zeros)
+            stats = existing.get(user_id)
+            if stats is None:
+                to_create.append(UserStats(user_id=user_id, stats_month=month, **values))
+                continue
+            drifted = [field for field in COUNTER_FIELDS if getattr(stats, field) != values[field]]
+            if drifted or stats.stats_month != month:
+                if drifted:
+                    self.stdout.write(f'  user {user_id}: ' + ', '.join(
+                        f'{field} {getattr(stats, field)} -> {values[field]}' for field in drifted
+                    ))
+                for field in COUNTER_FIELDS:
+                    setattr(stats, field, values[field])
+                stats.stats_month = month
+                to_update.append(stats)
+        
+        if not options['dry_run']:
+            with transaction.atomic():
+                UserStats.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+                UserStats.objects.bulk_update(to_update, COUNTER_FIELDS + ['stats_month'], batch_size=500)
+        
+        verb = 'Would fix' if options['dry_run'] else 'Fixed'
+        self.stdout.write(
+            self.style.SUCCESS(f'{verb} {len(to_update)} rows and created {len(to_create)} missing rows')
+        )
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.dispatch import NotificationDispatcher
+from skill_sessions.models import SessionReminder, SkillSwapSession
+
+class Command(BaseCommand):
+    help = 'Notify participants of upcoming sessions (run periodically, e.g. every 15 minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Remind participants this many hours before a session (default: 24)'
+        )
+
+    def handle(self, *args, **options):
+        if options['hours'] < 1:
+            raise CommandError('--hours must be a positive integer')
+        lead = timedelta(hours=options['hours'])
+        now = timezone.now()
+        
+        # Schedule one reminder per participant for sessions entering the window
+        upcoming = SkillSwapSession.objects.filter(
+            status='scheduled', scheduled_date__gt=now, scheduled_date__lte=now + lead
+        ).values_list('id', 'teacher_id', 'learner_id', 'scheduled_date')
+        SessionReminder.objects.bulk_create([
+            SessionReminder(session_id=session_id, user_id=user_id, reminder_time=scheduled_date - lead)
+            for session_id, teacher_id, learner_id, scheduled_date in upcoming
+            for user_id in (teacher_id, learner_id)
+        ], ignore_conflicts=True)
+        
+        due = (SessionReminder.objects
+               .filter(is_sent=False, reminder_time__lte=now,
+                       session__status='scheduled', session__scheduled_date__gt=now)
+               .select_related('session__skill', 'session__teacher', 'session__learner'))
+        dispatcher = NotificationDispatcher()
+        sent_ids = []
+        for reminder in due:
+            session = reminder.session
+            other = session.learner if reminder.user_id == session.teacher_id else session.teacher
+            when = timezone.localtime(session.scheduled_date).strftime('%B %d, %Y at %I:%M %p')
+            dispatcher.add(
+                reminder.user_id,
+                'session_reminder',
+                'Upcoming Session Reminder',
+                f'Your {session.skill.name} session with {other.get_full_name() or other.username} is on {when}.',
+                related_user=other,
+                related_object_id=session.id
+            )
+            sent_ids.append(reminder.id)
+        
+        with transaction.atomic():
+            dispatcher.send()
+            for start in range(0, len(sent_ids), 500):
+                SessionReminder.objects.filter(id__in=sent_ids[start:start + 500]).update(is_sent=True, updated_at=now)
+        self.stdout.write(self.style.SUCCESS(f'Sent {len(sent_ids)} session reminders'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('skill_sessions', '0003_alter_sessionreminder_table_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('skills_completed', models.PositiveIntegerField(default=0, help_text='Distinct skills learned in completed sessions')),
+                ('sessions_this_month', models.PositiveIntegerField(default=0, help_text='Completed sessions created this month')),
+                ('stats_month', models.DateField(blank=True, help_text='Month that sessions_this_month refers to', null=True)),
+                ('active_requests', models.PositiveIntegerField(default=0, help_text='Pending requests sent or received')),
+                ('pending_requests', models.PositiveIntegerField(default=0, help_text="Pending requests awaiting this user's response")),
+                ('total_sessions', models.PositiveIntegerField(default=0)),
+                ('upcoming_sessions', models.PositiveIntegerField(default=0, help_text='Sessions still in scheduled status')),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User stats',
+                'db_table': 'userstats',
+            },
+        ),
+    ]
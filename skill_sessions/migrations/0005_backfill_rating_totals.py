@@ -0,0 +1,86 @@
+# Generated manually to backfill the running rating totals from existing reviews
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_rating_totals(apps, schema_editor):
+    """
+    Populate the rating sums/counts, averages and completed-session counters
+    that skill_sessions.ratings maintains incrementally from now on
+    """
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    OfferedSkill = apps.get_model('skills', 'OfferedSkill')
+    SessionReview = apps.get_model('skill_sessions', 'SessionReview')
+    SkillSwapSession = apps.get_model('skill_sessions', 'SkillSwapSession')
+    
+    profiles = {profile.user_id: profile for profile in UserProfile.objects.all()}
+    for profile in profiles.values():
+        profile.teacher_rating_sum = profile.teacher_rating_count = 0
+        profile.learner_rating_sum = profile.learner_rating_count = 0
+        profile.average_rating_as_teacher = profile.average_rating_as_learner = 0.0
+        profile.total_sessions_taught = profile.total_sessions_learned = 0
+    
+    offered_skills = {offered.id: offered for offered in OfferedSkill.objects.all()}
+    for offered in offered_skills.values():
+        offered.rating_sum = offered.rating_count = offered.total_sessions = 0
+        offered.average_rating = 0.0
+    
+    reviews = SessionReview.objects.values(
+        'reviewee_id', 'session__teacher_id', 'session__request__offered_skill_id'
+    ).annotate(total=Sum('overall_rating'), count=Count('id')).order_by()
+    for row in reviews:
+        profile = profiles.get(row['reviewee_id'])
+        if row['reviewee_id'] == row['session__teacher_id']:
+            if profile:
+                profile.teacher_rating_sum += row['total']
+                profile.teacher_rating_count += row['count']
+            offered = offered_skills.get(row['session__request__offered_skill_id'])
+            if offered:
+                offered.rating_sum += row['total']
+                offered.rating_count += row['count']
+        elif profile:
+            profile.learner_rating_sum += row['total']
+            profile.learner_rating_count += row['count']
+    
+    completed = SkillSwapSession.objects.filter(status='completed').values_list(
+        'teacher_id', 'learner_id', 'request__offered_skill_id'
+    )
+    for teacher_id, learner_id, offered_skill_id in completed:
+        if teacher_id in profiles:
+            profiles[teacher_id].total_sessions_taught += 1
+        if learner_id in profiles:
+            profiles[learner_id].total_sessions_learned += 1
+        if offered_skill_id in offered_skills:
+            offered_skills[offered_skill_id].total_sessions += 1
+    
+    for profile in profiles.values():
+        if profile.teacher_rating_count:
+            profile.average_rating_as_teacher = profile.teacher_rating_sum / profile.teacher_rating_count
+        if profile.learner_rating_count:
+            profile.average_rating_as_learner = profile.learner_rating_sum / profile.learner_rating_count
+    for offered in offered_skills.values():
+        if offered.rating_count:
+            offered.average_rating = offered.rating_sum / offered.rating_count
+    
+    UserProfile.objects.bulk_update(profiles.values(), [
+        'teacher_rating_sum', 'teacher_rating_count', 'learner_rating_sum', 'learner_rating_count',
+        'average_rating_as_teacher', 'average_rating_as_learner',
+        'total_sessions_taught', 'total_sessions_learned',
+    ], batch_size=500)
+    OfferedSkill.objects.bulk_update(offered_skills.values(), [
+        'rating_sum', 'rating_count', 'average_rating', 'total_sessions',
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_userprofile_learner_rating_count_and_more'),
+        ('skills', '0004_offeredskill_rating_count_offeredskill_rating_sum'),
+        ('skill_sessions', '0004_userstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0005_backfill_rating_totals'),
+        ('skills', '0006_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sessionreview',
+            name='reviewee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='received_reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='skillswaprequest',
+            name='recipient',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='received_requests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='skillswaprequest',
+            name='requester',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='sent_requests', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='skillswapsession',
+            name='learner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='learning_sessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='skillswapsession',
+            name='teacher',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='teaching_sessions', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='sessionreview',
+            index=models.Index(fields=['reviewee', 'is_public', '-created_at'], name='review_reviewee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswaprequest',
+            index=models.Index(fields=['recipient', 'status', '-created_at'], name='swaprequest_recipient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswaprequest',
+            index=models.Index(fields=['requester', 'status', '-created_at'], name='swaprequest_requester_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswaprequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['requester', 'recipient'], name='swaprequest_pending_pair_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswaprequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['expires_at'], name='swaprequest_pending_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswapsession',
+            index=models.Index(fields=['teacher', 'status', 'scheduled_date'], name='swapsession_teacher_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswapsession',
+            index=models.Index(fields=['learner', 'status', 'scheduled_date'], name='swapsession_learner_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0006_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('teacher', 'Teacher'), ('learner', 'Learner')], max_length=10)),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('no_show', 'No Show')], max_length=20)),
+                ('scheduled_date', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='skill_sessions.skillswapsession')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='session_participations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'session_participant',
+                'ordering': ['scheduled_date'],
+                'indexes': [models.Index(fields=['user', 'status', 'scheduled_date'], name='participant_status_idx'), models.Index(fields=['user', 'scheduled_date'], name='participant_date_idx')],
+                'unique_together': {('session', 'user')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated manually to backfill the participant rows of existing sessions
+
+from datetime import timedelta
+
+from django.db import migrations
+
+
+def backfill_session_participants(apps, schema_editor):
+    """Create the teacher and learner rows that skill_sessions.participants maintains from now on"""
+    SkillSwapSession = apps.get_model('skill_sessions', 'SkillSwapSession')
+    SessionParticipant = apps.get_model('skill_sessions', 'SessionParticipant')
+    
+    rows = []
+    sessions = SkillSwapSession.objects.values_list(
+        'id', 'teacher_id', 'learner_id', 'status', 'scheduled_date', 'duration_minutes'
+    ).iterator(chunk_size=2000)
+    for session_id, teacher_id, learner_id, status, scheduled_date, duration in sessions:
+        end_time = scheduled_date + timedelta(minutes=duration)
+        for user_id, role in ((teacher_id, 'teacher'), (learner_id, 'learner')):
+            if role == 'learner' and learner_id == teacher_id:
+                continue
+            rows.append(SessionParticipant(
+                session_id=session_id, user_id=user_id, role=role, status=status,
+                scheduled_date=scheduled_date, end_time=end_time,
+            ))
+        if len(rows) >= 2000:
+            SessionParticipant.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    SessionParticipant.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0007_sessionparticipant'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_session_participants, migrations.RunPython.noop),
+    ]
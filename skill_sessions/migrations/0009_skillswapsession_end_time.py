@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0008_backfill_session_participants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillswapsession',
+            name='end_time',
+            field=models.DateTimeField(editable=False, help_text='scheduled_date plus duration, set on save', null=True),
+        ),
+    ]
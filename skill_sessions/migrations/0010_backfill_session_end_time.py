@@ -0,0 +1,26 @@
+# Generated manually to backfill the stored end time of existing sessions
+
+from datetime import timedelta
+
+from django.db import migrations
+
+
+def backfill_session_end_time(apps, schema_editor):
+    SkillSwapSession = apps.get_model('skill_sessions', 'SkillSwapSession')
+    
+    sessions = []
+    for session in SkillSwapSession.objects.filter(end_time__isnull=True).only('scheduled_date', 'duration_minutes'):
+        session.end_time = session.scheduled_date + timedelta(minutes=session.duration_minutes)
+        sessions.append(session)
+    SkillSwapSession.objects.bulk_update(sessions, ['end_time'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0009_skillswapsession_end_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_session_end_time, migrations.RunPython.noop),
+    ]
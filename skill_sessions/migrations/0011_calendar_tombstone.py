@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0010_backfill_session_end_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('session_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'calendar_tombstone',
+                'indexes': [models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_idx'), models.Index(fields=['deleted_at'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0011_calendar_tombstone'),
+        ('skills', '0007_skillalias'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skillswaprequest',
+            index=models.Index(fields=['recipient', '-created_at', '-id'], name='swaprequest_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skillswaprequest',
+            index=models.Index(fields=['requester', '-created_at', '-id'], name='swaprequest_sent_idx'),
+        ),
+    ]
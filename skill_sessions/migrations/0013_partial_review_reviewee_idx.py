@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_sessions', '0012_swaprequest_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sessionreview',
+            name='review_reviewee_idx',
+        ),
+        migrations.AlterField(
+            model_name='sessionreview',
+            name='reviewee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='received_reviews', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='sessionreview',
+            index=models.Index(condition=models.Q(('is_public', True)), fields=['reviewee', '-created_at'], name='review_reviewee_idx'),
+        ),
+    ]
@@ -13,8 +13,8 @@ class SkillSwapRequest(models.Model):
         ('expired', 'Expired'),
     ]
     
-    requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_requests')
-    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_requests')
+    requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_requests', db_index=False)
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_requests', db_index=False)
     offered_skill = models.ForeignKey(OfferedSkill, on_delete=models.CASCADE, related_name='swap_requests')
     desired_skill = models.ForeignKey(DesiredSkill, on_delete=models.CASCADE, related_name='swap_requests', null=True, blank=True)
     
@@ -39,6 +39,18 @@ class SkillSwapRequest(models.Model):
     class Meta:
         ordering = ['-created_at']
         db_table = 'swaprequest'
+        indexes = [
+            models.Index(fields=['recipient', 'status', '-created_at'], name='swaprequest_recipient_idx'),
+            models.Index(fields=['requester', 'status', '-created_at'], name='swaprequest_requester_idx'),
+            # Newest-first request lists, paged by core.pagination on (created_at, id)
+            models.Index(fields=['recipient', '-created_at', '-id'], name='swaprequest_received_idx'),
+            models.Index(fields=['requester', '-created_at', '-id'], name='swaprequest_sent_idx'),
+            # Only pending requests are checked for duplicates and swept on expiry
+            models.Index(fields=['requester', 'recipient'], condition=models.Q(status='pending'),
+                         name='swaprequest_pending_pair_idx'),
+            models.Index(fields=['expires_at'], condition=models.Q(status='pending'),
+                         name='swaprequest_pending_expiry_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.expires_at:
@@ -64,13 +76,14 @@ class SkillSwapSession(models.Model):
     ]
     
     request = models.OneToOneField(SkillSwapRequest, on_delete=models.CASCADE, related_name='session')
-    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='teaching_sessions')
-    learner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='learning_sessions')
+    teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name='teaching_sessions', db_index=False)
+    learner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='learning_sessions', db_index=False)
     skill = models.ForeignKey('skills.Skill', on_delete=models.CASCADE, related_name='skill_sessions')
     
     # Session details
     scheduled_date = models.DateTimeField()
     duration_minutes = models.PositiveIntegerField(default=60)
+    end_time = models.DateTimeField(null=True, editable=False, help_text="scheduled_date plus duration, set on save")
     format = models.CharField(max_length=20, choices=[
         ('online', 'Online'),
         ('in_person', 'In-Person'),
@@ -96,10 +109,21 @@ class SkillSwapSession(models.Model):
     class Meta:
         ordering = ['scheduled_date']
         db_table = 'swapsession'
+        indexes = [
+            models.Index(fields=['teacher', 'status', 'scheduled_date'], name='swapsession_teacher_idx'),
+            models.Index(fields=['learner', 'status', 'scheduled_date'], name='swapsession_learner_idx'),
+        ]
     
     def __str__(self):
         return f"Session: {self.teacher.username} teaching {self.skill.name} to {self.learner.username}"
     
+    def save(self, *args, **kwargs):
+        self.end_time = self.get_end_time()
+        if kwargs.get('update_fields') is not None:
+            # updated_at drives calendar ETags and sync tokens, so partial saves bump it too
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'end_time', 'updated_at'}
+        super().save(*args, **kwargs)
+    
     def is_upcoming(self):
         return self.status == 'scheduled' and self.scheduled_date > timezone.now()
     
@@ -114,6 +138,61 @@ class SkillSwapSession(models.Model):
     def get_end_time(self):
         return self.scheduled_date + timedelta(minutes=self.duration_minutes)
 
+class SessionParticipant(models.Model):
+    """
+    One row per participant of a session, kept in step by skill_sessions.signals.
+    
+    Lets "a user's sessions by status and time" be one index range scan instead
+    of an OR over the teacher and learner columns.
+    """
+    ROLE_CHOICES = [
+        ('teacher', 'Teacher'),
+        ('learner', 'Learner'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='session_participations', db_index=False)
+    session = models.ForeignKey(SkillSwapSession, on_delete=models.CASCADE, related_name='participants')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    
+    # Copied from the session
+    status = models.CharField(max_length=20, choices=SkillSwapSession.STATUS_CHOICES)
+    scheduled_date = models.DateTimeField()
+    end_time = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['scheduled_date']
+        unique_together = ['session', 'user']
+        db_table = 'session_participant'
+        indexes = [
+            models.Index(fields=['user', 'status', 'scheduled_date'], name='participant_status_idx'),
+            models.Index(fields=['user', 'scheduled_date'], name='participant_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} ({self.role}) in session {self.session_id}"
+
+class CalendarTombstone(models.Model):
+    """
+    A session that left a user's calendar, reported to calendar sync clients.
+    
+    ``user_id`` is a plain column rather than a foreign key so rows can be
+    written while the user themselves is being deleted; old rows are pruned
+    after ``CALENDAR_SYNC_RETENTION_DAYS``.
+    """
+    user_id = models.BigIntegerField()
+    session_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'calendar_tombstone'
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Session {self.session_id} removed for user {self.user_id}"
+
 class SessionReview(models.Model):
     RATING_CHOICES = [
         (1, '1 - Poor'),
@@ -151,6 +230,10 @@ class SessionReview(models.Model):
         ordering = ['-created_at']
         unique_together = ['session', 'reviewer']
         db_table = 'review'
+        indexes = [
+            models.Index(fields=['reviewee', '-created_at'], condition=models.Q(is_public=True),
+                         name='review_reviewee_idx'),
+        ]
     
     def __str__(self):
         return f"Review by {self.reviewer.username} for {self.reviewee.username} ({self.overall_rating}/5)"
@@ -170,3 +253,30 @@ class SessionReminder(models.Model):
     
     def __str__(self):
         return f"Reminder for {self.user.username} - {self.session}"
+
+class UserStats(models.Model):
+    """Denormalized per-user dashboard counters, kept current by skill_sessions.signals"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    
+    # Learning progress
+    skills_completed = models.PositiveIntegerField(default=0, help_text="Distinct skills learned in completed sessions")
+    sessions_this_month = models.PositiveIntegerField(default=0, help_text="Completed sessions created this month")
+    stats_month = models.DateField(null=True, blank=True, help_text="Month that sessions_this_month refers to")
+    
+    # Requests
+    active_requests = models.PositiveIntegerField(default=0, help_text="Pending requests sent or received")
+    pending_requests = models.PositiveIntegerField(default=0, help_text="Pending requests awaiting this user's response")
+    
+    # Sessions as teacher or learner
+    total_sessions = models.PositiveIntegerField(default=0)
+    upcoming_sessions = models.PositiveIntegerField(default=0, help_text="Sessions still in scheduled status")
+    completed_sessions = models.PositiveIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'userstats'
+        verbose_name_plural = 'User stats'
+    
+    def __str__(self):
+        return f"Stats for {self.user.username}"
@@ -0,0 +1,63 @@
+"""
+Maintenance and lookups of the ``SessionParticipant`` link table.
+
+Each session has a teacher row and a learner row carrying a copy of the
+session's status and time span. Filtering a user's sessions through it is an
+index range scan on ``(user, status, scheduled_date)`` where the equivalent
+``Q(teacher=user) | Q(learner=user)`` needs an OR across two indexes.
+"""
+from .models import SessionParticipant, SkillSwapSession
+
+ACTIVE_STATUSES = ('scheduled', 'in_progress')
+
+
+def participant_rows(session):
+    rows = [SessionParticipant(
+        user_id=session.teacher_id, session_id=session.pk, role='teacher', status=session.status,
+        scheduled_date=session.scheduled_date, end_time=session.end_time,
+    )]
+    if session.learner_id != session.teacher_id:
+        rows.append(SessionParticipant(
+            user_id=session.learner_id, session_id=session.pk, role='learner', status=session.status,
+            scheduled_date=session.scheduled_date, end_time=session.end_time,
+        ))
+    return rows
+
+
+def sync_participants(sessions):
+    """Upsert the participant rows of ``sessions`` and drop rows of replaced participants"""
+    rows = [row for session in sessions for row in participant_rows(session)]
+    if not rows:
+        return
+    for session in sessions:
+        SessionParticipant.objects.filter(session_id=session.pk).exclude(
+            user_id__in=[session.teacher_id, session.learner_id]
+        ).delete()
+    SessionParticipant.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['session', 'user'],
+        update_fields=['role', 'status', 'scheduled_date', 'end_time'],
+    )
+
+
+def sessions_for(user, statuses=None, start=None, end=None, scheduled_from=None):
+    """
+    Sessions ``user`` teaches or learns in, optionally limited to ``statuses``,
+    to those overlapping ``[start, end)`` and to those starting at or after
+    ``scheduled_from``.
+    
+    All conditions go into one ``filter()`` call so they apply to the same
+    participant row; chaining further ``participants__`` filters would join
+    the table again.
+    """
+    lookups = {'participants__user': user}
+    if statuses is not None:
+        lookups['participants__status__in'] = list(statuses)
+    if end is not None:
+        lookups['participants__scheduled_date__lt'] = end
+    if start is not None:
+        lookups['participants__end_time__gt'] = start
+    if scheduled_from is not None:
+        lookups['participants__scheduled_date__gte'] = scheduled_from
+    return SkillSwapSession.objects.filter(**lookups)
@@ -0,0 +1,74 @@
+"""
+Incremental rating and session counters.
+
+``UserProfile`` and ``OfferedSkill`` keep running rating sums and counts next
+to their averages, so a review being created, edited or deleted is a single
+UPDATE per row instead of an ``Avg`` over the review table. Completed
+sessions bump the taught/learned counters the same way.
+"""
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+from accounts.models import UserProfile
+from skills.models import OfferedSkill
+
+
+def rating_update(prefix, average_field, delta_sum, delta_count):
+    """
+    UPDATE kwargs adding to ``<prefix>_sum``/``<prefix>_count`` and
+    recomputing the stored average from the new totals.
+    """
+    sum_field = f'{prefix}_sum'
+    count_field = f'{prefix}_count'
+    new_sum = Cast(F(sum_field) + delta_sum, FloatField())
+    new_count = Cast(F(count_field) + delta_count, FloatField())
+    return {
+        sum_field: F(sum_field) + delta_sum,
+        count_field: F(count_field) + delta_count,
+        average_field: Case(
+            When(**{count_field: -delta_count}, then=Value(0.0)),
+            default=new_sum / new_count,
+            output_field=FloatField(),
+        ),
+    }
+
+
+def review_changed(review, old_rating, new_rating):
+    """Apply a review's rating change to the reviewee's stored averages"""
+    delta_sum = (new_rating or 0) - (old_rating or 0)
+    delta_count = (new_rating is not None) - (old_rating is not None)
+    if not delta_sum and not delta_count:
+        return
+
+    session = review.session
+    with transaction.atomic():
+        if review.reviewee_id == session.teacher_id:
+            UserProfile.objects.filter(user_id=review.reviewee_id).update(
+                **rating_update('teacher_rating', 'average_rating_as_teacher', delta_sum, delta_count)
+            )
+            OfferedSkill.objects.filter(swap_requests__id=session.request_id).update(
+                **rating_update('rating', 'average_rating', delta_sum, delta_count)
+            )
+        else:
+            UserProfile.objects.filter(user_id=review.reviewee_id).update(
+                **rating_update('learner_rating', 'average_rating_as_learner', delta_sum, delta_count)
+            )
+
+
+def session_completion_changed(session, old_status, new_status):
+    """Count a session towards the participants' totals when it completes"""
+    delta = (new_status == 'completed') - (old_status == 'completed')
+    if not delta:
+        return
+
+    with transaction.atomic():
+        UserProfile.objects.filter(user_id=session.teacher_id).update(
+            total_sessions_taught=F('total_sessions_taught') + delta
+        )
+        UserProfile.objects.filter(user_id=session.learner_id).update(
+            total_sessions_learned=F('total_sessions_learned') + delta
+        )
+        OfferedSkill.objects.filter(swap_requests__id=session.request_id).update(
+            total_sessions=F('total_sessions') + delta
+        )
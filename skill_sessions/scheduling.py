@@ -0,0 +1,81 @@
+"""
+Scheduling conflicts and free-slot search.
+
+Busy time comes from ``SessionParticipant`` rows of active sessions, which
+carry each session's ``[scheduled_date, end_time)`` span. Overlap with
+``[start, end)`` is the range condition ``scheduled_date < end AND
+end_time > start`` on the ``(user, status, scheduled_date)`` index, so one
+query answers it for any number of users and any session length. The
+free-slot search fetches the busy spans of all participants in the search
+window once, merges them, and sweeps the merged list for the first gap.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SessionParticipant
+from .participants import ACTIVE_STATUSES
+
+
+def busy_participants(user_ids, start, end, exclude=None):
+    """Participant rows of active sessions of ``user_ids`` that overlap ``[start, end)``"""
+    rows = SessionParticipant.objects.filter(
+        user_id__in=list(user_ids),
+        status__in=ACTIVE_STATUSES,
+        scheduled_date__lt=end,
+        end_time__gt=start,
+    )
+    if exclude is not None:
+        rows = rows.exclude(session_id=exclude)
+    return rows.order_by('scheduled_date')
+
+
+def find_conflict(user_ids, start, end, exclude=None):
+    """The earliest participant row clashing with ``[start, end)``, or None"""
+    return busy_participants(user_ids, start, end, exclude).select_related('session', 'user').first()
+
+
+def has_conflict(user_ids, start, end, exclude=None):
+    return busy_participants(user_ids, start, end, exclude).exists()
+
+
+def merge_intervals(intervals):
+    """Merge ``(start, end)`` pairs sorted by start into disjoint busy spans"""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def round_up(moment, minutes):
+    """Round ``moment`` up to the next multiple of ``minutes`` past the hour"""
+    step = timedelta(minutes=minutes)
+    floor = moment.replace(second=0, microsecond=0) - timedelta(minutes=moment.minute % minutes)
+    return floor if floor == moment else floor + step
+
+
+def next_free_slot(user_ids, duration_minutes, after=None, horizon_days=None, exclude=None):
+    """
+    Start of the first ``duration_minutes`` window at or after ``after`` in
+    which none of ``user_ids`` has an active session, aligned to
+    ``SESSION_SLOT_MINUTES``. Returns None when nothing is free within
+    ``horizon_days``.
+    """
+    slot_minutes = getattr(settings, 'SESSION_SLOT_MINUTES', 15)
+    if horizon_days is None:
+        horizon_days = getattr(settings, 'SESSION_SCHEDULING_HORIZON_DAYS', 30)
+    duration = timedelta(minutes=duration_minutes)
+    candidate = round_up(after or timezone.now(), slot_minutes)
+    horizon = candidate + timedelta(days=horizon_days)
+    
+    busy = busy_participants(user_ids, candidate, horizon + duration, exclude)
+    for busy_start, busy_end in merge_intervals(busy.values_list('scheduled_date', 'end_time')):
+        if candidate + duration <= busy_start:
+            break
+        candidate = max(candidate, round_up(busy_end, slot_minutes))
+    return candidate if candidate <= horizon else None
@@ -1,18 +1,79 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from .models import SkillSwapRequest
-from accounts.models import Notification
+from .models import SkillSwapRequest, SkillSwapSession, SessionParticipant, SessionReview
+from .stats import session_changed, request_changed
+from .ratings import review_changed, session_completion_changed
+from .participants import sync_participants
+from .calendar import record_removal
+from .tasks import notify_new_request
 
 @receiver(post_save, sender=SkillSwapRequest)
 def create_request_notification(sender, instance, created, **kwargs):
     """Create notification when a new skill swap request is created"""
     if created:
-        # Create notification for the recipient
-        Notification.objects.create(
-            recipient=instance.recipient,
-            notification_type='skill_request',
-            title='New Skill Swap Request',
-            message=f'{instance.requester.get_full_name() or instance.requester.username} wants to learn {instance.offered_skill.skill.name} from you.',
-            related_user=instance.requester,
-            related_object_id=instance.id
-        )
\ No newline at end of file
+        # Create notification for the recipient in the background
+        notify_new_request.delay(instance.id)
+
+
+@receiver(pre_save, sender=SkillSwapRequest)
+@receiver(pre_save, sender=SkillSwapSession)
+def remember_previous_status(sender, instance, **kwargs):
+    """Stash the stored status so post_save can tell which transition happened"""
+    instance._previous_status = None
+    if instance.pk:
+        instance._previous_status = sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=SkillSwapSession)
+def update_session_stats(sender, instance, **kwargs):
+    """Keep UserStats and completed-session counters in step with status transitions"""
+    previous_status = getattr(instance, '_previous_status', None)
+    session_changed(instance, previous_status, instance.status)
+    session_completion_changed(instance, previous_status, instance.status)
+
+
+@receiver(post_save, sender=SkillSwapSession)
+def update_session_participants(sender, instance, **kwargs):
+    """Mirror the session's people, status and time span into SessionParticipant"""
+    sync_participants([instance])
+
+
+@receiver(post_delete, sender=SessionParticipant)
+def remember_calendar_removal(sender, instance, **kwargs):
+    """Tell the user's calendar sync clients the session is gone"""
+    record_removal(instance.user_id, instance.session_id)
+
+
+@receiver(post_delete, sender=SkillSwapSession)
+def remove_session_stats(sender, instance, **kwargs):
+    session_changed(instance, instance.status, None)
+    session_completion_changed(instance, instance.status, None)
+
+
+@receiver(post_save, sender=SkillSwapRequest)
+def update_request_stats(sender, instance, **kwargs):
+    """Keep UserStats in step with request status transitions"""
+    request_changed(instance, getattr(instance, '_previous_status', None), instance.status)
+
+
+@receiver(post_delete, sender=SkillSwapRequest)
+def remove_request_stats(sender, instance, **kwargs):
+    request_changed(instance, instance.status, None)
+
+
+@receiver(pre_save, sender=SessionReview)
+def remember_previous_rating(sender, instance, **kwargs):
+    instance._previous_rating = None
+    if instance.pk:
+        instance._previous_rating = sender.objects.filter(pk=instance.pk).values_list('overall_rating', flat=True).first()
+
+
+@receiver(post_save, sender=SessionReview)
+def update_review_ratings(sender, instance, **kwargs):
+    """Fold a new or edited review into the stored rating averages"""
+    review_changed(instance, getattr(instance, '_previous_rating', None), instance.overall_rating)
+
+
+@receiver(post_delete, sender=SessionReview)
+def remove_review_ratings(sender, instance, **kwargs):
+    review_changed(instance, instance.overall_rating, None)
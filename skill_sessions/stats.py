@@ -0,0 +1,179 @@
+"""
+Maintenance of the denormalized ``UserStats`` counters.
+
+Signal handlers apply small deltas whenever a session or request changes
+status, so dashboard reads are a single primary-key lookup. ``compute_stats``
+rebuilds the counters from the source tables and is used to backfill missing
+rows and by the ``reconcile_user_stats`` command to repair drift.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from core.events import publish_counts
+
+from .models import SkillSwapRequest, SkillSwapSession, UserStats
+from .participants import sessions_for
+
+COUNTER_FIELDS = [
+    'skills_completed', 'sessions_this_month', 'active_requests', 'pending_requests',
+    'total_sessions', 'upcoming_sessions', 'completed_sessions',
+]
+
+
+def current_month_start():
+    return timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def compute_stats(user_ids=None):
+    """
+    Compute the counters from scratch with grouped queries.
+
+    Returns {user_id: {field: value}} for every user with any session or
+    request activity (limited to ``user_ids`` when given).
+    """
+    month_start = current_month_start()
+    stats = {}
+
+    def add(user_id, field, value):
+        row = stats.setdefault(user_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        row[field] += value
+
+    sessions = SkillSwapSession.objects.all()
+    requests = SkillSwapRequest.objects.all()
+    session_counts = {
+        'total': Count('id'),
+        'upcoming': Count('id', filter=Q(status='scheduled')),
+        'completed': Count('id', filter=Q(status='completed')),
+        'this_month': Count('id', filter=Q(status='completed', created_at__gte=month_start)),
+    }
+    for role in ('teacher', 'learner'):
+        queryset = sessions.filter(**{f'{role}_id__in': user_ids}) if user_ids is not None else sessions
+        for row in queryset.values(f'{role}_id').annotate(**session_counts).order_by():
+            user_id = row[f'{role}_id']
+            add(user_id, 'total_sessions', row['total'])
+            add(user_id, 'upcoming_sessions', row['upcoming'])
+            add(user_id, 'completed_sessions', row['completed'])
+            add(user_id, 'sessions_this_month', row['this_month'])
+
+    learned = sessions.filter(status='completed')
+    if user_ids is not None:
+        learned = learned.filter(learner_id__in=user_ids)
+    for row in learned.values('learner_id').annotate(skills=Count('skill', distinct=True)).order_by():
+        add(row['learner_id'], 'skills_completed', row['skills'])
+
+    for role in ('requester', 'recipient'):
+        queryset = requests.filter(status='pending')
+        if user_ids is not None:
+            queryset = queryset.filter(**{f'{role}_id__in': user_ids})
+        for row in queryset.values(f'{role}_id').annotate(pending=Count('id')).order_by():
+            add(row[f'{role}_id'], 'active_requests', row['pending'])
+            if role == 'recipient':
+                add(row[f'{role}_id'], 'pending_requests', row['pending'])
+
+    return stats
+
+
+def rebuild_user_stats(user_id):
+    """Recompute and store one user's counters"""
+    values = compute_stats([user_id]).get(user_id, dict.fromkeys(COUNTER_FIELDS, 0))
+    values['stats_month'] = current_month_start().date()
+    stats, _ = UserStats.objects.update_or_create(user_id=user_id, defaults=values)
+    return stats
+
+
+def get_user_stats(user):
+    """Return the user's ``UserStats`` row, backfilling it on first access"""
+    try:
+        stats = UserStats.objects.get(pk=user.pk)
+    except UserStats.DoesNotExist:
+        return rebuild_user_stats(user.pk)
+    if stats.stats_month != current_month_start().date():
+        refresh_monthly_sessions(user.pk)
+        stats.refresh_from_db()
+    return stats
+
+
+def refresh_monthly_sessions(user_id):
+    """Reset sessions_this_month when the stored month has rolled over"""
+    month_start = current_month_start()
+    count = sessions_for(user_id, statuses=['completed']).filter(created_at__gte=month_start).count()
+    UserStats.objects.filter(pk=user_id).update(
+        sessions_this_month=count, stats_month=month_start.date(), updated_at=timezone.now()
+    )
+
+
+def apply_deltas(user_id, deltas):
+    """
+    Add ``deltas`` to a user's counters. Users without a row are skipped;
+    ``get_user_stats`` backfills them from the source tables on first read.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    monthly = deltas.pop('sessions_this_month', 0)
+    if deltas:
+        # updated_at is set explicitly so the notification stream poller sees the change
+        UserStats.objects.filter(pk=user_id).update(
+            updated_at=timezone.now(), **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+    if monthly:
+        UserStats.objects.filter(
+            pk=user_id, stats_month=current_month_start().date()
+        ).update(sessions_this_month=F('sessions_this_month') + monthly, updated_at=timezone.now())
+    if deltas or monthly:
+        publish_counts(user_id)
+
+
+def _diff(new, old):
+    return {field: new.get(field, 0) - old.get(field, 0) for field in new.keys() | old.keys()}
+
+
+def session_contribution(status, created_at):
+    """Counters one session adds to each participant"""
+    if status is None:
+        return {}
+    contribution = {
+        'total_sessions': 1,
+        'upcoming_sessions': int(status == 'scheduled'),
+        'completed_sessions': int(status == 'completed'),
+    }
+    if status == 'completed' and created_at and created_at >= current_month_start():
+        contribution['sessions_this_month'] = 1
+    return contribution
+
+
+def request_contribution(status, role):
+    """Counters one request adds to its requester or recipient"""
+    pending = int(status == 'pending')
+    if role == 'recipient':
+        return {'active_requests': pending, 'pending_requests': pending}
+    return {'active_requests': pending}
+
+
+def session_changed(session, old_status, new_status):
+    """Apply the counter changes for a session status transition"""
+    if old_status == new_status:
+        return
+    deltas = _diff(
+        session_contribution(new_status, session.created_at),
+        session_contribution(old_status, session.created_at),
+    )
+    with transaction.atomic():
+        for user_id in (session.teacher_id, session.learner_id):
+            apply_deltas(user_id, deltas)
+        if 'completed' in (old_status, new_status):
+            skills = SkillSwapSession.objects.filter(
+                learner_id=session.learner_id, status='completed'
+            ).values('skill').distinct().count()
+            UserStats.objects.filter(pk=session.learner_id).update(skills_completed=skills, updated_at=timezone.now())
+
+
+def request_changed(swap_request, old_status, new_status):
+    """Apply the counter changes for a request status transition"""
+    if old_status == new_status:
+        return
+    with transaction.atomic():
+        for user_id, role in ((swap_request.requester_id, 'requester'), (swap_request.recipient_id, 'recipient')):
+            apply_deltas(user_id, _diff(
+                request_contribution(new_status, role),
+                request_contribution(old_status, role),
+            ))
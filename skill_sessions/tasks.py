@@ -0,0 +1,22 @@
+from core.taskqueue import task
+from accounts.dispatch import notify
+from .models import SkillSwapRequest
+
+
+@task
+def notify_new_request(request_id):
+    """Tell the recipient about a new skill swap request"""
+    swap_request = (SkillSwapRequest.objects
+                    .select_related('requester', 'offered_skill__skill')
+                    .filter(pk=request_id).first())
+    if swap_request is None:
+        return
+    requester = swap_request.requester
+    notify(
+        swap_request.recipient_id,
+        'skill_request',
+        'New Skill Swap Request',
+        f'{requester.get_full_name() or requester.username} wants to learn {swap_request.offered_skill.skill.name} from you.',
+        related_user=requester,
+        related_object_id=swap_request.id
+    )
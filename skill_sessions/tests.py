@@ -1,3 +1,366 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Avg, Count, Sum
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from accounts.tests import MONDAY, book_session, local, make_user
+
+from skills.models import OfferedSkill
+
+from .calendar import (
+    SYNC_OVERLAP, InvalidSyncToken, changes_since, feed_token, feed_user, ical_fold, make_sync_token, read_sync_token,
+)
+from .models import SessionReview, SkillSwapRequest, SkillSwapSession, UserStats
+from .scheduling import find_conflict, has_conflict, merge_intervals, next_free_slot, round_up
+from .stats import COUNTER_FIELDS, compute_stats, get_user_stats
+
+
+class MergeIntervalsTests(SimpleTestCase):
+    def test_merges_overlapping_touching_and_contained_spans(self):
+        spans = [(1, 3), (2, 5), (5, 6), (7, 9), (7, 8), (10, 11)]
+        self.assertEqual(merge_intervals(spans), [[1, 6], [7, 9], [10, 11]])
+
+    def test_empty(self):
+        self.assertEqual(merge_intervals([]), [])
+
+    def test_round_up(self):
+        moment = datetime(2030, 1, 7, 9, 0)
+        self.assertEqual(round_up(moment, 15), moment)
+        self.assertEqual(round_up(moment.replace(minute=1), 15), moment.replace(minute=15))
+        self.assertEqual(round_up(moment.replace(minute=45, second=1), 15), moment.replace(hour=10))
+
+
+class FreeSlotTests(TestCase):
+    def setUp(self):
+        self.teacher = make_user('teacher')
+        self.learner = make_user('learner')
+        self.other = make_user('other')
+        self.users = [self.teacher.id, self.learner.id]
+
+    def test_back_to_back_sessions_do_not_conflict(self):
+        book_session(self.teacher, self.other, local(MONDAY, 10))
+        self.assertFalse(has_conflict(self.users, local(MONDAY, 11), local(MONDAY, 12)))
+        self.assertFalse(has_conflict(self.users, local(MONDAY, 9), local(MONDAY, 10)))
+        conflict = find_conflict(self.users, local(MONDAY, 10, 59), local(MONDAY, 12))
+        self.assertEqual(conflict.user_id, self.teacher.id)
+
+    def test_cancelled_and_excluded_sessions_are_free(self):
+        book_session(self.teacher, self.other, local(MONDAY, 10), status='cancelled')
+        session = book_session(self.learner, self.other, local(MONDAY, 10))
+        self.assertFalse(has_conflict([self.teacher.id], local(MONDAY, 10), local(MONDAY, 11)))
+        self.assertFalse(has_conflict(self.users, local(MONDAY, 10), local(MONDAY, 11), exclude=session.id))
+
+    def test_next_free_slot_skips_gaps_that_are_too_short(self):
+        book_session(self.teacher, self.other, local(MONDAY, 10), minutes=60)
+        book_session(self.learner, self.other, local(MONDAY, 11, 30), minutes=60)
+        # 11:00-11:30 is too short for an hour; both are free from 12:30
+        after = local(MONDAY, 10, 5)
+        self.assertEqual(next_free_slot(self.users, 60, after=after), local(MONDAY, 12, 30))
+        self.assertEqual(next_free_slot(self.users, 30, after=after), local(MONDAY, 11))
+
+    def test_next_free_slot_is_aligned_and_starts_before_busy_time(self):
+        book_session(self.teacher, self.other, local(MONDAY, 12))
+        self.assertEqual(next_free_slot(self.users, 60, after=local(MONDAY, 10, 50)), local(MONDAY, 11))
+
+    def test_next_free_slot_respects_the_horizon(self):
+        after = local(MONDAY, 0)
+        book_session(self.teacher, self.other, after, minutes=60 * 24 * 2)
+        self.assertIsNone(next_free_slot(self.users, 60, after=after, horizon_days=1))
+        self.assertEqual(next_free_slot(self.users, 60, after=after, horizon_days=3), after + timedelta(days=2))
+
+    def test_defaults_to_now(self):
+        slot = next_free_slot(self.users, 30)
+        self.assertGreaterEqual(slot, timezone.now())
+        self.assertEqual(slot.minute % 15, 0)
+
+
+class ApproveSessionTests(TestCase):
+    def setUp(self):
+        self.teacher = make_user('teacher')
+        self.learner = make_user('learner')
+        self.swap_request = book_session(self.teacher, self.learner, local(MONDAY, 9)).request
+        self.swap_request.session.delete()
+        SkillSwapRequest.objects.filter(pk=self.swap_request.pk).update(status='pending')
+        self.client.force_login(self.teacher)
+
+    def approve(self):
+        return self.client.post(reverse('skill_sessions:approve_session', args=[self.swap_request.pk]))
+
+    def test_books_a_free_slot(self):
+        self.approve()
+        self.swap_request.refresh_from_db()
+        self.assertEqual(self.swap_request.status, 'accepted')
+        session = self.swap_request.session
+        self.assertGreater(session.scheduled_date, timezone.now())
+        self.assertEqual(session.duration_minutes, self.swap_request.proposed_duration)
+
+    def test_rechecks_the_slot_before_booking(self):
+        # A booking that lands after the slot search must not be double-booked
+        taken = local(MONDAY, 10)
+        book_session(self.teacher, make_user('other'), taken)
+        with mock.patch('skill_sessions.views.next_free_slot', return_value=taken):
+            self.approve()
+        self.swap_request.refresh_from_db()
+        self.assertEqual(self.swap_request.status, 'pending')
+        self.assertFalse(SkillSwapSession.objects.filter(request=self.swap_request).exists())
+
+
+class IcalFoldTests(SimpleTestCase):
+    def unfold(self, folded):
+        self.assertTrue(folded.endswith('\r\n'))
+        lines = folded[:-2].split('\r\n')
+        for line in lines:
+            self.assertLessEqual(len(line.encode()), 75)
+        self.assertTrue(all(line.startswith(' ') for line in lines[1:]))
+        return lines[0] + ''.join(line[1:] for line in lines[1:])
+
+    def test_short_lines_are_kept(self):
+        self.assertEqual(ical_fold('SUMMARY:Python'), 'SUMMARY:Python\r\n')
+        self.assertEqual(ical_fold('X' * 75), 'X' * 75 + '\r\n')
+
+    def test_long_lines_fold_at_75_octets(self):
+        line = 'SUMMARY:' + 'abcdefghij' * 20
+        folded = ical_fold(line)
+        self.assertEqual(len(folded.split('\r\n')[0]), 75)
+        self.assertEqual(self.unfold(folded), line)
+
+    def test_multibyte_characters_are_not_split(self):
+        line = 'LOCATION:' + 'é' * 60 + '日本語' * 20
+        self.assertEqual(self.unfold(ical_fold(line)), line)
+
+
+class CalendarFeedTests(TestCase):
+    def setUp(self):
+        self.user = make_user('teacher')
+        book_session(self.user, make_user('learner'), timezone.now() + timedelta(days=1))
+
+    def feed(self, token):
+        return self.client.get(reverse('skill_sessions:calendar_feed', args=[token]))
+
+    def test_token_is_stable_and_opens_the_feed(self):
+        token = feed_token(self.user)
+        self.assertEqual(feed_token(self.user), token)
+        self.assertEqual(feed_user(token), self.user)
+        response = self.feed(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'BEGIN:VEVENT', b''.join(response.streaming_content))
+
+    def test_tampered_and_unsigned_tokens_are_rejected(self):
+        key = UserProfile.objects.get(user=self.user).calendar_feed_key or 'missing'
+        for token in (feed_token(self.user) + 'x', f'{self.user.pk}:{key}', str(self.user.pk)):
+            with self.subTest(token=token):
+                self.assertIsNone(feed_user(token))
+                self.assertEqual(self.feed(token).status_code, 404)
+
+    def test_inactive_users_have_no_feed(self):
+        token = feed_token(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.feed(token).status_code, 404)
+
+    def test_reset_revokes_the_old_url(self):
+        old = feed_token(self.user)
+        self.client.force_login(self.user)
+        url = reverse('skill_sessions:reset_calendar_feed')
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertRedirects(self.client.post(url), reverse('skill_sessions:calendar'))
+        new = feed_token(self.user)
+        self.assertNotEqual(new, old)
+        self.assertEqual(self.feed(old).status_code, 404)
+        self.assertEqual(self.feed(new).status_code, 200)
+
+    def test_calendar_page_shows_the_current_url(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('skill_sessions:calendar'))
+        self.assertContains(response, reverse('skill_sessions:calendar_feed', args=[feed_token(self.user)]))
+
+    def test_users_without_a_profile_get_no_url(self):
+        staff = User.objects.create_user('staff', 'staff@example.edu', 'password')
+        self.assertIsNone(feed_token(staff))
+        self.client.force_login(staff)
+        self.assertNotIn('feed_url', self.client.get(reverse('skill_sessions:calendar')).context)
+
+
+class SyncTokenTests(TestCase):
+    def setUp(self):
+        self.teacher = make_user('teacher')
+        self.learner = make_user('learner')
+        self.start = local(MONDAY, 10)
+        self.clock = mock.patch('django.utils.timezone.now', return_value=self.start - timedelta(days=7))
+        self.now = self.clock.start()
+        self.addCleanup(self.clock.stop)
+
+    def tick(self, **delta):
+        self.now.return_value += timedelta(**delta)
+
+    def test_token_round_trips_for_its_user_only(self):
+        token = make_sync_token(self.teacher)
+        self.assertEqual(read_sync_token(self.teacher, token), self.now.return_value - SYNC_OVERLAP)
+        with self.assertRaisesMessage(InvalidSyncToken, 'Invalid sync token'):
+            read_sync_token(self.learner, token)
+        with self.assertRaisesMessage(InvalidSyncToken, 'Invalid sync token'):
+            read_sync_token(self.teacher, token + 'x')
+        with self.assertRaisesMessage(InvalidSyncToken, 'Invalid sync token'):
+            read_sync_token(self.teacher, 'garbage')
+
+    def test_token_expires_after_the_retention_period(self):
+        token = make_sync_token(self.teacher)
+        self.tick(days=settings.CALENDAR_SYNC_RETENTION_DAYS + 1)
+        with self.assertRaisesMessage(InvalidSyncToken, 'Sync token expired'):
+            read_sync_token(self.teacher, token)
+
+    def test_changes_since_returns_updates_and_deletions(self):
+        kept = book_session(self.teacher, self.learner, self.start)
+        removed = book_session(self.teacher, self.learner, self.start + timedelta(hours=2))
+        untouched = book_session(self.teacher, self.learner, self.start + timedelta(hours=4))
+        self.tick(minutes=10)
+        token = make_sync_token(self.teacher)
+        self.tick(minutes=10)
+        kept.status = 'cancelled'
+        kept.save()
+        removed_id = removed.pk
+        removed.delete()
+
+        sessions, deleted, next_token = changes_since(self.teacher, token)
+        self.assertEqual([session.pk for session in sessions], [kept.pk])
+        self.assertEqual(list(deleted), [removed_id])
+        self.assertNotIn(untouched.pk, list(deleted))
+        # The next token overlaps the delta just read, later ones don't
+        sessions, _, _ = changes_since(self.teacher, next_token)
+        self.assertEqual([session.pk for session in sessions], [kept.pk])
+        self.tick(minutes=10)
+        sessions, deleted, _ = changes_since(self.teacher, make_sync_token(self.teacher))
+        self.assertEqual((list(sessions), list(deleted)), ([], []))
+
+    def test_api_sends_deltas_and_410_for_unusable_tokens(self):
+        session = book_session(self.teacher, self.learner, self.start)
+        self.client.force_login(self.teacher)
+        url = reverse('api:calendar_events')
+        token = make_sync_token(self.teacher)
+        self.tick(minutes=10)
+        session_id = session.pk
+        session.delete()
+
+        data = json.loads(b''.join(self.client.get(url, {'sync_token': token}).streaming_content))
+        self.assertEqual((data['events'], data['deleted']), ([], [session_id]))
+        self.assertEqual(self.client.get(url, {'sync_token': 'garbage'}).status_code, 410)
+        self.tick(days=settings.CALENDAR_SYNC_RETENTION_DAYS + 1)
+        self.client.force_login(self.teacher)
+        self.assertEqual(self.client.get(url, {'sync_token': data['sync_token']}).status_code, 410)
+
+
+class UserStatsCounterTests(TestCase):
+    """The signal-maintained counters always equal a rebuild from the source tables"""
+
+    def setUp(self):
+        self.teacher = make_user('teacher')
+        self.learner = make_user('learner')
+        for user in (self.teacher, self.learner):
+            get_user_stats(user)
+
+    def assertCountersExact(self):
+        for user in (self.teacher, self.learner):
+            stored = UserStats.objects.filter(pk=user.pk).values(*COUNTER_FIELDS).get()
+            expected = compute_stats([user.pk]).get(user.pk, dict.fromkeys(COUNTER_FIELDS, 0))
+            self.assertEqual(stored, expected, user.username)
+
+    def test_request_transitions(self):
+        session = book_session(self.teacher, self.learner, timezone.now() + timedelta(days=1))
+        offered = OfferedSkill.objects.get(user=self.teacher)
+        request = SkillSwapRequest.objects.create(requester=self.learner, recipient=self.teacher, offered_skill=offered)
+        self.assertEqual(UserStats.objects.get(pk=self.teacher.pk).pending_requests, 1)
+        self.assertCountersExact()
+        request.status = 'expired'
+        request.save()
+        self.assertCountersExact()
+        request.status = 'pending'
+        request.save()
+        request.delete()
+        self.assertCountersExact()
+        session.request.delete()
+        self.assertCountersExact()
+
+    def test_session_transitions(self):
+        session = book_session(self.teacher, self.learner, timezone.now() + timedelta(days=1))
+        self.assertEqual(UserStats.objects.get(pk=self.learner.pk).upcoming_sessions, 1)
+        self.assertCountersExact()
+        for status in ('in_progress', 'completed', 'cancelled', 'completed', 'scheduled'):
+            with self.subTest(status=status):
+                session.status = status
+                session.save()
+                self.assertCountersExact()
+        book_session(self.teacher, self.learner, timezone.now() + timedelta(days=2), status='completed')
+        self.assertEqual(UserStats.objects.get(pk=self.learner.pk).skills_completed, 1)
+        self.assertCountersExact()
+        session.delete()
+        self.assertCountersExact()
+
+
+class RatingCounterTests(TestCase):
+    """Stored rating totals and session counts always equal fresh aggregates"""
+
+    def setUp(self):
+        self.teacher = make_user('teacher')
+        self.learners = [make_user(f'learner{i}') for i in range(2)]
+        self.sessions = [
+            book_session(self.teacher, learner, timezone.now() + timedelta(days=1), status='completed')
+            for learner in self.learners
+        ]
+
+    def review(self, session, reviewer, reviewee, rating):
+        return SessionReview.objects.create(
+            session=session, reviewer=reviewer, reviewee=reviewee, overall_rating=rating,
+            communication_rating=rating, knowledge_rating=rating, punctuality_rating=rating, review_text='Thanks',
+        )
+
+    def assertCountersExact(self):
+        for user in (self.teacher, *self.learners):
+            profile = UserProfile.objects.get(user=user)
+            for role, prefix in (('teacher', 'teacher_rating'), ('learner', 'learner_rating')):
+                reviews = SessionReview.objects.filter(reviewee=user, **{f'session__{role}': user}).aggregate(
+                    total=Sum('overall_rating'), count=Count('id'), average=Avg('overall_rating'),
+                )
+                self.assertEqual(getattr(profile, f'{prefix}_sum'), reviews['total'] or 0)
+                self.assertEqual(getattr(profile, f'{prefix}_count'), reviews['count'])
+                self.assertAlmostEqual(getattr(profile, f'average_rating_as_{role}'), reviews['average'] or 0.0)
+            self.assertEqual(profile.total_sessions_taught, user.teaching_sessions.filter(status='completed').count())
+            self.assertEqual(profile.total_sessions_learned, user.learning_sessions.filter(status='completed').count())
+        offered = OfferedSkill.objects.get(user=self.teacher)
+        reviews = SessionReview.objects.filter(reviewee=self.teacher).aggregate(
+            total=Sum('overall_rating'), count=Count('id'), average=Avg('overall_rating'),
+        )
+        self.assertEqual((offered.rating_sum, offered.rating_count), (reviews['total'] or 0, reviews['count']))
+        self.assertAlmostEqual(offered.average_rating, reviews['average'] or 0.0)
+        self.assertEqual(offered.total_sessions, len([s for s in self.sessions if s.status == 'completed']))
+
+    def test_reviews_created_edited_and_deleted(self):
+        first = self.review(self.sessions[0], self.learners[0], self.teacher, 5)
+        self.review(self.sessions[1], self.learners[1], self.teacher, 2)
+        self.review(self.sessions[0], self.teacher, self.learners[0], 4)
+        self.assertEqual(UserProfile.objects.get(user=self.teacher).average_rating_as_teacher, 3.5)
+        self.assertCountersExact()
+        first.overall_rating = 3
+        first.save()
+        self.assertCountersExact()
+        first.delete()
+        self.assertCountersExact()
+        SessionReview.objects.get(reviewee=self.teacher).delete()
+        self.assertEqual(UserProfile.objects.get(user=self.teacher).average_rating_as_teacher, 0.0)
+        self.assertCountersExact()
+
+    def test_session_completion_counts(self):
+        self.assertCountersExact()
+        self.sessions[0].status = 'cancelled'
+        self.sessions[0].save()
+        self.assertCountersExact()
+        self.sessions[0].status = 'completed'
+        self.sessions[0].save()
+        self.sessions[1].delete()
+        self.sessions.pop()
+        self.assertCountersExact()
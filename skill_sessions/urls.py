@@ -47,6 +47,8 @@ urlpatterns = [
     
     # Calendar and scheduling
     path('calendar/', views.CalendarView.as_view(), name='calendar'),
+    path('calendar/feed/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('calendar/feed/reset/', views.reset_calendar_feed, name='reset_calendar_feed'),
     path('schedule/<int:request_id>/', views.ScheduleSessionView.as_view(), name='schedule_session'),
     
     # AJAX endpoints for dynamic functionality
@@ -1,5 +1,6 @@
-from django.contrib import admin
-from .models import SkillCategory, Skill, OfferedSkill, DesiredSkill, SkillMatch
+from django.contrib import admin, messages
+from .fuzzy import get_fuzzy_index
+from .models import SkillCategory, Skill, SkillAlias, OfferedSkill, DesiredSkill, SkillMatch, SkillTrend
 
 @admin.register(SkillCategory)
 class SkillCategoryAdmin(admin.ModelAdmin):
@@ -12,13 +13,26 @@ class SkillCategoryAdmin(admin.ModelAdmin):
         return obj.skills.count()
     skills_count.short_description = 'Number of Skills'
 
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 1
+
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
+    inlines = (SkillAliasInline,)
     list_display = ('name', 'category', 'is_popular', 'offered_count', 'desired_count', 'created_at')
     list_filter = ('category', 'is_popular', 'created_at')
     search_fields = ('name', 'description', 'category__name')
     readonly_fields = ('created_at',)
     
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        similar = get_fuzzy_index().lookup(obj.name, exclude=(obj.pk,), whole_only=True)
+        if similar:
+            self.message_user(request, 'Possible duplicate of: {}'.format(
+                ', '.join(f'{name} (#{skill_id})' for skill_id, name, _ in similar)
+            ), messages.WARNING)
+    
     def offered_count(self, obj):
         return obj.offered_by_users.filter(is_active=True).count()
     offered_count.short_description = 'Offered By'
@@ -87,3 +101,10 @@ class SkillMatchAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related(
             'teacher', 'learner', 'offered_skill__skill', 'desired_skill__skill'
         )
+
+@admin.register(SkillTrend)
+class SkillTrendAdmin(admin.ModelAdmin):
+    list_display = ('skill', 'category', 'score', 'offered_count', 'desired_count', 'updated_at')
+    list_filter = ('category',)
+    search_fields = ('skill__name',)
+    readonly_fields = ('skill', 'category', 'score', 'offered_count', 'desired_count', 'updated_at')
@@ -0,0 +1,161 @@
+"""
+In-memory autocomplete of skill names.
+
+Every skill is filed under several normalized keys in one sorted list: its
+name, each later word of the name ("learning" for "Machine Learning"), the
+initials of multi-word names ("ml") and the same for its ``SkillAlias``
+names. A prefix lookup is two binary searches over that list; the skills in
+between are ranked by ``SkillTrend.score`` without touching the database.
+
+Each worker builds the index at startup (see ``warm_autocomplete``) and
+patches it from the ``Skill``/``SkillAlias`` signals. Edits made by other
+workers and new trend scores arrive when the copy is older than
+``SKILL_AUTOCOMPLETE_TTL`` seconds; it is then rebuilt in a background
+thread while the old copy keeps answering. Lookups read an immutable
+snapshot and never take a lock.
+"""
+import heapq
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .models import Skill, SkillAlias, SkillTrend
+
+# keys and skill_ids are parallel, sorted by key; rank maps a skill id to its
+# position in trending, the ids ordered by trend score then name
+Snapshot = namedtuple('Snapshot', 'keys skill_ids names rank trending')
+
+
+def normalize(text):
+    """Casefolded, accent-free, single-spaced ``text``"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(char for char in text if not unicodedata.combining(char)).split())
+
+
+def skill_keys(name, aliases=()):
+    keys = set()
+    for text in (name, *aliases):
+        words = normalize(text).split()
+        for start in range(len(words)):
+            keys.add(' '.join(words[start:]))
+        if len(words) > 1:
+            keys.add(''.join(word[0] for word in words))
+    return keys
+
+
+class SkillAutocomplete:
+    """Sorted keys -> skill ids for prefix lookups, ranked by trend"""
+
+    def __init__(self):
+        self.snapshot = Snapshot([], array('q'), {}, {}, [])
+        self.scores = {}
+        self.built_at = None
+        self.lock = threading.Lock()
+
+    def build(self):
+        with self.lock:
+            aliases = {}
+            for skill_id, alias in SkillAlias.objects.values_list('skill_id', 'name').iterator():
+                aliases.setdefault(skill_id, []).append(alias)
+            names = dict(Skill.objects.values_list('id', 'name').iterator())
+            self.scores = dict(SkillTrend.objects.values_list('skill_id', 'score').iterator())
+            entries = sorted(
+                (key, skill_id)
+                for skill_id, name in names.items()
+                for key in skill_keys(name, aliases.get(skill_id, ()))
+            )
+            self.snapshot = self._snapshot(
+                [key for key, _ in entries], array('q', (skill_id for _, skill_id in entries)), names
+            )
+            self.built_at = time.monotonic()
+
+    def _snapshot(self, keys, skill_ids, names):
+        trending = sorted(names, key=lambda skill_id: (-self.scores.get(skill_id, 0.0), names[skill_id].casefold()))
+        rank = {skill_id: position for position, skill_id in enumerate(trending)}
+        return Snapshot(keys, skill_ids, names, rank, trending)
+
+    def is_stale(self):
+        ttl = getattr(settings, 'SKILL_AUTOCOMPLETE_TTL', 300)
+        return self.built_at is None or (ttl and time.monotonic() - self.built_at > ttl)
+
+    def refresh_skill(self, skill_id):
+        """Re-read one skill's name and aliases and swap in a patched snapshot"""
+        skill = Skill.objects.filter(pk=skill_id).values_list('name', flat=True).first()
+        aliases = SkillAlias.objects.filter(skill_id=skill_id).values_list('name', flat=True)
+        new_keys = skill_keys(skill, aliases) if skill is not None else ()
+        with self.lock:
+            current = self.snapshot
+            keys, skill_ids = [], array('q')
+            for key, key_skill_id in zip(current.keys, current.skill_ids):
+                if key_skill_id != skill_id:
+                    keys.append(key)
+                    skill_ids.append(key_skill_id)
+            for key in new_keys:
+                position = bisect_left(keys, key)
+                keys.insert(position, key)
+                skill_ids.insert(position, skill_id)
+            names = dict(current.names)
+            if skill is None:
+                names.pop(skill_id, None)
+            else:
+                names[skill_id] = skill
+            self.snapshot = self._snapshot(keys, skill_ids, names)
+
+    def lookup(self, term, limit=10):
+        """``(skill_id, name)`` of the best-trending skills with a key starting with ``term``"""
+        snapshot = self.snapshot
+        prefix = normalize(term)
+        if not prefix:
+            matches = snapshot.trending[:limit]
+        else:
+            low = bisect_left(snapshot.keys, prefix)
+            high = bisect_right(snapshot.keys, prefix + '\U0010ffff', low)
+            matches = heapq.nsmallest(limit, set(snapshot.skill_ids[low:high]), key=snapshot.rank.__getitem__)
+        return [(skill_id, snapshot.names[skill_id]) for skill_id in matches]
+
+
+_autocomplete = SkillAutocomplete()
+_build_lock = threading.Lock()
+
+
+def _rebuild_in_background():
+    try:
+        _autocomplete.build()
+    finally:
+        # The thread opened its own connection; don't leave it behind
+        connection.close()
+        _build_lock.release()
+
+
+def get_autocomplete():
+    """
+    Return this worker's index. The first call builds it; once expired it is
+    rebuilt in a background thread and the current copy is returned.
+    """
+    if _autocomplete.built_at is None:
+        with _build_lock:
+            if _autocomplete.built_at is None:
+                _autocomplete.build()
+    elif _autocomplete.is_stale() and _build_lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild_in_background, daemon=True).start()
+    return _autocomplete
+
+
+def warm_autocomplete():
+    """Build the index when a worker starts; left to the first lookup if the database isn't ready"""
+    try:
+        get_autocomplete()
+    except DatabaseError:
+        pass
+
+
+def refresh_skill_autocomplete(skill_id):
+    """Patch the index for one skill; a no-op until the index is first built"""
+    if _autocomplete.built_at is not None:
+        _autocomplete.refresh_skill(skill_id)
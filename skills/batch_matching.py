@@ -0,0 +1,191 @@
+"""
+Vectorized full rematch of every active offer against every active desire.
+
+Loads the scoring inputs into NumPy arrays, joins offers to desires by skill
+with ``searchsorted``, scores all candidate pairs at once using the same
+weights as ``skills.matching.compatibility_score`` and writes the results
+back to ``SkillMatch`` in chunked upserts.
+"""
+import time
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .cycles import invalidate_cycles
+from .models import OfferedSkill, DesiredSkill, SkillMatch
+from .matching import (
+    PROFICIENCY_ORDER, LEVEL_WEIGHT, PREFERENCE_WEIGHT, DEPARTMENT_WEIGHT,
+    BRANCH_WEIGHT, RATING_WEIGHT, MATCH_UNIQUE_FIELDS, MATCH_UPDATE_FIELDS,
+)
+
+# Bit flags so that "formats are compatible" is a single bitwise AND
+PREFERENCE_BITS = {'online': 1, 'in_person': 2, 'both': 3}
+
+
+def _codes(values, mapping):
+    return np.fromiter((mapping.get(value, 0) for value in values), dtype=np.int8, count=len(values))
+
+
+def load_offers():
+    rows = list(OfferedSkill.objects.filter(is_active=True).values_list(
+        'id', 'user_id', 'skill_id', 'proficiency_level', 'teaching_preference', 'average_rating'
+    ))
+    ids, users, skills, levels, prefs, ratings = zip(*rows) if rows else ((),) * 6
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'user': np.array(users, dtype=np.int64),
+        'skill': np.array(skills, dtype=np.int64),
+        'level': _codes(levels, PROFICIENCY_ORDER),
+        'preference': _codes(prefs, PREFERENCE_BITS),
+        'rating': np.array(ratings, dtype=np.float64),
+    }
+
+
+def load_desires():
+    rows = list(DesiredSkill.objects.filter(is_active=True).values_list(
+        'id', 'user_id', 'skill_id', 'current_level', 'target_level', 'learning_preference'
+    ))
+    ids, users, skills, current, target, prefs = zip(*rows) if rows else ((),) * 6
+    return {
+        'id': np.array(ids, dtype=np.int64),
+        'user': np.array(users, dtype=np.int64),
+        'skill': np.array(skills, dtype=np.int64),
+        'current': _codes(current, PROFICIENCY_ORDER),
+        'target': _codes(target, PROFICIENCY_ORDER),
+        'preference': _codes(prefs, PREFERENCE_BITS),
+    }
+
+
+def load_profiles(max_user_id):
+    """Dense arrays indexed by user id; 0 means no department/branch"""
+    from accounts.models import UserProfile
+
+    department = np.zeros(max_user_id + 1, dtype=np.int64)
+    branch = np.zeros(max_user_id + 1, dtype=np.int64)
+    rating = np.zeros(max_user_id + 1, dtype=np.float64)
+    rows = UserProfile.objects.filter(user_id__lte=max_user_id).values_list(
+        'user_id', 'department_id', 'branch_id', 'average_rating_as_teacher'
+    )
+    for user_id, department_id, branch_id, teacher_rating in rows.iterator():
+        department[user_id] = department_id or 0
+        branch[user_id] = branch_id or 0
+        rating[user_id] = teacher_rating or 0
+    return {'department': department, 'branch': branch, 'rating': rating}
+
+
+def join_by_skill(offers, desires):
+    """Return (offer index, desire index) arrays for every same-skill pair"""
+    order = np.argsort(offers['skill'], kind='stable')
+    offer_skills = offers['skill'][order]
+    start = np.searchsorted(offer_skills, desires['skill'], side='left')
+    end = np.searchsorted(offer_skills, desires['skill'], side='right')
+    counts = end - start
+
+    desire_index = np.repeat(np.arange(len(counts)), counts)
+    # Position of each pair within its desire's run of offers
+    run_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    offer_index = order[np.repeat(start, counts) + run_offsets]
+
+    different_users = offers['user'][offer_index] != desires['user'][desire_index]
+    return offer_index[different_users], desire_index[different_users]
+
+
+def score_pairs(offers, desires, profiles, offer_index, desire_index):
+    """Vectorized equivalent of ``skills.matching.compatibility_score``"""
+    level = offers['level'][offer_index].astype(np.float64)
+    current = desires['current'][desire_index].astype(np.float64)
+    target = desires['target'][desire_index].astype(np.float64)
+    partial = LEVEL_WEIGHT * np.maximum(level - current, 0) / np.maximum(target - current, 1)
+    score = np.where(level >= target, LEVEL_WEIGHT, partial)
+
+    compatible = (offers['preference'][offer_index] & desires['preference'][desire_index]) != 0
+    score += np.where(compatible, PREFERENCE_WEIGHT, 0)
+
+    teachers = offers['user'][offer_index]
+    learners = desires['user'][desire_index]
+    teacher_department = profiles['department'][teachers]
+    same_department = (teacher_department != 0) & (teacher_department == profiles['department'][learners])
+    teacher_branch = profiles['branch'][teachers]
+    same_branch = same_department & (teacher_branch != 0) & (teacher_branch == profiles['branch'][learners])
+    score += np.where(same_department, DEPARTMENT_WEIGHT, 0) + np.where(same_branch, BRANCH_WEIGHT, 0)
+
+    rating = offers['rating'][offer_index]
+    rating = np.where(rating > 0, rating, profiles['rating'][teachers])
+    score += RATING_WEIGHT * np.minimum(rating, 5) / 5
+    return np.round(score, 2)
+
+
+def mutual_flags(teachers, learners):
+    """True where the learner also teaches the teacher something"""
+    if not len(teachers):
+        return np.zeros(0, dtype=bool)
+    base = int(max(teachers.max(), learners.max())) + 1
+    forward = teachers * base + learners
+    backward = learners * base + teachers
+    return np.isin(backward, forward)
+
+
+def rematch_all(chunk_size=1000):
+    """
+    Recompute every ``SkillMatch`` row. Returns a dict of counters and
+    per-stage timings in seconds.
+    """
+    timings = {}
+    started_at = timezone.now()
+
+    clock = time.perf_counter()
+    offers = load_offers()
+    desires = load_desires()
+    max_user_id = int(max(offers['user'].max(initial=0), desires['user'].max(initial=0)))
+    profiles = load_profiles(max_user_id)
+    timings['load'] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    offer_index, desire_index = join_by_skill(offers, desires)
+    scores = score_pairs(offers, desires, profiles, offer_index, desire_index)
+    teachers = offers['user'][offer_index]
+    learners = desires['user'][desire_index]
+    mutual = mutual_flags(teachers, learners)
+    timings['score'] = time.perf_counter() - clock
+
+    clock = time.perf_counter()
+    offer_ids = offers['id'][offer_index]
+    desire_ids = desires['id'][desire_index]
+    for start in range(0, len(scores), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        matches = [
+            SkillMatch(
+                teacher_id=teacher, learner_id=learner,
+                offered_skill_id=offer_id, desired_skill_id=desire_id,
+                compatibility_score=score, is_mutual=is_mutual,
+            )
+            for teacher, learner, offer_id, desire_id, score, is_mutual in zip(
+                teachers[chunk].tolist(), learners[chunk].tolist(),
+                offer_ids[chunk].tolist(), desire_ids[chunk].tolist(),
+                scores[chunk].tolist(), mutual[chunk].tolist(),
+            )
+        ]
+        with transaction.atomic():
+            SkillMatch.objects.bulk_create(
+                matches,
+                update_conflicts=True,
+                unique_fields=MATCH_UNIQUE_FIELDS,
+                update_fields=MATCH_UPDATE_FIELDS,
+            )
+    timings['write'] = time.perf_counter() - clock
+
+    # Anything not touched by this run no longer has an active offer/desire pair
+    clock = time.perf_counter()
+    removed, _ = SkillMatch.objects.filter(updated_at__lt=started_at).delete()
+    timings['cleanup'] = time.perf_counter() - clock
+    invalidate_cycles()
+
+    return {
+        'offers': len(offers['id']),
+        'desires': len(desires['id']),
+        'matches': len(scores),
+        'mutual': int(mutual.sum()),
+        'removed': removed,
+        'timings': timings,
+    }
@@ -0,0 +1,156 @@
+"""
+Swap cycle detection over the match graph.
+
+Edges run teacher -> learner for every undismissed ``SkillMatch``. A cycle
+through a user (A teaches B, B teaches C, C teaches A) lets everyone learn
+something without a direct two-way swap. Cycles of length 2-4 are found with
+a meet-in-the-middle search: one step forward from the user, one step
+backward, and one more step from each frontier for length 4. Each node keeps
+only its ``MAX_FANOUT`` best edges, capped in SQL, so the search costs a
+fixed number of queries, each returning a bounded number of rows, regardless
+of campus size.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from core.cache import bump_version, get_versions
+
+from .models import Skill, SkillMatch
+
+MAX_FANOUT = 25
+MAX_CYCLES = 20
+CACHE_TIMEOUT = 300
+# A cycle runs through other users' matches, so any match change invalidates them all
+MATCHES_NAMESPACE = 'skill_matches'
+
+
+def cache_key(user_id):
+    version, = get_versions([MATCHES_NAMESPACE])
+    return f'skill_cycles:{version}:{user_id}'
+
+
+def invalidate_cycles():
+    bump_version(MATCHES_NAMESPACE)
+
+
+def _best_edges(filters, group_by):
+    """
+    Load the strongest edges matching ``filters``, keeping at most
+    ``MAX_FANOUT`` distinct neighbours for each node in ``group_by``.
+
+    The cap is applied in SQL: the best match of each teacher/learner pair
+    is ranked within its node and only the top ``MAX_FANOUT`` rows come back,
+    however many matches a popular user has.
+
+    Returns {node: {neighbour: (score, skill_id)}}.
+    """
+    other = 'learner' if group_by == 'teacher' else 'teacher'
+    pairs = (SkillMatch.objects
+             .filter(is_dismissed=False, **filters)
+             .annotate(
+                 node=F(f'{group_by}_id'),
+                 neighbour=F(f'{other}_id'),
+                 taught_skill=F('offered_skill__skill_id'),
+                 pair_rank=Window(
+                     RowNumber(), partition_by=[F('teacher_id'), F('learner_id')],
+                     order_by=[F('compatibility_score').desc(), F('id')],
+                 ),
+             )
+             .values('node', 'neighbour', 'compatibility_score', 'taught_skill', 'pair_rank'))
+    sql, params = pairs.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT node, neighbour, compatibility_score, taught_skill FROM ('
+            ' SELECT pairs.*, ROW_NUMBER() OVER ('
+            '  PARTITION BY node ORDER BY compatibility_score DESC, neighbour) AS node_rank'
+            f' FROM ({sql}) pairs WHERE pair_rank = 1'
+            ') ranked WHERE node_rank <= %s',
+            (*params, MAX_FANOUT),
+        )
+        rows = cursor.fetchall()
+    edges = {}
+    for node, neighbour, score, skill_id in rows:
+        edges.setdefault(node, {})[neighbour] = (score, skill_id)
+    return edges
+
+
+def find_cycles(user_id):
+    """
+    Return cycles through ``user_id`` as lists of (teacher, learner, score,
+    skill_id) edges, best summed compatibility first.
+    """
+    # students[x] = {y: edge x -> y}, teachers[y] = {x: edge x -> y}
+    students = _best_edges({'teacher_id': user_id}, 'teacher').get(user_id, {})
+    teachers = _best_edges({'learner_id': user_id}, 'learner').get(user_id, {})
+    if not students or not teachers:
+        return []
+
+    cycles = []
+
+    # Length 2: user <-> a
+    for a in students.keys() & teachers.keys():
+        cycles.append([(user_id, a) + students[a], (a, user_id) + teachers[a]])
+
+    # Length 3: user -> a -> b -> user
+    middle = _best_edges({'teacher_id__in': list(students), 'learner_id__in': list(teachers)}, 'teacher')
+    for a, neighbours in middle.items():
+        for b, edge in neighbours.items():
+            if b != a:
+                cycles.append([(user_id, a) + students[a], (a, b) + edge, (b, user_id) + teachers[b]])
+
+    # Length 4: user -> a -> x -> b -> user, meeting at x
+    forward = _best_edges({'teacher_id__in': list(students)}, 'teacher')
+    backward = _best_edges({'learner_id__in': list(teachers)}, 'learner')
+    via = {}
+    for b, predecessors in backward.items():
+        for x, edge in predecessors.items():
+            via.setdefault(x, []).append((b, edge))
+    for a, successors in forward.items():
+        for x, first in successors.items():
+            if x in (user_id, a):
+                continue
+            for b, second in via.get(x, ()):
+                if b not in (user_id, a, x):
+                    cycles.append([
+                        (user_id, a) + students[a],
+                        (a, x) + first,
+                        (x, b) + second,
+                        (b, user_id) + teachers[b],
+                    ])
+
+    cycles.sort(key=lambda cycle: sum(edge[2] for edge in cycle), reverse=True)
+    return cycles[:MAX_CYCLES]
+
+
+def get_user_cycles(user_id):
+    """Serialized cycles for ``user_id``, cached per user"""
+    key = cache_key(user_id)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    cycles = find_cycles(user_id)
+    user_ids = {edge[0] for cycle in cycles for edge in cycle}
+    skill_ids = {edge[3] for cycle in cycles for edge in cycle}
+    users = {u.id: u for u in User.objects.filter(id__in=user_ids)}
+    skills = dict(Skill.objects.filter(id__in=skill_ids).values_list('id', 'name'))
+
+    result = []
+    for cycle in cycles:
+        result.append({
+            'length': len(cycle),
+            'total_score': round(sum(edge[2] for edge in cycle), 2),
+            'steps': [{
+                'teacher_id': teacher_id,
+                'teacher': users[teacher_id].get_full_name() or users[teacher_id].username,
+                'learner_id': learner_id,
+                'skill_id': skill_id,
+                'skill': skills.get(skill_id, ''),
+                'compatibility_score': score,
+            } for teacher_id, learner_id, score, skill_id in cycle],
+        })
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
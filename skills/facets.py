@@ -0,0 +1,179 @@
+"""
+Faceted filtering of a skill's tutors.
+
+Every facet is one annotation on the ``OfferedSkill`` queryset: a plain
+column (proficiency, format, the tutor's department, branch and year) or a
+``Case`` mapping a column into buckets (experience, rating, availability).
+Results filter on those annotations, several values of one facet matching
+any of them and different facets all applying.
+
+Counts for the whole sidebar come from a single ``GROUP BY`` over all the
+facet annotations, which returns one row per combination of values that
+occurs among the skill's tutors rather than one per tutor. Each facet is
+then counted from those rows with every other facet's selection applied but
+not its own, so ticking "Advanced" still shows how many tutors are
+"Expert".
+"""
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+
+from accounts.models import UserProfile
+
+from .models import OfferedSkill
+
+
+class Facet:
+    """A filterable attribute of a tutor, with the choices shown for it"""
+
+    def __init__(self, name, label, expression, choices=None, label_field=None):
+        self.name = name
+        self.label = label
+        self.expression = expression
+        self.choices = choices  # (value, label) in display order; None for database rows
+        self.label_field = label_field  # column naming the values of a foreign key facet
+
+    @property
+    def alias(self):
+        return f'facet_{self.name}'
+
+    @property
+    def label_alias(self):
+        return f'facet_{self.name}_label'
+
+    def clean(self, values):
+        """The selected ``values`` that can match, as stored in the annotation"""
+        if self.choices is not None:
+            known = {str(value) for value, _ in self.choices}
+            return {value for value in values if value in known}
+        return {int(value) for value in values if value.isdigit()}
+
+
+def _buckets(*buckets, default):
+    """``Case`` naming the first bucket whose condition holds"""
+    return Case(
+        *(When(condition, then=Value(value)) for value, _, condition in buckets),
+        default=Value(default),
+        output_field=CharField(),
+    )
+
+
+EXPERIENCE_BUCKETS = (
+    ('0', 'Under 1 year', Q(years_of_experience__lt=1)),
+    ('1-2', '1-2 years', Q(years_of_experience__lt=3)),
+    ('3-5', '3-5 years', Q(years_of_experience__lt=6)),
+)
+RATING_BUCKETS = (
+    ('unrated', 'Not yet rated', Q(rating_count=0)),
+    ('4', '4 stars and up', Q(average_rating__gte=4)),
+    ('3', '3 to 4 stars', Q(average_rating__gte=3)),
+)
+AVAILABILITY_BUCKETS = (
+    ('none', 'No hours set', Q(user__profile__isnull=True) | Q(user__profile__weekly_availability=b'')),
+)
+
+FACETS = (
+    Facet('proficiency', 'Proficiency', F('proficiency_level'), OfferedSkill.PROFICIENCY_LEVELS),
+    Facet(
+        'format', 'Format', F('teaching_preference'),
+        OfferedSkill._meta.get_field('teaching_preference').choices,
+    ),
+    Facet(
+        'experience', 'Experience', _buckets(*EXPERIENCE_BUCKETS, default='6+'),
+        [(value, label) for value, label, _ in EXPERIENCE_BUCKETS] + [('6+', '6+ years')],
+    ),
+    Facet(
+        'rating', 'Rating', _buckets(*RATING_BUCKETS, default='below-3'),
+        [(value, label) for value, label, _ in RATING_BUCKETS[1:]]
+        + [('below-3', 'Under 3 stars'), RATING_BUCKETS[0][:2]],
+    ),
+    Facet(
+        'availability', 'Availability', _buckets(*AVAILABILITY_BUCKETS, default='weekly'),
+        [('weekly', 'Has weekly hours'), AVAILABILITY_BUCKETS[0][:2]],
+    ),
+    Facet(
+        'department', 'Department', F('user__profile__department'),
+        label_field='user__profile__department__name',
+    ),
+    Facet('branch', 'Branch', F('user__profile__branch'), label_field='user__profile__branch__name'),
+    Facet('year', 'Year', F('user__profile__year'), UserProfile.YEAR_CHOICES),
+)
+
+
+def selected_facets(params):
+    """``{facet name: {value, ...}}`` of the facet values ticked in ``params``"""
+    selected = {}
+    for facet in FACETS:
+        values = facet.clean([value for value in params.getlist(facet.name) if value])
+        if values:
+            selected[facet.name] = values
+    return selected
+
+
+def with_facets(queryset):
+    """``queryset`` annotated with every facet's value"""
+    return queryset.annotate(**{facet.alias: facet.expression for facet in FACETS})
+
+
+def filter_facets(queryset, selected):
+    """Rows of a ``with_facets`` queryset matching every facet in ``selected``"""
+    return queryset.filter(**{
+        f'{facet.alias}__in': selected[facet.name] for facet in FACETS if facet.name in selected
+    })
+
+
+def facet_counts(queryset, selected):
+    """
+    Sidebar entries for a ``with_facets`` queryset, one query in all: a list
+    of ``{'name', 'label', 'values'}`` whose values are ``{'value', 'label',
+    'count', 'selected'}``. Values no tutor has are left out unless ticked.
+    """
+    columns = [facet.alias for facet in FACETS] + [facet.label_alias for facet in FACETS if facet.label_field]
+    combinations = (
+        queryset
+        .annotate(**{facet.label_alias: F(facet.label_field) for facet in FACETS if facet.label_field})
+        .values(*columns)
+        .annotate(tutors=Count('pk'))
+        .order_by()
+    )
+
+    counts = {facet.name: {} for facet in FACETS}
+    labels = {facet.name: {} for facet in FACETS if facet.label_field}
+    for row in combinations:
+        # Facets whose selection this combination misses; it counts towards a
+        # facet only if no *other* facet rejects it
+        misses = [
+            facet.name for facet in FACETS
+            if facet.name in selected and row[facet.alias] not in selected[facet.name]
+        ]
+        if len(misses) > 1:
+            continue
+        for facet in FACETS:
+            if misses and misses != [facet.name]:
+                continue
+            value = row[facet.alias]
+            if value in (None, ''):
+                continue
+            counts[facet.name][value] = counts[facet.name].get(value, 0) + row['tutors']
+            if facet.label_field:
+                labels[facet.name][value] = row[facet.label_alias]
+
+    sidebar = []
+    for facet in FACETS:
+        chosen = selected.get(facet.name, set())
+        if facet.choices is not None:
+            options = facet.choices
+        else:
+            options = sorted(labels[facet.name].items(), key=lambda option: option[1].casefold())
+        values = [
+            {
+                'value': value,
+                'label': label,
+                'count': counts[facet.name].get(value, 0),
+                'selected': value in chosen,
+            }
+            for value, label in options
+            if value in counts[facet.name] or value in chosen
+        ]
+        if values:
+            sidebar.append({'name': facet.name, 'label': facet.label, 'values': values})
+    return sidebar
+
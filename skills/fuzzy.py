@@ -0,0 +1,261 @@
+"""
+Typo-tolerant lookup of skills by name.
+
+Skill names and aliases are reduced to a compact form (casefolded, accents
+and separators removed, so "React.js" and "reactjs" are the same term), as
+are each word and the initials of multi-word names, and split into padded
+trigrams. An inverted index maps each trigram to the terms containing it, so
+a query only visits terms sharing trigrams with it, never the whole catalog.
+Candidates sharing enough trigrams are then checked with an edit distance
+that counts transpositions ("pyhton") as one edit.
+
+Each worker keeps one index, built on first use, rebuilt in the background
+once expired and patched from the ``Skill``/``SkillAlias`` signals like
+``skills.autocomplete``.
+"""
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+from .autocomplete import normalize
+from .models import Skill, SkillAlias
+
+SEPARATORS_RE = re.compile(r'[\s.\-_/]+')
+MIN_SHARED = 0.3  # Share of the query's trigrams a candidate must contain
+
+
+def compact(text):
+    return SEPARATORS_RE.sub('', normalize(text))
+
+
+def trigrams(term):
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_distance(term):
+    """Edits tolerated for a query of this length"""
+    if len(term) <= 4:
+        return 1
+    return 2 if len(term) <= 8 else 3
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions,
+    adjacent transpositions), or ``limit + 1`` once it must exceed ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def skill_terms(name, aliases=()):
+    """
+    A skill's compact terms, each mapped to whether it spells a whole name or
+    alias rather than one word or the initials of one
+    """
+    terms = {}
+    for text in (name, *aliases):
+        words = normalize(text).split()
+        if len(words) > 1:
+            # Each word on its own, so "pyhton" finds "Python Programming"
+            terms.update(dict.fromkeys(filter(None, map(compact, words)), False))
+            terms[''.join(word[0] for word in words)] = False
+    for text in (name, *aliases):
+        term = compact(text)
+        if term:
+            terms[term] = True
+    return terms
+
+
+def _file_terms(terms, postings, exact, skill_id, new_terms, in_use=False):
+    """
+    Add a skill's terms to the structures and return their term ids. Lists
+    of structures ``in_use`` by lookups are replaced rather than appended to.
+    """
+    def add(mapping, key, term_id):
+        if in_use:
+            mapping[key] = mapping.get(key, []) + [term_id]
+        else:
+            mapping.setdefault(key, []).append(term_id)
+
+    ids = []
+    for term, whole in new_terms.items():
+        term_id = len(terms)
+        terms.append((term, skill_id, whole))
+        add(exact, term, term_id)
+        for gram in trigrams(term):
+            add(postings, gram, term_id)
+        ids.append(term_id)
+    return ids
+
+
+class FuzzyIndex:
+    """Trigram postings over compact skill terms"""
+
+    def __init__(self):
+        self.terms = []  # term id -> (term, skill_id, whole), None once removed
+        self.postings = {}  # trigram -> term ids
+        self.exact = {}  # term -> term ids
+        self.term_ids = {}  # skill_id -> term ids
+        self.names = {}
+        self.built_at = None
+        self.lock = threading.Lock()
+
+    def build(self):
+        aliases = {}
+        for skill_id, alias in SkillAlias.objects.values_list('skill_id', 'name').iterator():
+            aliases.setdefault(skill_id, []).append(alias)
+        names = dict(Skill.objects.values_list('id', 'name').iterator())
+        terms, postings, exact, term_ids = [], {}, {}, {}
+        for skill_id, name in names.items():
+            term_ids[skill_id] = _file_terms(
+                terms, postings, exact, skill_id, skill_terms(name, aliases.get(skill_id, ()))
+            )
+        with self.lock:
+            # Swap everything at once; lookups in flight keep the structures they started with
+            self.terms, self.postings, self.exact, self.term_ids, self.names = terms, postings, exact, term_ids, names
+            self.built_at = time.monotonic()
+
+    def is_stale(self):
+        ttl = getattr(settings, 'SKILL_AUTOCOMPLETE_TTL', 300)
+        return self.built_at is None or (ttl and time.monotonic() - self.built_at > ttl)
+
+    def refresh_skill(self, skill_id):
+        """Re-read one skill's name and aliases and re-file its terms"""
+        name = Skill.objects.filter(pk=skill_id).values_list('name', flat=True).first()
+        aliases = list(SkillAlias.objects.filter(skill_id=skill_id).values_list('name', flat=True))
+        with self.lock:
+            for term_id in self.term_ids.pop(skill_id, ()):
+                # Postings keep the id; lookups skip removed terms
+                self.terms[term_id] = None
+            names = dict(self.names)
+            if name is None:
+                names.pop(skill_id, None)
+            else:
+                names[skill_id] = name
+                self.term_ids[skill_id] = _file_terms(
+                    self.terms, self.postings, self.exact, skill_id, skill_terms(name, aliases), in_use=True
+                )
+            self.names = names
+
+    def candidates(self, term, postings=None, exact=None):
+        """Term ids sharing enough trigrams with ``term``, most shared first"""
+        if len(term) < 3:
+            return (self.exact if exact is None else exact).get(term, [])
+        postings = self.postings if postings is None else postings
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(postings.get(gram, ()))
+        needed = max(1, int(len(grams) * MIN_SHARED))
+        return [term_id for term_id, count in shared.most_common() if count >= needed]
+
+    def lookup(self, query, limit=5, exclude=(), max_edits=None, whole_only=False):
+        """
+        ``(skill_id, name, distance)`` of the skills closest to ``query``,
+        nearest first, within ``max_edits`` (by default ``max_distance``)
+        edits of the compact query. ``whole_only`` compares the query with
+        whole names and aliases only, for finding duplicates.
+        """
+        term = compact(query)
+        if not term:
+            return []
+        limit_distance = max_distance(term) if max_edits is None else max_edits
+        terms, names = self.terms, self.names
+        best = {}
+        for term_id in self.candidates(term, self.postings, self.exact):
+            entry = terms[term_id]
+            if entry is None or entry[1] in exclude or entry[1] not in names:
+                continue
+            candidate, skill_id, whole = entry
+            if whole_only and not whole:
+                continue
+            distance = edit_distance(term, candidate, limit_distance)
+            if distance <= limit_distance and distance < best.get(skill_id, limit_distance + 1):
+                best[skill_id] = distance
+        ranked = sorted(best.items(), key=lambda item: (item[1], names[item[0]].casefold()))
+        return [(skill_id, names[skill_id], distance) for skill_id, distance in ranked[:limit]]
+
+
+_fuzzy = FuzzyIndex()
+_build_lock = threading.Lock()
+
+
+def _rebuild_in_background():
+    try:
+        _fuzzy.build()
+    finally:
+        # The thread opened its own connection; don't leave it behind
+        connection.close()
+        _build_lock.release()
+
+
+def get_fuzzy_index():
+    """
+    Return this worker's index. The first call builds it; once expired it is
+    rebuilt in a background thread and the current copy is returned.
+    """
+    if _fuzzy.built_at is None:
+        with _build_lock:
+            if _fuzzy.built_at is None:
+                _fuzzy.build()
+    elif _fuzzy.is_stale() and _build_lock.acquire(blocking=False):
+        threading.Thread(target=_rebuild_in_background, daemon=True).start()
+    return _fuzzy
+
+
+def did_you_mean(query, limit=3):
+    """Names of skills spelled like ``query``, for "did you mean" hints"""
+    return [{'id': skill_id, 'name': name} for skill_id, name, _ in get_fuzzy_index().lookup(query, limit)]
+
+
+def refresh_skill_fuzzy(skill_id):
+    """Patch the index for one skill; a no-op until the index is first built"""
+    if _fuzzy.built_at is not None:
+        _fuzzy.refresh_skill(skill_id)
+
+
+def duplicate_clusters(index, max_edits=None):
+    """
+    Groups of skill ids whose names are within ``max_edits`` (by default
+    ``max_distance``) of each other or of each other's aliases, linked
+    transitively, largest group first. Word and initials terms are left out,
+    or "Web Design" would join every other "... Design".
+    """
+    parent = {}
+
+    def root(skill_id):
+        while parent.get(skill_id, skill_id) != skill_id:
+            parent[skill_id] = parent.get(parent[skill_id], parent[skill_id])
+            skill_id = parent[skill_id]
+        return skill_id
+
+    for skill_id, name in index.names.items():
+        similar = index.lookup(name, limit=20, exclude=(skill_id,), max_edits=max_edits, whole_only=True)
+        for other_id, _, _ in similar:
+            first, second = root(skill_id), root(other_id)
+            if first != second:
+                parent[max(first, second)] = min(first, second)
+
+    clusters = {}
+    for skill_id in parent:
+        clusters.setdefault(root(skill_id), set()).add(skill_id)
+    for skill_id, members in clusters.items():
+        members.add(skill_id)
+    return sorted((sorted(members) for members in clusters.values()), key=lambda members: (-len(members), members))
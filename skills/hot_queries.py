@@ -0,0 +1,19 @@
+from core.queryplans import hot_query
+from .models import OfferedSkill, SkillTrend
+
+
+@hot_query('offered.top_tutors')
+def top_tutors():
+    return OfferedSkill.objects.filter(skill_id=1, is_active=True).order_by('-average_rating', '-total_sessions')[:3]
+
+
+@hot_query('offered.find_tutors')
+def find_tutors():
+    return (OfferedSkill.objects.filter(skill_id=1, is_active=True)
+            .select_related('user', 'skill')
+            .order_by('-average_rating', '-total_sessions')[:12])
+
+
+@hot_query('trends.by_category')
+def trending_in_category():
+    return SkillTrend.objects.filter(category_id=1).order_by('-score')[:20]
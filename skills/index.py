@@ -0,0 +1,134 @@
+"""
+In-memory inverted index of active offers and desires.
+
+Maps each skill id to sorted ``array('q')`` buffers of user ids, one map for
+teachers and one for learners, so candidate lookup for a skill is a dict hit
+instead of a query. The index is built once per worker process and kept up
+to date from the ``OfferedSkill``/``DesiredSkill`` signals. Other workers
+pick up changes when their copy expires (``SKILL_INDEX_TTL`` seconds).
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import OfferedSkill, DesiredSkill
+
+
+def _insert(ids, user_id):
+    position = bisect_left(ids, user_id)
+    if position == len(ids) or ids[position] != user_id:
+        ids.insert(position, user_id)
+
+
+def _remove(ids, user_id):
+    position = bisect_left(ids, user_id)
+    if position < len(ids) and ids[position] == user_id:
+        del ids[position]
+
+
+class SkillIndex:
+    """Skill id -> user id arrays for teachers and learners"""
+
+    def __init__(self):
+        self.teachers = {}
+        self.learners = {}
+        self.offered_by_user = {}
+        self.desired_by_user = {}
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def build(self):
+        teachers, offered_by_user = self._load(OfferedSkill.objects.filter(is_active=True))
+        learners, desired_by_user = self._load(DesiredSkill.objects.filter(is_active=True))
+        with self.lock:
+            self.teachers, self.offered_by_user = teachers, offered_by_user
+            self.learners, self.desired_by_user = learners, desired_by_user
+            self.built_at = time.monotonic()
+
+    @staticmethod
+    def _load(queryset):
+        by_skill = {}
+        by_user = {}
+        rows = queryset.order_by('skill_id', 'user_id').values_list('skill_id', 'user_id')
+        for skill_id, user_id in rows.iterator():
+            by_skill.setdefault(skill_id, array('q')).append(user_id)
+            by_user.setdefault(user_id, set()).add(skill_id)
+        return by_skill, by_user
+
+    def is_stale(self):
+        ttl = getattr(settings, 'SKILL_INDEX_TTL', 300)
+        return self.built_at is None or (ttl and time.monotonic() - self.built_at > ttl)
+
+    def teachers_of(self, skill_id):
+        """Sorted ids of users actively offering ``skill_id`` (read-only)"""
+        return self.teachers.get(skill_id, array('q'))
+
+    def learners_of(self, skill_id):
+        """Sorted ids of users actively wanting ``skill_id`` (read-only)"""
+        return self.learners.get(skill_id, array('q'))
+
+    def refresh_user(self, user_id):
+        """Re-read one user's active offers and desires and patch the maps"""
+        offered = set(OfferedSkill.objects.filter(
+            user_id=user_id, is_active=True
+        ).values_list('skill_id', flat=True))
+        desired = set(DesiredSkill.objects.filter(
+            user_id=user_id, is_active=True
+        ).values_list('skill_id', flat=True))
+        with self.lock:
+            self._patch(self.teachers, self.offered_by_user, user_id, offered)
+            self._patch(self.learners, self.desired_by_user, user_id, desired)
+
+    @staticmethod
+    def _patch(by_skill, by_user, user_id, skill_ids):
+        previous = by_user.get(user_id, set())
+        for skill_id in previous - skill_ids:
+            _remove(by_skill.get(skill_id, array('q')), user_id)
+        for skill_id in skill_ids - previous:
+            _insert(by_skill.setdefault(skill_id, array('q')), user_id)
+        if skill_ids:
+            by_user[user_id] = skill_ids
+        else:
+            by_user.pop(user_id, None)
+
+    def teachers_for_user(self, user_id):
+        """Users who teach at least one skill ``user_id`` wants to learn"""
+        result = set()
+        for skill_id in self.desired_by_user.get(user_id, ()):
+            result.update(self.teachers_of(skill_id))
+        result.discard(user_id)
+        return result
+
+    def learners_for_user(self, user_id):
+        """Users who want to learn at least one skill ``user_id`` teaches"""
+        result = set()
+        for skill_id in self.offered_by_user.get(user_id, ()):
+            result.update(self.learners_of(skill_id))
+        result.discard(user_id)
+        return result
+
+    def mutual_partners(self, user_id):
+        """Users who can both teach ``user_id`` and learn from them"""
+        return self.teachers_for_user(user_id) & self.learners_for_user(user_id)
+
+
+_index = SkillIndex()
+_build_lock = threading.Lock()
+
+
+def get_skill_index():
+    """Return this worker's index, building it on first use or expiry"""
+    if _index.is_stale():
+        with _build_lock:
+            if _index.is_stale():
+                _index.build()
+    return _index
+
+
+def refresh_user_index(user_id):
+    """Patch the index for one user; a no-op until the index is first built"""
+    if _index.built_at is not None:
+        _index.refresh_user(user_id)
@@ -0,0 +1,189 @@
+"""
+Skill matching engine.
+
+Pairs active ``OfferedSkill`` rows with active ``DesiredSkill`` rows for the
+same skill, scores each pair and upserts the result into ``SkillMatch``.
+Candidate partners are looked up in the inverted skill index (``.index``).
+Recomputation is incremental: when a user edits an offer or a desire only
+the pairs involving that user are rebuilt.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from .models import OfferedSkill, DesiredSkill, SkillMatch
+from .cycles import invalidate_cycles
+from .index import get_skill_index
+
+PROFICIENCY_ORDER = {
+    'beginner': 0,
+    'intermediate': 1,
+    'advanced': 2,
+    'expert': 3,
+}
+
+# Score weights, summing to 100
+LEVEL_WEIGHT = 40
+PREFERENCE_WEIGHT = 20
+DEPARTMENT_WEIGHT = 10
+BRANCH_WEIGHT = 5
+RATING_WEIGHT = 25
+
+MATCH_UPDATE_FIELDS = ['compatibility_score', 'is_mutual', 'updated_at']
+MATCH_UNIQUE_FIELDS = ['teacher', 'learner', 'offered_skill', 'desired_skill']
+
+
+def level_score(proficiency, current_level, target_level):
+    """Score how well a teacher's proficiency covers the learner's goal"""
+    offered = PROFICIENCY_ORDER.get(proficiency, 0)
+    current = PROFICIENCY_ORDER.get(current_level, 0)
+    target = PROFICIENCY_ORDER.get(target_level, 0)
+    if offered >= target:
+        return LEVEL_WEIGHT
+    gap = max(target - current, 1)
+    return LEVEL_WEIGHT * max(offered - current, 0) / gap
+
+
+def preference_score(teaching_preference, learning_preference):
+    """Full marks when the teaching and learning formats are compatible"""
+    if 'both' in (teaching_preference, learning_preference) or teaching_preference == learning_preference:
+        return PREFERENCE_WEIGHT
+    return 0
+
+
+def compatibility_score(offered, desired, teacher_profile=None, learner_profile=None):
+    """
+    Calculate a 0-100 compatibility score for an offered/desired skill pair.
+
+    Profiles are optional dicts with ``department_id``, ``branch_id`` and
+    ``average_rating_as_teacher`` keys (see ``load_profiles``).
+    """
+    score = level_score(offered.proficiency_level, desired.current_level, desired.target_level)
+    score += preference_score(offered.teaching_preference, desired.learning_preference)
+
+    teacher_profile = teacher_profile or {}
+    learner_profile = learner_profile or {}
+    department = teacher_profile.get('department_id')
+    if department and department == learner_profile.get('department_id'):
+        score += DEPARTMENT_WEIGHT
+        branch = teacher_profile.get('branch_id')
+        if branch and branch == learner_profile.get('branch_id'):
+            score += BRANCH_WEIGHT
+
+    rating = offered.average_rating or teacher_profile.get('average_rating_as_teacher') or 0
+    score += RATING_WEIGHT * min(rating, 5) / 5
+    return round(score, 2)
+
+
+def load_profiles(user_ids):
+    """Load the profile fields used for scoring, keyed by user id"""
+    from accounts.models import UserProfile
+
+    profiles = UserProfile.objects.filter(user_id__in=user_ids).values(
+        'user_id', 'department_id', 'branch_id', 'average_rating_as_teacher'
+    )
+    return {profile['user_id']: profile for profile in profiles}
+
+
+def build_user_matches(user_id):
+    """
+    Build unsaved ``SkillMatch`` rows for every pair involving ``user_id``.
+
+    Covers both directions: the user teaching others and others teaching
+    the user. Candidate partners come from the inverted skill index; only
+    their rows for the shared skills are loaded.
+    """
+    my_offers = list(OfferedSkill.objects.filter(user_id=user_id, is_active=True))
+    my_desires = list(DesiredSkill.objects.filter(user_id=user_id, is_active=True))
+
+    # Patch this user into the worker's index first, so whichever of two
+    # users changes last sees the other one in the candidate lists
+    index = get_skill_index()
+    index.refresh_user(user_id)
+    learner_ids = set()
+    for offer in my_offers:
+        learner_ids.update(index.learners_of(offer.skill_id))
+    teacher_ids = set()
+    for desire in my_desires:
+        teacher_ids.update(index.teachers_of(desire.skill_id))
+    learner_ids.discard(user_id)
+    teacher_ids.discard(user_id)
+
+    learner_desires = DesiredSkill.objects.filter(
+        user_id__in=learner_ids,
+        skill_id__in=[offer.skill_id for offer in my_offers],
+        is_active=True,
+    ) if learner_ids else []
+    teacher_offers = OfferedSkill.objects.filter(
+        user_id__in=teacher_ids,
+        skill_id__in=[desire.skill_id for desire in my_desires],
+        is_active=True,
+    ) if teacher_ids else []
+
+    offers_by_skill = {}
+    for offer in my_offers:
+        offers_by_skill[offer.skill_id] = offer
+    desires_by_skill = {}
+    for desire in my_desires:
+        desires_by_skill[desire.skill_id] = desire
+
+    pairs = []
+    for desire in learner_desires:
+        pairs.append((offers_by_skill[desire.skill_id], desire))
+    for offer in teacher_offers:
+        pairs.append((offer, desires_by_skill[offer.skill_id]))
+
+    # Users who both teach and learn from this user are mutual matches
+    teaches = {desire.user_id for offer, desire in pairs if offer.user_id == user_id}
+    learns = {offer.user_id for offer, desire in pairs if desire.user_id == user_id}
+    mutual = teaches & learns
+
+    profiles = load_profiles({user_id} | teaches | learns)
+    matches = []
+    for offer, desire in pairs:
+        other = desire.user_id if offer.user_id == user_id else offer.user_id
+        matches.append(SkillMatch(
+            teacher_id=offer.user_id,
+            learner_id=desire.user_id,
+            offered_skill=offer,
+            desired_skill=desire,
+            compatibility_score=compatibility_score(
+                offer, desire,
+                profiles.get(offer.user_id),
+                profiles.get(desire.user_id),
+            ),
+            is_mutual=other in mutual,
+        ))
+    return matches
+
+
+def match_key(match):
+    return (match.teacher_id, match.learner_id, match.offered_skill_id, match.desired_skill_id)
+
+
+def recompute_matches_for_user(user_id):
+    """
+    Rebuild the ``SkillMatch`` rows involving a single user.
+
+    Upserts current pairs in one ``bulk_create`` and removes rows whose offer
+    or desire is no longer active. Dismissed flags are preserved.
+    Returns the number of matches kept.
+    """
+    matches = build_user_matches(user_id)
+    keep = {match_key(match) for match in matches}
+
+    with transaction.atomic():
+        existing = SkillMatch.objects.filter(
+            Q(teacher_id=user_id) | Q(learner_id=user_id)
+        ).values_list('id', 'teacher_id', 'learner_id', 'offered_skill_id', 'desired_skill_id')
+        stale = [row[0] for row in existing if row[1:] not in keep]
+        if stale:
+            SkillMatch.objects.filter(id__in=stale).delete()
+        if matches:
+            SkillMatch.objects.bulk_create(
+                matches,
+                update_conflicts=True,
+                unique_fields=MATCH_UNIQUE_FIELDS,
+                update_fields=MATCH_UPDATE_FIELDS,
+            )
+    invalidate_cycles()
+    return len(matches)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0003_alter_desiredskill_table_alter_offeredskill_table_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offeredskill',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='offeredskill',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
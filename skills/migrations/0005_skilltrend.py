@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-16 22:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0004_offeredskill_rating_count_offeredskill_rating_sum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillTrend',
+            fields=[
+                ('skill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='skills.skill')),
+                ('score', models.FloatField(default=0.0, help_text='Exponentially decayed activity score')),
+                ('offered_count', models.PositiveIntegerField(default=0, help_text='Active offers')),
+                ('desired_count', models.PositiveIntegerField(default=0, help_text='Active desires')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_trends', to='skills.skillcategory')),
+            ],
+            options={
+                'db_table': 'skilltrend',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['-score'], name='skilltrend_score_idx'), models.Index(fields=['category', '-score'], name='skilltrend_category_score_idx')],
+            },
+        ),
+    ]
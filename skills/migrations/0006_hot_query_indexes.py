@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0005_skilltrend'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='offeredskill',
+            name='skill',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='offered_by_users', to='skills.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='offeredskill',
+            index=models.Index(fields=['skill', 'is_active', '-average_rating', '-total_sessions'], name='offeredskill_ranking_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='skills.skill')),
+            ],
+            options={
+                'verbose_name_plural': 'Skill aliases',
+                'db_table': 'skillalias',
+                'ordering': ['name'],
+                'unique_together': {('skill', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-16 23:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0007_skillalias'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='offeredskill',
+            name='offeredskill_ranking_idx',
+        ),
+        migrations.AddIndex(
+            model_name='offeredskill',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['skill', '-average_rating', '-total_sessions'], name='offeredskill_ranking_idx'),
+        ),
+    ]
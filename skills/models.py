@@ -33,6 +33,20 @@ class Skill(models.Model):
     def __str__(self):
         return f"{self.name} ({self.category.name})"
 
+class SkillAlias(models.Model):
+    """Another name a skill is known by (abbreviation, synonym), used by autocomplete"""
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+    name = models.CharField(max_length=100)
+    
+    class Meta:
+        ordering = ['name']
+        unique_together = ['skill', 'name']
+        db_table = 'skillalias'
+        verbose_name_plural = "Skill aliases"
+    
+    def __str__(self):
+        return f"{self.name} → {self.skill.name}"
+
 class OfferedSkill(models.Model):
     PROFICIENCY_LEVELS = [
         ('beginner', 'Beginner'),
@@ -42,7 +56,7 @@ class OfferedSkill(models.Model):
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='offered_skills')
-    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='offered_by_users')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='offered_by_users', db_index=False)
     proficiency_level = models.CharField(max_length=20, choices=PROFICIENCY_LEVELS)
     description = models.TextField(blank=True, help_text="Describe your experience with this skill")
     years_of_experience = models.PositiveIntegerField(default=0)
@@ -59,11 +73,19 @@ class OfferedSkill(models.Model):
     # Rating for this specific skill teaching
     total_sessions = models.PositiveIntegerField(default=0)
     average_rating = models.FloatField(default=0.0)
+    # Running totals behind average_rating, maintained by skill_sessions.ratings
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['-created_at']
         unique_together = ['user', 'skill']
         db_table = 'offeredskill'
+        indexes = [
+            # Partial: SQLite doesn't use a bare boolean test as an equality on an index column
+            models.Index(fields=['skill', '-average_rating', '-total_sessions'], condition=models.Q(is_active=True),
+                         name='offeredskill_ranking_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} offers {self.skill.name}"
@@ -118,3 +140,23 @@ class SkillMatch(models.Model):
     
     def __str__(self):
         return f"Match: {self.teacher.username} → {self.learner.username} ({self.offered_skill.skill.name})"
+
+class SkillTrend(models.Model):
+    """Precomputed trending score per skill, refreshed by the refresh_skill_trends command"""
+    skill = models.OneToOneField(Skill, on_delete=models.CASCADE, primary_key=True, related_name='trend')
+    category = models.ForeignKey(SkillCategory, on_delete=models.CASCADE, related_name='skill_trends')
+    score = models.FloatField(default=0.0, help_text="Exponentially decayed activity score")
+    offered_count = models.PositiveIntegerField(default=0, help_text="Active offers")
+    desired_count = models.PositiveIntegerField(default=0, help_text="Active desires")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-score']
+        db_table = 'skilltrend'
+        indexes = [
+            models.Index(fields=['-score'], name='skilltrend_score_idx'),
+            models.Index(fields=['category', '-score'], name='skilltrend_category_score_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Trend for {self.skill.name}: {self.score:.2f}"
@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Skill, SkillAlias, OfferedSkill, DesiredSkill
+from .autocomplete import refresh_skill_autocomplete
+from .fuzzy import refresh_skill_fuzzy
+from .index import refresh_user_index
+from .tasks import recompute_matches
+
+
+@receiver(post_save, sender=OfferedSkill)
+@receiver(post_save, sender=DesiredSkill)
+@receiver(post_delete, sender=OfferedSkill)
+@receiver(post_delete, sender=DesiredSkill)
+def refresh_user_matches(sender, instance, **kwargs):
+    """Update the skill index and queue a match rebuild for the user whose offer or desire changed"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: refresh_user_index(user_id))
+    recompute_matches.delay(user_id)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(post_save, sender=SkillAlias)
+@receiver(post_delete, sender=SkillAlias)
+def refresh_name_indexes(sender, instance, **kwargs):
+    """Patch this worker's autocomplete and fuzzy indexes once the skill or alias change is committed"""
+    skill_id = instance.pk if sender is Skill else instance.skill_id
+    transaction.on_commit(lambda: refresh_skill_autocomplete(skill_id))
+    transaction.on_commit(lambda: refresh_skill_fuzzy(skill_id))
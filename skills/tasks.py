@@ -0,0 +1,8 @@
+from core.taskqueue import task
+from .matching import recompute_matches_for_user
+
+
+@task
+def recompute_matches(user_id):
+    """Rebuild the SkillMatch rows involving one user"""
+    recompute_matches_for_user(user_id)
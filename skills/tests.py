@@ -1,3 +1,363 @@
+from datetime import time
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.availability import FULL_WEEK, window_mask
+from accounts.models import AvailabilityRule
+from accounts.tests import MONDAY, book_session, local, make_user
+
+from . import cycles, fuzzy
+from .autocomplete import SkillAutocomplete
+from .batch_matching import rematch_all
+from .facets import FACETS, facet_counts, filter_facets, with_facets
+from .fuzzy import FuzzyIndex, duplicate_clusters, skill_terms
+from .index import get_skill_index
+from .matching import build_user_matches
+from .models import DesiredSkill, OfferedSkill, Skill, SkillAlias, SkillCategory, SkillMatch, SkillTrend
+from .trends import refresh_skill_trends, trending_skills
+from .tutor_search import RankedTutors, common_free_time
+
+
+class CommonFreeTimeTests(TestCase):
+    def setUp(self):
+        category = SkillCategory.objects.create(name='Programming')
+        self.skill = Skill.objects.create(name='Python', category=category)
+        self.learner = make_user('learner')
+        self.early = self.tutor('early', time(9), time(11))
+        self.late = self.tutor('late', time(14), time(18))
+        self.busy = make_user('busy')  # no rules: never free
+        OfferedSkill.objects.create(user=self.busy, skill=self.skill, proficiency_level='expert')
+        # Before everything in the week, so nothing is cut off
+        self.now = mock.patch('django.utils.timezone.now', return_value=local(MONDAY, 0))
+        self.now.start()
+        self.addCleanup(self.now.stop)
+
+    def tutor(self, username, start, end):
+        user = make_user(username)
+        AvailabilityRule.objects.create(user=user, weekday=0, start_time=start, end_time=end)
+        OfferedSkill.objects.create(user=user, skill=self.skill, proficiency_level='advanced')
+        return user
+
+    def search(self, **kwargs):
+        kwargs.setdefault('duration_minutes', 15)
+        return common_free_time(self.skill.id, monday=MONDAY, **kwargs)
+
+    def test_ranks_by_earliest_common_slot(self):
+        results = self.search()
+        self.assertEqual([r['user_id'] for r in results], [self.early.id, self.late.id])
+        self.assertEqual(results[0]['slots'], [(local(MONDAY, 9), local(MONDAY, 11))])
+        self.assertEqual(results[1]['free_minutes'], 240)
+
+    def test_learner_availability_and_window_narrow_the_slots(self):
+        AvailabilityRule.objects.create(user=self.learner, weekday=0, start_time=time(10), end_time=time(15))
+        results = self.search(learner_id=self.learner.id, window=window_mask([0], time(10, 30), time(23)))
+        self.assertEqual(
+            [(r['user_id'], r['slots']) for r in results],
+            [
+                (self.early.id, [(local(MONDAY, 10, 30), local(MONDAY, 11))]),
+                (self.late.id, [(local(MONDAY, 14), local(MONDAY, 15))]),
+            ],
+        )
+
+    def test_duration_drops_short_runs(self):
+        results = self.search(window=FULL_WEEK, duration_minutes=180)
+        self.assertEqual([r['user_id'] for r in results], [self.late.id])
+
+    def test_booked_sessions_are_skipped(self):
+        book_session(self.early, self.learner, local(MONDAY, 9), minutes=90)
+        results = self.search()
+        self.assertEqual(results[0]['slots'], [(local(MONDAY, 10, 30), local(MONDAY, 11))])
+
+    def test_time_before_now_is_never_offered(self):
+        with mock.patch('django.utils.timezone.now', return_value=local(MONDAY, 10, 5)):
+            results = self.search()
+        # 10:05 rounds up to the next whole slot
+        self.assertEqual(results[0]['slots'], [(local(MONDAY, 10, 15), local(MONDAY, 11))])
+        with mock.patch('django.utils.timezone.now', return_value=local(MONDAY, 19)):
+            self.assertEqual(self.search(), [])
+
+    def test_ranked_tutors_loads_only_the_requested_page(self):
+        tutors = RankedTutors(self.search())
+        self.assertEqual(len(tutors), 2)
+        with self.assertNumQueries(1):
+            page = tutors[1:2]
+        self.assertEqual([tutor.user_id for tutor in page], [self.late.id])
+        self.assertEqual(page[0].free_minutes, 240)
+
+
+class FuzzyIndexTests(TestCase):
+    def setUp(self):
+        category = SkillCategory.objects.create(name='Programming')
+        for name in ('Python Programming', 'React.js', 'Machine Learning', 'Java'):
+            Skill.objects.create(name=name, category=category)
+        SkillAlias.objects.create(skill=Skill.objects.get(name='Java'), name='Core Java')
+        self.index = FuzzyIndex()
+        self.index.build()
+
+    def names(self, query):
+        return [name for _, name, _ in self.index.lookup(query)]
+
+    def test_terms_include_each_word_and_the_initials(self):
+        self.assertEqual(
+            skill_terms('Python Programming', ['Py-Lang']),
+            {'pythonprogramming': True, 'python': False, 'programming': False, 'pp': False, 'pylang': True},
+        )
+        self.assertEqual(skill_terms('React.js'), {'reactjs': True})
+        # A one-word alias is a whole term even when it is another name's word
+        self.assertEqual(skill_terms('Core Java', ['Java'])['java'], True)
+
+    def test_typos_in_one_word_find_the_skill(self):
+        self.assertEqual(self.names('pyhton'), ['Python Programming'])
+        self.assertEqual(self.names('reactjs'), ['React.js'])
+        self.assertEqual(self.names('ML'), ['Machine Learning'])
+        self.assertEqual(self.names('lerning'), ['Machine Learning'])
+        self.assertEqual(self.names('corejava'), ['Java'])
+
+    def test_duplicates_compare_whole_names_and_aliases_only(self):
+        category = SkillCategory.objects.get()
+        ids = {
+            name: Skill.objects.create(name=name, category=category).pk
+            for name in ('Web Design', 'Interior Design', 'Graphic Design', 'Game Design', 'Python', 'Reactjs', 'ReactJS.')
+        }
+        ids['Python Programming'] = Skill.objects.get(name='Python Programming').pk
+        ids['React.js'] = Skill.objects.get(name='React.js').pk
+        SkillAlias.objects.create(skill=Skill.objects.get(pk=ids['Game Design']), name='Python Programing')
+        self.index.build()
+        self.assertEqual(duplicate_clusters(self.index), [
+            sorted([ids['React.js'], ids['Reactjs'], ids['ReactJS.']]),
+            sorted([ids['Python Programming'], ids['Game Design']]),
+        ])
+        self.assertEqual(self.index.lookup('Web Design', exclude=(ids['Web Design'],), whole_only=True), [])
+
+    def test_expired_index_is_rebuilt_in_the_background(self):
+        index = fuzzy._fuzzy
+        fuzzy.get_fuzzy_index()
+        built_at = index.built_at
+        self.addCleanup(setattr, index, 'built_at', built_at)
+        with mock.patch.object(index, 'is_stale', return_value=True), \
+                mock.patch.object(fuzzy.threading, 'Thread') as thread:
+            self.assertIs(fuzzy.get_fuzzy_index(), index)
+            # A second caller doesn't start another rebuild while one runs
+            fuzzy.get_fuzzy_index()
+        thread.assert_called_once_with(target=fuzzy._rebuild_in_background, daemon=True)
+        self.assertEqual(index.built_at, built_at)
+        fuzzy._build_lock.release()
+
+
+class TrendingSkillsTests(TestCase):
+    def test_reads_never_refresh_the_scores(self):
+        category = SkillCategory.objects.create(name='Programming')
+        skill = Skill.objects.create(name='Python', category=category)
+        OfferedSkill.objects.create(user=make_user('tutor'), skill=skill, proficiency_level='expert')
+        with mock.patch('skills.trends.refresh_skill_trends') as refresh:
+            self.assertEqual(trending_skills(10), [])
+        refresh.assert_not_called()
+        self.assertFalse(SkillTrend.objects.exists())
+
+        refresh_skill_trends()
+        self.assertEqual([s.name for s in trending_skills(10)], ['Python'])
+
+
+class MatchCandidateTests(TestCase):
+    """Candidates found through the skill index give the same pairs as a direct scan"""
+
+    def setUp(self):
+        category = SkillCategory.objects.create(name='Programming')
+        self.python, self.java = (Skill.objects.create(name=name, category=category) for name in ('Python', 'Java'))
+        self.a, self.b, self.c = (make_user(name) for name in 'abc')
+        OfferedSkill.objects.create(user=self.a, skill=self.python, proficiency_level='expert')
+        DesiredSkill.objects.create(user=self.a, skill=self.java)
+        OfferedSkill.objects.create(user=self.b, skill=self.java, proficiency_level='expert')
+        DesiredSkill.objects.create(user=self.b, skill=self.python)
+        DesiredSkill.objects.create(user=self.c, skill=self.python)
+        get_skill_index().build()
+
+    def pairs(self, user):
+        return {(m.teacher_id, m.learner_id, m.is_mutual) for m in build_user_matches(user.id)}
+
+    def test_pairs_in_both_directions(self):
+        self.assertEqual(self.pairs(self.a), {
+            (self.a.id, self.b.id, True),
+            (self.a.id, self.c.id, False),
+            (self.b.id, self.a.id, True),
+        })
+
+    def test_own_changes_since_the_build_are_seen(self):
+        DesiredSkill.objects.filter(user=self.c).update(is_active=False)
+        OfferedSkill.objects.create(user=self.c, skill=self.java, proficiency_level='expert')
+        self.assertEqual(self.pairs(self.c), {(self.c.id, self.a.id, False)})
+        self.assertIn(self.c.id, get_skill_index().teachers_of(self.java.id))
+        self.assertNotIn(self.c.id, get_skill_index().learners_of(self.python.id))
+
+
+class SwapCycleTests(TestCase):
+    def setUp(self):
+        category = SkillCategory.objects.create(name='Programming')
+        self.skills = [Skill.objects.create(name=name, category=category) for name in ('Python', 'Java')]
+
+    def match(self, teacher, learner, score, skill=0):
+        skill = self.skills[skill]
+        offered, _ = OfferedSkill.objects.get_or_create(
+            user=teacher, skill=skill, defaults={'proficiency_level': 'expert'}
+        )
+        desired, _ = DesiredSkill.objects.get_or_create(user=learner, skill=skill)
+        return SkillMatch.objects.create(
+            teacher=teacher, learner=learner, offered_skill=offered, desired_skill=desired,
+            compatibility_score=score,
+        )
+
+    def test_fanout_keeps_each_nodes_best_distinct_neighbours(self):
+        teacher = make_user('teacher')
+        learners = [make_user(f'learner{i}') for i in range(5)]
+        for i, learner in enumerate(learners):
+            self.match(teacher, learner, 10 + i)
+            self.match(teacher, learner, 50 + i, skill=1)
+        SkillMatch.objects.filter(pk=self.match(learners[0], teacher, 99).pk).update(is_dismissed=True)
+        with mock.patch.object(cycles, 'MAX_FANOUT', 3), self.assertNumQueries(1):
+            edges = cycles._best_edges({'teacher_id': teacher.id}, 'teacher')
+        self.assertEqual(edges, {teacher.id: {
+            learners[i].id: (50 + i, self.skills[1].id) for i in (4, 3, 2)
+        }})
+        self.assertEqual(cycles._best_edges({'learner_id': teacher.id}, 'learner'), {})
+
+    def test_finds_cycles_of_every_length(self):
+        a, b, c, d = (make_user(name) for name in 'abcd')
+        self.match(a, b, 90)
+        self.match(b, a, 80)
+        self.match(b, c, 70)
+        self.match(c, a, 60)
+        self.match(c, d, 50)
+        self.match(d, a, 40)
+        found = [[(edge[0], edge[1]) for edge in cycle] for cycle in cycles.find_cycles(a.id)]
+        # Best summed compatibility first
+        self.assertEqual(found, [
+            [(a.id, b.id), (b.id, c.id), (c.id, d.id), (d.id, a.id)],
+            [(a.id, b.id), (b.id, c.id), (c.id, a.id)],
+            [(a.id, b.id), (b.id, a.id)],
+        ])
+
+    def test_full_rematch_invalidates_cached_cycles(self):
+        a, b = make_user('a'), make_user('b')
+        self.assertEqual(cycles.get_user_cycles(a.id), [])
+        for teacher, learner, skill in ((a, b, self.skills[0]), (b, a, self.skills[1])):
+            OfferedSkill.objects.create(user=teacher, skill=skill, proficiency_level='expert')
+            DesiredSkill.objects.create(user=learner, skill=skill)
+        rematch_all()
+        self.assertEqual([cycle['length'] for cycle in cycles.get_user_cycles(a.id)], [2])
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.category = SkillCategory.objects.create(name='Programming')
+        self.skills = {
+            name: Skill.objects.create(name=name, category=self.category)
+            for name in ('Machine Learning', 'Python', 'Java', 'Deep Learning')
+        }
+        SkillTrend.objects.create(skill=self.skills['Deep Learning'], category=self.category, score=5.0)
+        self.index = SkillAutocomplete()
+        self.index.build()
+
+    def names(self, term):
+        return [name for _, name in self.index.lookup(term)]
+
+    def assertMatchesFreshBuild(self):
+        snapshot = self.index.snapshot
+        self.assertEqual(snapshot.keys, sorted(snapshot.keys))
+        fresh = SkillAutocomplete()
+        fresh.build()
+        self.assertEqual(
+            list(zip(snapshot.keys, snapshot.skill_ids)), list(zip(fresh.snapshot.keys, fresh.snapshot.skill_ids))
+        )
+
+    def test_prefixes_of_words_initials_and_trend_order(self):
+        self.assertEqual(self.names('learn'), ['Deep Learning', 'Machine Learning'])
+        self.assertEqual(self.names('ml'), ['Machine Learning'])
+        self.assertEqual(self.names('PY'), ['Python'])
+        self.assertEqual(self.names('')[0], 'Deep Learning')
+
+    def test_refresh_skill_patches_the_sorted_keys(self):
+        python = self.skills['Python']
+        python.name = 'Advanced Python'
+        python.save()
+        SkillAlias.objects.create(skill=python, name='Snake Language')
+        self.index.refresh_skill(python.pk)
+        self.assertMatchesFreshBuild()
+        self.assertEqual(self.names('adv'), ['Advanced Python'])
+        self.assertEqual(self.names('snake'), ['Advanced Python'])
+        self.assertEqual(self.names('python'), ['Advanced Python'])
+
+        created = Skill.objects.create(name='Go', category=self.category)
+        self.index.refresh_skill(created.pk)
+        java_id = self.skills['Java'].pk
+        self.skills['Java'].delete()
+        self.index.refresh_skill(java_id)
+        self.assertMatchesFreshBuild()
+        self.assertEqual(self.names('java'), [])
+        self.assertEqual(self.names('go'), ['Go'])
+
+
+class FacetCountTests(TestCase):
+    def setUp(self):
+        category = SkillCategory.objects.create(name='Programming')
+        self.skill = Skill.objects.create(name='Python', category=category)
+        tutors = [
+            ('beginner', 'online', 0), ('advanced', 'online', 2), ('advanced', 'both', 4),
+            ('expert', 'both', 8), ('expert', 'in_person', 10), ('expert', 'online', 1),
+        ]
+        for i, (proficiency, preference, years) in enumerate(tutors):
+            OfferedSkill.objects.create(
+                user=make_user(f'tutor{i}'), skill=self.skill, proficiency_level=proficiency,
+                teaching_preference=preference, years_of_experience=years,
+            )
+
+    def tutors(self):
+        return with_facets(OfferedSkill.objects.filter(skill=self.skill, is_active=True))
+
+    def counts(self, selected):
+        return {
+            entry['name']: {value['value']: value['count'] for value in entry['values']}
+            for entry in facet_counts(self.tutors(), selected)
+        }
+
+    def expected(self, selected):
+        """Each facet counted by brute force, with every selection but its own applied"""
+        expected = {}
+        for facet in FACETS:
+            others = {name: values for name, values in selected.items() if name != facet.name}
+            values = {}
+            for value in filter_facets(self.tutors(), others).values_list(facet.alias, flat=True):
+                if value not in (None, ''):
+                    values[value] = values.get(value, 0) + 1
+            if facet.choices is not None:
+                # Ticked values stay listed with a count of 0
+                for value in selected.get(facet.name, ()):
+                    values.setdefault(value, 0)
+            if values:
+                expected[facet.name] = values
+        return expected
+
+    def test_counts_leave_out_the_facets_own_selection(self):
+        selected = {'proficiency': {'advanced'}}
+        counts = self.counts(selected)
+        # Ticking "Advanced" still shows how many tutors are experts...
+        self.assertEqual(counts['proficiency'], {'beginner': 1, 'advanced': 2, 'expert': 3})
+        # ...while other facets count advanced tutors only
+        self.assertEqual(counts['format'], {'online': 1, 'both': 1})
+        self.assertEqual(counts, self.expected(selected))
+
+    def test_several_selections_match_brute_force(self):
+        for selected in (
+            {},
+            {'format': {'online', 'both'}},
+            {'proficiency': {'expert'}, 'experience': {'6+'}},
+            {'proficiency': {'expert', 'advanced'}, 'format': {'online'}, 'experience': {'1-2', '0'}},
+        ):
+            with self.subTest(selected=selected):
+                with self.assertNumQueries(1):
+                    counts = self.counts(selected)
+                self.assertEqual(counts, self.expected(selected))
+
+    def test_selected_values_without_tutors_are_still_listed(self):
+        entry = next(e for e in facet_counts(self.tutors(), {'year': {'phd'}}) if e['name'] == 'year')
+        self.assertEqual(entry['values'], [{'value': 'phd', 'label': 'PhD', 'count': 0, 'selected': True}])
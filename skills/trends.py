@@ -0,0 +1,141 @@
+"""
+Trending skills ranking.
+
+Each skill's score is a sum of recent activity events (new offers, new
+desires, swap requests and completed sessions), each weighted by type and
+decayed exponentially with age, so a burst of interest last week outranks
+a skill that was popular a year ago. Scores are materialized into
+``SkillTrend`` by the ``refresh_skill_trends`` command; views only read the
+precomputed ordering.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.cache import bump_version, cached
+from .models import Skill, OfferedSkill, DesiredSkill, SkillTrend
+
+EVENT_WEIGHTS = {
+    'offer': 1.0,
+    'desire': 1.0,
+    'request': 2.0,
+    'session': 3.0,
+}
+
+# Events older than this many half-lives contribute under 0.5% and are ignored
+WINDOW_HALF_LIVES = 8
+
+TREND_UPDATE_FIELDS = ['category', 'score', 'offered_count', 'desired_count', 'updated_at']
+
+
+def half_life():
+    return timedelta(days=getattr(settings, 'SKILL_TREND_HALF_LIFE_DAYS', 14))
+
+
+def trend_events(since):
+    """Yield (event type, skill id, timestamp) for activity after ``since``"""
+    from skill_sessions.models import SkillSwapRequest, SkillSwapSession
+
+    offers = OfferedSkill.objects.filter(is_active=True, created_at__gte=since)
+    for skill_id, at in offers.values_list('skill_id', 'created_at').iterator():
+        yield 'offer', skill_id, at
+
+    desires = DesiredSkill.objects.filter(is_active=True, created_at__gte=since)
+    for skill_id, at in desires.values_list('skill_id', 'created_at').iterator():
+        yield 'desire', skill_id, at
+
+    requests = SkillSwapRequest.objects.filter(created_at__gte=since)
+    for skill_id, at in requests.values_list('offered_skill__skill_id', 'created_at').iterator():
+        yield 'request', skill_id, at
+
+    sessions = (SkillSwapSession.objects
+                .filter(status='completed')
+                .annotate(completed_at=Coalesce('ended_at', 'scheduled_date'))
+                .filter(completed_at__gte=since))
+    for skill_id, at in sessions.values_list('skill_id', 'completed_at').iterator():
+        yield 'session', skill_id, at
+
+
+def compute_trends(now=None):
+    """
+    Score every skill with recent activity or active offers/desires.
+
+    Returns {skill_id: {'score', 'offered_count', 'desired_count'}}.
+    """
+    now = now or timezone.now()
+    half_life_seconds = half_life().total_seconds()
+    since = now - half_life() * WINDOW_HALF_LIVES
+
+    trends = {}
+
+    def row(skill_id):
+        return trends.setdefault(skill_id, {'score': 0.0, 'offered_count': 0, 'desired_count': 0})
+
+    for kind, skill_id, at in trend_events(since):
+        age = max((now - at).total_seconds(), 0)
+        row(skill_id)['score'] += EVENT_WEIGHTS[kind] * 0.5 ** (age / half_life_seconds)
+
+    for model, field in ((OfferedSkill, 'offered_count'), (DesiredSkill, 'desired_count')):
+        counts = model.objects.filter(is_active=True).values('skill_id').annotate(n=Count('id')).order_by()
+        for counted in counts:
+            row(counted['skill_id'])[field] = counted['n']
+
+    return trends
+
+
+def refresh_skill_trends(batch_size=1000):
+    """
+    Recompute and store every skill's trend, dropping rows for skills with
+    no remaining activity. Returns a summary dict for the command output.
+    """
+    started_at = timezone.now()
+    trends = compute_trends(started_at)
+    categories = dict(Skill.objects.filter(id__in=list(trends)).values_list('id', 'category_id'))
+
+    rows = [
+        SkillTrend(
+            skill_id=skill_id,
+            category_id=categories[skill_id],
+            score=round(values['score'], 4),
+            offered_count=values['offered_count'],
+            desired_count=values['desired_count'],
+        )
+        for skill_id, values in trends.items() if skill_id in categories
+    ]
+    with transaction.atomic():
+        SkillTrend.objects.bulk_create(
+            rows,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['skill'],
+            update_fields=TREND_UPDATE_FIELDS,
+        )
+        removed, _ = SkillTrend.objects.filter(updated_at__lt=started_at).delete()
+    bump_version('trends')
+
+    return {
+        'skills': len(rows),
+        'removed': removed,
+        'seconds': (timezone.now() - started_at).total_seconds(),
+    }
+
+
+@cached('trending_skills', namespaces=('skills', 'trends'))
+def trending_skills(limit=None, category_id=None):
+    """
+    Skills with active teachers ordered by trend score, optionally limited to
+    one category. Each skill carries ``offered_count`` and ``trend_score``.
+    Empty until ``refresh_skill_trends`` has run; requests never refresh.
+    """
+    queryset = (Skill.objects
+                .filter(category__is_active=True, trend__offered_count__gt=0)
+                .select_related('category')
+                .annotate(offered_count=F('trend__offered_count'), trend_score=F('trend__score'))
+                .order_by('-trend__score', 'name'))
+    if category_id:
+        queryset = queryset.filter(trend__category_id=category_id)
+    return list(queryset[:limit] if limit else queryset)
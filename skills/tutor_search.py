@@ -0,0 +1,120 @@
+"""
+Search for tutors of a skill who share free time with a learner.
+
+All candidate tutors of the skill are loaded in one query and their free
+time for the week in three more (see ``accounts.availability.week_masks``);
+each tutor is then one bitwise ``&`` with the learner's free time and the
+requested window, so thousands of tutors are filtered in a single pass.
+"""
+from datetime import date, time
+
+from django.utils import timezone
+
+from accounts.availability import (
+    FULL_WEEK, SLOT_MINUTES, datetime_slot, free_runs, slot_datetime, span_mask, week_masks, week_start,
+    window_mask,
+)
+
+from .models import OfferedSkill
+
+
+def common_free_time(skill_id, learner_id=None, monday=None, window=FULL_WEEK, duration_minutes=60):
+    """
+    Tutors of ``skill_id`` free at the same time as the learner, ranked by
+    earliest common slot, then total common time, then rating.
+
+    Learners without availability rules count as free all week; tutors
+    without rules are never free. Returns dicts with ``user_id``,
+    ``offered_skill_id``, ``average_rating``, ``free_minutes`` and ``slots``,
+    a list of ``(start, end)`` datetimes of the common runs long enough for
+    ``duration_minutes``.
+    """
+    monday = monday or week_start()
+    min_slots = max(1, -(-duration_minutes // SLOT_MINUTES))
+
+    candidates = OfferedSkill.objects.filter(skill_id=skill_id, is_active=True)
+    if learner_id is not None:
+        candidates = candidates.exclude(user_id=learner_id)
+    candidates = list(candidates.values_list('id', 'user_id', 'average_rating'))
+
+    masks = week_masks([user_id for _, user_id, _ in candidates], monday)
+    # Nothing before now counts in the current week
+    wanted = window & ~span_mask(0, datetime_slot(monday, timezone.now(), round_up=True))
+    if learner_id is not None:
+        wanted &= week_masks([learner_id], monday, default=FULL_WEEK)[learner_id]
+
+    results = []
+    for offered_skill_id, user_id, rating in candidates:
+        common = masks[user_id] & wanted
+        if not common:
+            continue
+        runs = free_runs(common, min_slots)
+        if not runs:
+            continue
+        results.append({
+            'user_id': user_id,
+            'offered_skill_id': offered_skill_id,
+            'average_rating': rating,
+            'free_minutes': sum(length for _, length in runs) * SLOT_MINUTES,
+            'slots': [
+                (slot_datetime(monday, first), slot_datetime(monday, first + length))
+                for first, length in runs
+            ],
+        })
+    results.sort(key=lambda r: (r['slots'][0][0], -r['free_minutes'], -r['average_rating']))
+    return results
+
+
+def parse_availability_query(params):
+    """
+    Read ``day`` (0-6, Monday first, repeatable), ``from`` and ``to`` (HH:MM),
+    ``duration`` (minutes) and ``week`` (any date in it) from query
+    parameters. Returns ``(monday, window, duration_minutes)``, or None when
+    no availability filter was asked for. Raises ValueError on bad input.
+    """
+    days = [day for day in params.getlist('day') if day]
+    start, end = params.get('from'), params.get('to')
+    if not (days or start or end or params.get('available')):
+        return None
+    weekdays = [int(day) for day in days] or None
+    if weekdays and not all(0 <= day <= 6 for day in weekdays):
+        raise ValueError('day must be between 0 (Monday) and 6 (Sunday)')
+    duration = int(params.get('duration') or 60)
+    if not 0 < duration <= 24 * 60:
+        raise ValueError('duration must be between 1 and 1440 minutes')
+    monday = week_start(date.fromisoformat(params['week']) if params.get('week') else None)
+    window = window_mask(
+        weekdays,
+        time.fromisoformat(start) if start else None,
+        time.fromisoformat(end) if end else None,
+    )
+    return monday, window, duration
+
+
+class RankedTutors:
+    """
+    Sequence over ``common_free_time`` results for ``Paginator``: only the
+    ``OfferedSkill`` rows of the requested page are loaded, each carrying
+    ``free_slots`` and ``free_minutes``.
+    """
+    def __init__(self, results):
+        self.results = results
+
+    def __len__(self):
+        return len(self.results)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        page = self.results[index]
+        rows = OfferedSkill.objects.select_related('user', 'skill').in_bulk(
+            [result['offered_skill_id'] for result in page]
+        )
+        tutors = []
+        for result in page:
+            tutor = rows.get(result['offered_skill_id'])
+            if tutor is not None:
+                tutor.free_slots = result['slots']
+                tutor.free_minutes = result['free_minutes']
+                tutors.append(tutor)
+        return tutors
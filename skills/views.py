@@ -4,15 +4,57 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
+from django.conf import settings
 from django.http import JsonResponse
-from django.db.models import Count, Avg
+from django.utils.cache import patch_cache_control
+from django.db.models import Count, Avg, F, Window
+from django.db.models.functions import RowNumber
 from django.contrib.auth.models import User
 
+from core.cache import cached
+from accounts.models import AvailabilityRule
 from .models import Skill, SkillCategory, OfferedSkill, DesiredSkill, SkillMatch
+from .autocomplete import get_autocomplete
+from .cycles import invalidate_cycles
+from .facets import facet_counts, filter_facets, selected_facets, with_facets
+from .fuzzy import did_you_mean
+from .trends import trending_skills
+from .tutor_search import RankedTutors, common_free_time, parse_availability_query
 from .forms import OfferedSkillForm, DesiredSkillForm, SkillSearchForm
 
 # Create your views here.
 
+@cached('active_categories', namespaces=('skills',))
+def active_categories():
+    """Active categories annotated with their number of skills"""
+    return list(SkillCategory.objects.filter(is_active=True).annotate(
+        skill_count=Count('skills')
+    ))
+
+
+def top_teachers_by_skill(skill_ids, limit=6):
+    """
+    Best-rated active offers for each skill, fetched in one query using
+    ROW_NUMBER() OVER (PARTITION BY skill_id ...).
+    Returns {skill_id: [OfferedSkill, ...]} with at most ``limit`` per skill.
+    """
+    ranked = (OfferedSkill.objects
+              .filter(skill_id__in=skill_ids, is_active=True)
+              .select_related('user')
+              .annotate(rank=Window(
+                  expression=RowNumber(),
+                  partition_by=F('skill_id'),
+                  order_by=[F('average_rating').desc(), F('total_sessions').desc(), F('id').asc()]
+              ))
+              .filter(rank__lte=limit)
+              .order_by('skill_id', 'rank'))
+    
+    teachers = {}
+    for offered_skill in ranked:
+        teachers.setdefault(offered_skill.skill_id, []).append(offered_skill)
+    return teachers
+
+
 class SkillListView(ListView):
     model = Skill
     template_name = 'skills/skill_list.html'
@@ -64,48 +106,32 @@ class SkillListView(ListView):
         context['show_skills_grid'] = show_skills_grid
         
         if show_trending:
-            # Get trending skills based on most offered skills (limited to 15)
-            trending_skills = (Skill.objects
-                              .filter(category__is_active=True)
-                              .annotate(offered_count=Count('offered_by_users'))
-                              .filter(offered_count__gt=0)
-                              .order_by('-offered_count', 'name')[:15])
-            context['trending_skills'] = trending_skills
-        
-        # If showing skills grid, get teachers for the filtered skills
+            # Top 15 skills from the precomputed trend ranking
+            context['trending_skills'] = trending_skills(15)
+        
+        # If showing skills grid, get teachers for the skills on this page
         if show_skills_grid and has_filters:
-            from .models import OfferedSkill
-            queryset = self.get_queryset()
+            page_skills = list(context['object_list'])
+            teachers_by_skill = top_teachers_by_skill([skill.id for skill in page_skills])
             teachers_data = []
             
-            for skill in queryset:
-                offered_skills = OfferedSkill.objects.filter(
-                    skill=skill, 
-                    is_active=True
-                ).select_related('user').annotate(
-                    avg_rating=Avg('user__teaching_sessions__reviews__overall_rating')
-                )
-                
-                skill_teachers = []
-                for offered_skill in offered_skills:
-                    skill_teachers.append({
-                        'user': offered_skill.user,
-                        'offered_skill': offered_skill,
-                        'avg_rating': offered_skill.avg_rating or 0,
-                    })
+            for skill in page_skills:
+                skill_teachers = [{
+                    'user': offered_skill.user,
+                    'offered_skill': offered_skill,
+                    'avg_rating': offered_skill.average_rating,
+                } for offered_skill in teachers_by_skill.get(skill.id, [])]
                 
                 if skill_teachers:
                     teachers_data.append({
                         'skill': skill,
-                        'teachers': skill_teachers[:6]  # Limit to 6 teachers per skill
+                        'teachers': skill_teachers
                     })
             
             context['teachers_data'] = teachers_data
         
         # Get all categories for browse section
-        context['categories'] = SkillCategory.objects.filter(is_active=True).annotate(
-            skill_count=Count('skills')
-        )
+        context['categories'] = active_categories()
         
         # Add filter information for display
         if self.request.GET.get('category'):
@@ -133,7 +159,7 @@ class SkillCategoryListView(ListView):
     context_object_name = 'categories'
     
     def get_queryset(self):
-        return SkillCategory.objects.filter(is_active=True)
+        return active_categories()
 
 
 class SkillCategoryDetailView(DetailView):
@@ -309,7 +335,7 @@ class SkillMatchListView(LoginRequiredMixin, ListView):
         return SkillMatch.objects.filter(
             Q(teacher=self.request.user) | Q(learner=self.request.user),
             is_dismissed=False
-        )
+        ).select_related('teacher', 'learner', 'offered_skill__skill', 'desired_skill__skill')
 
 
 @login_required
@@ -317,20 +343,25 @@ def dismiss_skill_match(request, pk):
     match = get_object_or_404(SkillMatch, pk=pk)
     match.is_dismissed = True
     match.save()
+    invalidate_cycles()
     return redirect('skills:match_list')
 
 
 class SkillAutocompleteView(LoginRequiredMixin, ListView):
+    """Skill name suggestions from the in-memory indexes, without database queries"""
     model = Skill
     
     def get_queryset(self):
-        term = self.request.GET.get('term', '')
-        return Skill.objects.filter(name__icontains=term)[:10]
+        return get_autocomplete().lookup(self.request.GET.get('term', ''))
     
     def get(self, request, *args, **kwargs):
-        skills = self.get_queryset()
-        data = [{'id': skill.id, 'text': skill.name} for skill in skills]
-        return JsonResponse({'results': data})
+        data = [{'id': skill_id, 'text': name} for skill_id, name in self.get_queryset()]
+        payload = {'results': data}
+        if not data:
+            payload['did_you_mean'] = did_you_mean(request.GET.get('term', ''))
+        response = JsonResponse(payload)
+        patch_cache_control(response, private=True, max_age=settings.SKILL_AUTOCOMPLETE_MAX_AGE)
+        return response
 
 
 class AddSkillView(LoginRequiredMixin, CreateView):
@@ -345,13 +376,8 @@ class AddSkillView(LoginRequiredMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Get trending skills (top 10 by offered count)
-        trending_skills = (Skill.objects
-                         .filter(category__is_active=True)
-                         .annotate(offered_count=Count('offered_by_users'))
-                         .filter(offered_count__gt=0)
-                         .order_by('-offered_count', 'name')[:10])
-        context['trending_skills'] = trending_skills
+        # Top 10 skills from the precomputed trend ranking
+        context['trending_skills'] = trending_skills(10)
         return context
 
 
@@ -379,36 +405,14 @@ def get_skills_by_category_public(request):
 @login_required
 def get_user_stats(request):
     """AJAX endpoint to get user's current dashboard stats"""
-    from skill_sessions.models import SkillSwapSession, SkillSwapRequest
-    from django.db.models import Q
-    from datetime import datetime
-    
-    user = request.user
-    
-    # Skills completed - count sessions where user was learner and status is completed
-    skills_completed = SkillSwapSession.objects.filter(
-        learner=user,
-        status='completed'
-    ).values('skill').distinct().count()
-    
-    # Sessions this month
-    first_day_of_month = datetime.now().replace(day=1)
-    sessions_this_month = SkillSwapSession.objects.filter(
-        Q(teacher=user) | Q(learner=user),
-        created_at__gte=first_day_of_month,
-        status='completed'
-    ).count()
+    from skill_sessions.stats import get_user_stats as load_user_stats
     
-    # Active requests
-    active_requests = SkillSwapRequest.objects.filter(
-        Q(requester=user) | Q(recipient=user),
-        status='pending'
-    ).count()
+    stats = load_user_stats(request.user)
     
     return JsonResponse({
-        'skills_completed': skills_completed,
-        'sessions_this_month': sessions_this_month,
-        'active_requests': active_requests,
+        'skills_completed': stats.skills_completed,
+        'sessions_this_month': stats.sessions_this_month,
+        'active_requests': stats.active_requests,
     })
 
 
@@ -420,16 +424,16 @@ class TrendingSkillsMoreView(LoginRequiredMixin, ListView):
     paginate_by = 10
     
     def get_queryset(self):
-        from django.db.models import Count
-        return (Skill.objects
-                .filter(category__is_active=True)
-                .annotate(offered_count=Count('offered_by_users'))
-                .filter(offered_count__gt=0)
-                .order_by('-offered_count', 'name'))
+        self.category_id = self.request.GET.get('category', '')
+        if not self.category_id.isdigit():
+            self.category_id = ''
+        return trending_skills(None, int(self.category_id) if self.category_id else None)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['page_title'] = 'All Trending Skills'
+        context['categories'] = active_categories()
+        context['selected_category'] = self.category_id
         return context
 
 
@@ -464,8 +468,30 @@ class FindTutorsView(ListView):
     
     def get_queryset(self):
         skill_id = self.kwargs['skill_id']
-        return (OfferedSkill.objects
-                .filter(skill_id=skill_id, is_active=True)
+        
+        # Optional "free on <day> between <from> and <to>" filter, matched against
+        # the signed-in learner's own availability as well
+        self.availability_error = None
+        try:
+            self.availability_query = parse_availability_query(self.request.GET)
+        except ValueError as e:
+            self.availability_query, self.availability_error = None, str(e)
+        
+        # Sidebar facets; counts are taken over self.facet_base in get_context_data
+        self.selected_facets = selected_facets(self.request.GET)
+        tutors = with_facets(OfferedSkill.objects.filter(skill_id=skill_id, is_active=True))
+        if self.availability_query:
+            monday, window, duration = self.availability_query
+            learner_id = self.request.user.id if self.request.user.is_authenticated else None
+            free = common_free_time(skill_id, learner_id, monday, window, duration)
+            self.facet_base = tutors.filter(pk__in=[result['offered_skill_id'] for result in free])
+            if self.selected_facets:
+                matching = set(filter_facets(self.facet_base, self.selected_facets).values_list('pk', flat=True))
+                free = [result for result in free if result['offered_skill_id'] in matching]
+            return RankedTutors(free)
+        
+        self.facet_base = tutors
+        return (filter_facets(tutors, self.selected_facets)
                 .select_related('user', 'skill')
                 .order_by('-average_rating', '-total_sessions'))
     
@@ -473,6 +499,25 @@ class FindTutorsView(ListView):
         context = super().get_context_data(**kwargs)
         skill_id = self.kwargs['skill_id']
         context['skill'] = get_object_or_404(Skill, id=skill_id)
+        
+        params = self.request.GET.copy()
+        params.pop('page', None)
+        context.update({
+            'facets': facet_counts(self.facet_base, self.selected_facets),
+            'facet_filter': bool(self.selected_facets),
+            'facet_params': [
+                (name, value) for name, values in self.selected_facets.items() for value in values
+            ],
+            'availability_params': [
+                (key, value) for key in ('day', 'from', 'to', 'duration', 'week', 'available')
+                for value in self.request.GET.getlist(key) if value
+            ] if self.availability_query else [],
+            'availability_filter': bool(self.availability_query),
+            'availability_error': self.availability_error,
+            'weekdays': AvailabilityRule.WEEKDAY_CHOICES,
+            'selected_days': self.request.GET.getlist('day'),
+            'filter_query': params.urlencode(),
+        })
         return context
 
 
@@ -84,10 +84,62 @@ function displayNotifications(notifications) {
     `).join('');
 }
 
-// Load notification count on page load
-if (window.isAuthenticated) {
+// Live updates: the server pushes notifications and counters over a
+// server-sent events stream. Polling only runs while the stream is down.
+const NOTIFICATION_POLL_INTERVAL = 60000;
+let notificationPollTimer = null;
+window.notificationStreamConnected = false;
+
+function pollNotificationCount() {
     fetch('/api/notifications/unread-count/')
         .then(response => response.json())
         .then(data => updateNotificationCount(data.count))
         .catch(error => console.error('Error loading notification count:', error));
+}
+
+function startNotificationPolling() {
+    window.notificationStreamConnected = false;
+    if (notificationPollTimer) return;
+    pollNotificationCount();
+    notificationPollTimer = setInterval(pollNotificationCount, NOTIFICATION_POLL_INTERVAL);
+}
+
+function stopNotificationPolling() {
+    clearInterval(notificationPollTimer);
+    notificationPollTimer = null;
+}
+
+function connectNotificationStream() {
+    // Poll until the stream opens: a server that can't stream may never
+    // answer with an error
+    startNotificationPolling();
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/api/notifications/stream/');
+    source.addEventListener('open', function() {
+        window.notificationStreamConnected = true;
+        stopNotificationPolling();
+    });
+    source.addEventListener('counts', function(event) {
+        const counts = JSON.parse(event.data);
+        updateNotificationCount(counts.unread_count);
+        window.dispatchEvent(new CustomEvent('userCountsUpdated', { detail: counts }));
+    });
+    source.addEventListener('notification', function(event) {
+        const dropdown = document.getElementById('notificationDropdown');
+        if (dropdown && !dropdown.classList.contains('hidden')) {
+            loadNotifications();
+        }
+        window.dispatchEvent(new CustomEvent('notificationReceived', { detail: JSON.parse(event.data) }));
+    });
+    source.addEventListener('error', function() {
+        // The browser reconnects by itself (resuming from Last-Event-ID) unless
+        // the stream was refused (e.g. 204 outside ASGI); poll in the meantime either way.
+        startNotificationPolling();
+    });
+}
+
+if (window.isAuthenticated) {
+    connectNotificationStream();
 }
\ No newline at end of file